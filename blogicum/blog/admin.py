@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db.models.expressions import RawSQL
 
 from .models import Category, Location, Post, Comment
+from .search import match_expression, matching_ids
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -8,12 +10,21 @@ class PostAdmin(admin.ModelAdmin):
         'id', 'title', 'author', 'text', 'created_at',
         'category', 'pub_date', 'location', 'is_published'
     )
-    search_fields = ('text', )
+    search_fields = ('title', 'text')
     list_display_links = ('title', )
     list_editable = ('category', 'is_published', 'location')
     list_filter = ('created_at', )
     empty_value_display = '-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по полнотекстовому индексу вместо LIKE по search_fields"""
+        if not search_term:
+            return queryset, False
+        expression = match_expression(search_term)
+        if expression is None:
+            return queryset.none(), False
+        return queryset.filter(pk__in=RawSQL(*matching_ids(expression))), False
+
 
 admin.site.register(Category)
 admin.site.register(Location)
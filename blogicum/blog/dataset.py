@@ -0,0 +1,154 @@
+import gzip
+import json
+import os
+
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Модели набора данных блога в порядке зависимостей: модель идёт после
+# всех моделей, на которые ссылается
+MODELS = (
+    'auth.user',
+    'blog.location',
+    'blog.category',
+    'blog.post',
+    'blog.comment',
+)
+
+# Поле даты, по которому выбираются записи для инкрементальной выгрузки
+SINCE_FIELDS = {
+    'auth.user': 'date_joined',
+}
+
+# Сколько символов читать из файла за раз
+READ_SIZE = 64 * 1024
+# Объект длиннее этого считается ошибкой разбора, а не недочитанным
+MAX_OBJECT_SIZE = 64 * 1024 * 1024
+
+
+def open_text(path, mode='rt'):
+    """Функция открывает файл как текст, распаковывая .gz на лету"""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _skip_whitespace(buffer, position):
+    while position < len(buffer) and buffer[position] in ' \t\r\n':
+        position += 1
+    return position
+
+
+def _skip_separator(buffer, position):
+    position = _skip_whitespace(buffer, position)
+    if buffer[position:position + 1] == ',':
+        position = _skip_whitespace(buffer, position + 1)
+    return position
+
+
+def iter_json_array(file):
+    """Функция по одному разбирает объекты JSON-массива верхнего уровня.
+
+    В памяти держится только текущий объект и остаток прочитанного блока,
+    поэтому размер файла не ограничен.
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_SIZE)
+    position = _skip_whitespace(buffer, 0)
+    if buffer[position:position + 1] != '[':
+        raise ValueError('Ожидался JSON-массив')
+    position += 1
+    while True:
+        position = _skip_separator(buffer, position)
+        char = buffer[position:position + 1]
+        if char == ']':
+            return
+        if char == '{':
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Объект прочитан не полностью
+                if len(buffer) - position > MAX_OBJECT_SIZE:
+                    raise
+            else:
+                yield item
+                continue
+        elif char:
+            raise ValueError(f'Неожиданный символ {char!r} в JSON-массиве')
+        chunk = file.read(READ_SIZE)
+        if not chunk:
+            raise ValueError('Неожиданный конец JSON-массива')
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def iter_json_lines(file):
+    """Функция разбирает файл, в каждой строке которого по объекту JSON"""
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_records(path):
+    """Функция потоково читает записи в формате dumpdata.
+
+    Поддерживаются JSON-массив (вывод dumpdata) и JSON Lines, в том числе
+    сжатые gzip.
+    """
+    with open_text(path) as file:
+        start = file.read(1)
+        while start and start.isspace():
+            start = file.read(1)
+        file.seek(0)
+        if start == '[':
+            yield from iter_json_array(file)
+        else:
+            yield from iter_json_lines(file)
+
+
+def iter_model_records(model, since=None, since_field=None, batch_size=2000):
+    """Функция выдаёт записи модели в формате dumpdata порциями по ключу.
+
+    Порции выбираются условием pk > последнего ключа, поэтому память не
+    зависит от размера таблицы, а запросы не замедляются к концу выборки.
+    """
+    fields = [
+        field.name for field in model._meta.concrete_fields
+        if not field.primary_key
+    ]
+    queryset = model._base_manager.order_by('pk')
+    if since is not None:
+        queryset = queryset.filter(**{f'{since_field}__gte': since})
+    last_pk = None
+    while True:
+        batch = queryset
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        yield from serializers.serialize('python', batch, fields=fields)
+
+
+def export_model(model, path, since=None, batch_size=2000, compresslevel=6):
+    """Функция пишет записи модели в файл JSON Lines, сжатый gzip.
+
+    Файл сначала пишется рядом под временным именем, поэтому при сбое
+    предыдущая выгрузка не портится. Возвращает число записей.
+    """
+    since_field = SINCE_FIELDS.get(model._meta.label_lower, 'created_at')
+    temporary = f'{path}.tmp'
+    count = 0
+    with gzip.open(
+            temporary, 'wt', encoding='utf-8', compresslevel=compresslevel
+    ) as file:
+        for record in iter_model_records(
+                model, since, since_field, batch_size):
+            file.write(json.dumps(
+                record, cls=DjangoJSONEncoder, ensure_ascii=False
+            ))
+            file.write('\n')
+            count += 1
+    os.replace(temporary, path)
+    return count
@@ -0,0 +1,69 @@
+import logging
+import os
+import warnings
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.images import FORMAT_EXTENSIONS, normalize_image, read_size
+from blog.signals import image_normalized
+
+logger = logging.getLogger(__name__)
+
+
+class NormalizedImageField(forms.ImageField):
+    """Поле изображения, нормализующее файл перед сохранением"""
+
+    default_error_messages = {
+        'too_large': 'Изображение слишком большое.',
+    }
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return super().to_python(data)
+        self._check_pixels(data)
+        uploaded = super().to_python(data)
+        result = normalize_image(uploaded)
+        if result is None:
+            uploaded.seek(0)
+            return uploaded
+        content, image_format = result
+        name = (
+            os.path.splitext(uploaded.name)[0]
+            + FORMAT_EXTENSIONS[image_format]
+        )
+        normalized = SimpleUploadedFile(
+            name, content, content_type=Image.MIME[image_format]
+        )
+        image_normalized.send(
+            sender=self.__class__,
+            name=name,
+            original_size=uploaded.size,
+            size=normalized.size,
+        )
+        logger.info(
+            'Изображение %s: %s -> %s байт',
+            name, uploaded.size, normalized.size,
+        )
+        return normalized
+
+    def _check_pixels(self, data):
+        """Отклоняет изображения-бомбы до декодирования пикселей"""
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', Image.DecompressionBombWarning)
+                width, height = read_size(data)
+            too_large = width * height > settings.IMAGE_UPLOAD_MAX_PIXELS
+        except (Image.DecompressionBombError,
+                Image.DecompressionBombWarning):
+            too_large = True
+        except Exception:
+            # Некорректный файл отклонит стандартная проверка поля
+            return
+        if too_large:
+            raise ValidationError(
+                self.error_messages['too_large'], code='too_large'
+            )
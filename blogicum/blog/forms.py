@@ -1,5 +1,6 @@
 from django import forms
 
+from .fields import NormalizedImageField
 from .models import Post, Comment
 
 
@@ -8,6 +9,7 @@ class PostForm(forms.ModelForm):
         model = Post
         exclude = ('author',)
         fields = ('title', 'text', 'pub_date', 'image', 'category')
+        field_classes = {'image': NormalizedImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(
                 format='%Y-%m-%dT%H:%M', attrs={'type': 'datetime-local'}
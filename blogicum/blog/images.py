@@ -0,0 +1,141 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Расширения файлов для форматов, в которых сохраняются миниатюры
+FORMAT_EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+
+
+def fallback_format(name):
+    """Функция определяет формат миниатюр по расширению оригинала"""
+    extension = os.path.splitext(name)[1].lower()
+    return 'JPEG' if extension in ('.jpg', '.jpeg') else 'PNG'
+
+
+def thumbnail_name(name, width, image_format):
+    """Функция возвращает имя миниатюры рядом с оригиналом"""
+    root = os.path.splitext(name)[0]
+    return f'{root}_{width}w{FORMAT_EXTENSIONS[image_format]}'
+
+
+def _encode(image, image_format, **params):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    params.setdefault('quality', settings.THUMBNAIL_QUALITY)
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, optimize=True, **params)
+    return buffer.getvalue()
+
+
+def read_size(file):
+    """Функция читает размеры изображения из заголовка, не декодируя его"""
+    file.seek(0)
+    with Image.open(file) as image:
+        size = image.size
+    file.seek(0)
+    return size
+
+
+def normalize_image(file):
+    """Функция готовит загруженное изображение к хранению.
+
+    Поворачивает изображение по EXIF, удаляет метаданные, уменьшает до
+    IMAGE_UPLOAD_MAX_DIMENSION и пережимает с качеством IMAGE_UPLOAD_QUALITY.
+    Возвращает байты и формат результата или None, если оригинал лучше.
+    """
+    file.seek(0)
+    original = file.read()
+    with Image.open(BytesIO(original)) as image:
+        image_format = image.format
+        if image_format == 'MPO':
+            # Снимок камеры телефона: JPEG с дополнительными кадрами,
+            # нормализуется его первый кадр
+            image_format = 'JPEG'
+        elif getattr(image, 'is_animated', False):
+            return None
+        has_metadata = bool(image.info.get('exif') or image.getexif())
+        icc_profile = image.info.get('icc_profile')
+        image.load()
+        normalized = ImageOps.exif_transpose(image)
+    # Сохраняется только цветовой профиль, остальные метаданные удаляются
+    normalized.info = {}
+    max_dimension = settings.IMAGE_UPLOAD_MAX_DIMENSION
+    resized = max(normalized.size) > max_dimension
+    if resized:
+        normalized.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    converted = image_format not in FORMAT_EXTENSIONS
+    if converted:
+        image_format = 'PNG'
+    params = {'quality': settings.IMAGE_UPLOAD_QUALITY}
+    if icc_profile:
+        params['icc_profile'] = icc_profile
+    content = _encode(normalized, image_format, **params)
+    # Метаданные удаляются даже ценой роста файла, но перевод другого
+    # формата в PNG без уменьшения оставляется, только если он меньше
+    keep_anyway = resized or (has_metadata and not converted)
+    if len(content) >= len(original) and not keep_anyway:
+        return None
+    return content, image_format
+
+
+def generate_thumbnails(name, storage=default_storage):
+    """Функция создаёт уменьшенные копии изображения и их варианты WebP.
+
+    Имена миниатюр детерминированы, уже существующие файлы не пересоздаются.
+    Оригинал декодируется, только если какой-то миниатюры не хватает.
+    Возвращает список имён созданных файлов.
+    """
+    created = []
+    with storage.open(name) as file:
+        with Image.open(file) as image:
+            # Размеры берутся из заголовка, без декодирования пикселей
+            missing = [
+                (width, image_format, target)
+                for width in settings.THUMBNAIL_WIDTHS
+                if width < image.width
+                for image_format in (fallback_format(name), 'WEBP')
+                for target in [thumbnail_name(name, width, image_format)]
+                if not storage.exists(target)
+            ]
+            if not missing:
+                return created
+            image.load()
+    resized = {}
+    for width, image_format, target in missing:
+        if width not in resized:
+            height = max(1, round(image.height * width / image.width))
+            resized[width] = image.resize((width, height), Image.LANCZOS)
+        content = _encode(resized[width], image_format)
+        storage.save(target, ContentFile(content))
+        created.append(target)
+    return created
+
+
+def get_thumbnails(image, width=None):
+    """Функция возвращает миниатюры поля изображения.
+
+    Ширину оригинала передают, только если миниатюры точно созданы (флаг
+    thumbnails_ready): тогда набор вычисляется без обращения к хранилищу.
+    Результат — список кортежей (ширина, url, url варианта WebP).
+    """
+    thumbnails = []
+    image_format = fallback_format(image.name)
+    for thumbnail_width in settings.THUMBNAIL_WIDTHS:
+        name = thumbnail_name(image.name, thumbnail_width, image_format)
+        if width is not None:
+            if thumbnail_width >= width:
+                break
+        elif not image.storage.exists(name):
+            break
+        thumbnails.append((
+            thumbnail_width,
+            image.storage.url(name),
+            image.storage.url(
+                thumbnail_name(image.name, thumbnail_width, 'WEBP')
+            ),
+        ))
+    return thumbnails
@@ -0,0 +1,279 @@
+import json
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.serializers import base
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import IntegrityError, connection, transaction
+from django.db.models import ForeignKey
+
+from blog.dataset import MODELS, iter_records
+from blog.models import ImageDimensionsModel, RenderedTextModel
+
+
+@contextmanager
+def keep_auto_now(model):
+    """Менеджер отключает auto_now и auto_now_add, чтобы сохранить даты.
+
+    bulk_create, в отличие от loaddata, подставляет текущее время в такие
+    поля. Настройка меняется для всего процесса, поэтому импорт не должен
+    идти параллельно с обработкой запросов.
+    """
+    changed = []
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False) or getattr(
+                field, 'auto_now_add', False):
+            changed.append((field, field.auto_now, field.auto_now_add))
+            field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in changed:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Checkpoint:
+    """Журнал импортированных порций для продолжения после сбоя.
+
+    Строка о порции пишется до фиксации транзакции вместе с ключом одной из
+    вставленных записей. При продолжении последняя порция считается
+    импортированной, только если эта запись есть в БД.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Возвращает место остановки и счётчики"""
+        # Порция, повторённая после ошибки, записана дважды: берём последнюю
+        entries = {}
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry['level'], entry['records']] = entry
+        except FileNotFoundError:
+            pass
+        positions = sorted(entries)
+        if positions and not self._committed(entries[positions[-1]]):
+            positions.pop()
+        if not positions:
+            return (0, 0), Counter()
+        return positions[-1], Counter(entries[positions[-1]]['stats'])
+
+    def _committed(self, entry):
+        if entry['probe'] is None:
+            return True
+        label, pk = entry['probe']
+        return apps.get_model(label)._base_manager.filter(pk=pk).exists()
+
+    def write(self, position, probe, stats):
+        level, records = position
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps({
+                'level': level,
+                'records': records,
+                'probe': probe,
+                'stats': stats,
+            }) + '\n')
+            file.flush()
+
+
+def dependency_levels(models):
+    """Функция делит модели на уровни так, чтобы ссылки вели на уровни ниже"""
+    levels = {}
+    for model in models:
+        levels[model] = 1 + max(
+            (
+                levels.get(field.related_model, -1)
+                for field in model._meta.concrete_fields
+                if isinstance(field, ForeignKey)
+                and field.related_model is not model
+            ),
+            default=-1,
+        )
+    grouped = defaultdict(list)
+    for model, level in levels.items():
+        grouped[level].append(model)
+    return [grouped[level] for level in sorted(grouped)]
+
+
+class Importer:
+    """Импорт записей в формате dumpdata порциями через bulk_create.
+
+    Файлы читаются по разу на каждый уровень зависимостей, поэтому ссылка
+    может стоять в файле раньше записи, на которую ссылается. Первичные
+    ключи сохраняются, поэтому ссылки инкрементальной выгрузки на записи
+    прошлых импортов остаются верными, а уже импортированные записи
+    считаются конфликтами. Записи с ошибками пропускаются и передаются
+    в on_error.
+    """
+
+    def __init__(self, batch_size=1000, checkpoint=None, on_error=None):
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.on_error = on_error
+        self.models = [apps.get_model(label) for label in MODELS]
+        self.levels = dependency_levels(self.models)
+        self.stats = Counter()
+
+    def run(self, paths, resume=False):
+        start = (0, 0)
+        if resume and self.checkpoint is not None:
+            start, self.stats = self.checkpoint.load()
+        for level, models in enumerate(self.levels):
+            if level < start[0]:
+                continue
+            skip = start[1] if level == start[0] else 0
+            rows = self._rows(paths, level, models, skip)
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self.import_batch(
+                    [row for _, row in batch], models, (level, batch[-1][0])
+                )
+        return self.stats
+
+    def _rows(self, paths, level, models, skip):
+        """Генератор отдаёт записи уровня с номером следующей записи файлов"""
+        labels = {model._meta.label_lower for model in models}
+        records = (record for path in paths for record in iter_records(path))
+        for index, row in enumerate(records, 1):
+            if index <= skip:
+                continue
+            label = str(row.get('model', '')).lower()
+            if label in labels:
+                yield index, row
+            elif level == 0 and label not in MODELS:
+                self.stats['skipped'] += 1
+
+    def import_batch(self, rows, models, position):
+        try:
+            stats = self._insert(rows, models, position, False)
+        except IntegrityError:
+            # Повторяем порцию построчно, чтобы пропустить только конфликты
+            stats = self._insert(rows, models, position, True)
+        self.stats = stats
+
+    def _insert(self, rows, models, position, careful):
+        stats = Counter(self.stats)
+        probe = None
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[str(row['model']).lower()].append(row)
+        with ExitStack() as stack:
+            stack.enter_context(transaction.atomic())
+            for model in models:
+                label = model._meta.label_lower
+                if not grouped[label]:
+                    continue
+                stack.enter_context(keep_auto_now(model))
+                instances = self._build(model, grouped[label], stats)
+                inserted = self._save(model, instances, careful, stats)
+                for _, instance in inserted:
+                    if instance.pk is not None:
+                        probe = [label, instance.pk]
+                stats[label] += len(inserted)
+            self._reset_sequences(models)
+            if self.checkpoint is not None:
+                self.checkpoint.write(position, probe, dict(stats))
+        return stats
+
+    def _reset_sequences(self, models):
+        # Ключи вставлены явно: последовательности (PostgreSQL, Oracle)
+        # продвигаются за них, как после loaddata
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+
+    def _existing(self, model, rows):
+        """Ключи записей в БД, на которые ссылаются записи порции"""
+        existing = {}
+        for field in model._meta.concrete_fields:
+            if not isinstance(field, ForeignKey):
+                continue
+            target = field.target_field.attname
+            keys = set()
+            for row in rows:
+                value = (row.get('fields') or {}).get(field.name)
+                try:
+                    keys.add(field.target_field.to_python(value))
+                except ValidationError:
+                    # Запись с неверной ссылкой отсеется при проверке
+                    continue
+            keys.discard(None)
+            existing[field.name] = {
+                str(key) for key in field.related_model._base_manager.filter(
+                    **{f'{target}__in': keys}
+                ).values_list(target, flat=True)
+            }
+        return existing
+
+    def _build(self, model, rows, stats):
+        label = model._meta.label_lower
+        existing = self._existing(model, rows)
+        instances = []
+        for row in rows:
+            fields = row.get('fields') or {}
+            try:
+                for field in model._meta.concrete_fields:
+                    value = fields.get(field.name)
+                    if (isinstance(field, ForeignKey) and value is not None
+                            and str(value) not in existing[field.name]):
+                        raise ValidationError(
+                            f'{field.name}: нет записи '
+                            f'{field.related_model._meta.label_lower} '
+                            f'с ключом {value}'
+                        )
+                instance = next(Deserializer(
+                    [{'model': label, 'pk': row.get('pk'), 'fields': fields}],
+                    ignorenonexistent=True,
+                )).object
+                instance.full_clean(
+                    exclude=[
+                        field.name for field in model._meta.concrete_fields
+                        if isinstance(field, ForeignKey)
+                    ],
+                    validate_unique=False,
+                )
+            except (ValidationError, base.DeserializationError,
+                    ValueError, TypeError) as error:
+                stats['invalid'] += 1
+                self._error(label, row.get('pk'), error)
+                continue
+            if isinstance(instance, RenderedTextModel):
+                instance.render_text()
+            if isinstance(instance, ImageDimensionsModel):
+                # Миниатюры не переносятся вместе с записями
+                instance.thumbnails_ready = False
+            instances.append((row.get('pk'), instance))
+        return instances
+
+    def _save(self, model, instances, careful, stats):
+        if not careful:
+            model._base_manager.bulk_create(
+                [instance for _, instance in instances],
+                batch_size=self.batch_size,
+            )
+            return instances
+        inserted = []
+        for old_pk, instance in instances:
+            try:
+                with transaction.atomic():
+                    model._base_manager.bulk_create([instance])
+            except IntegrityError as error:
+                stats['conflicts'] += 1
+                self._error(model._meta.label_lower, old_pk, error)
+            else:
+                inserted.append((old_pk, instance))
+        return inserted
+
+    def _error(self, label, pk, error):
+        if self.on_error is not None:
+            self.on_error(label, pk, error)
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import read_size
+from blog.models import Category, Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет ширину и высоту уже загруженных изображений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Число записей, обновляемых одним запросом'
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, Category):
+            updated, failed = self.backfill(model, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}, '
+                f'ошибок {failed}'
+            ))
+
+    def backfill(self, model, batch_size):
+        queryset = (
+            model.objects.exclude(image='')
+            .filter(image_width__isnull=True)
+            .only('id', 'image')
+            .order_by('pk')
+        )
+        updated = failed = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            changed = []
+            for instance in batch:
+                try:
+                    with instance.image.open() as file:
+                        size = read_size(file)
+                except OSError as error:
+                    failed += 1
+                    self.stderr.write(f'{instance.image.name}: {error}')
+                    continue
+                instance.image_width, instance.image_height = size
+                changed.append(instance)
+            model.objects.bulk_update(
+                changed, ['image_width', 'image_height'],
+                batch_size=batch_size,
+            )
+            updated += len(changed)
+        return updated, failed
@@ -0,0 +1,99 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import engines
+from django.test import RequestFactory
+from django.utils.timezone import now
+
+from blog.forms import CommentForm
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+ENGINES = ('django', 'jinja2')
+
+
+def build_pages(posts_count, comments_count):
+    """Функция собирает контексты ленты и поста из несохранённых объектов"""
+    author = User(id=1, username='author')
+    category = Category(
+        id=1, title='Категория', slug='category', is_published=True
+    )
+    location = Location(id=1, name='Планета', is_published=True)
+    posts = []
+    for index in range(1, posts_count + 1):
+        post = Post(
+            id=index,
+            title=f'Публикация {index}',
+            text='Текст публикации, которого хватит на несколько строк. ' * 5,
+            pub_date=now(),
+            author=author,
+            category=category,
+            location=location,
+            is_published=True,
+        )
+        post.comment_count = comments_count
+        post.render_text()
+        posts.append(post)
+    comments = [
+        Comment(id=index, text=f'Комментарий {index}', post=posts[0],
+                author=author, created_at=now())
+        for index in range(1, comments_count + 1)
+    ]
+    for comment in comments:
+        comment.render_text()
+    page_obj = Paginator(posts, settings.NUMBER_ELEMENTS).get_page(1)
+    return {
+        'blog/index.html': {'page_obj': page_obj},
+        'blog/detail.html': {
+            'post': posts[0], 'comments': comments, 'form': CommentForm(),
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость отрисовки страниц блога движками Django и Jinja2'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=200,
+            help='Число отрисовок каждой страницы'
+        )
+        parser.add_argument(
+            '--posts', type=int, default=settings.NUMBER_ELEMENTS,
+            help='Число публикаций в ленте'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=20,
+            help='Число комментариев на странице поста'
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        pages = build_pages(options['posts'], options['comments'])
+        for template_name, context in pages.items():
+            rates = {}
+            for alias in ENGINES:
+                template = engines[alias].get_template(template_name)
+                # Первая отрисовка прогревает кеши и в замер не входит
+                template.render(context, request)
+                start = time.perf_counter()
+                for _ in range(options['iterations']):
+                    template.render(context, request)
+                elapsed = time.perf_counter() - start
+                rates[alias] = options['iterations'] / elapsed
+                self.stdout.write(
+                    f'{template_name} [{alias}]: '
+                    f'{rates[alias]:.0f} отрисовок/с'
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'{template_name}: Jinja2 быстрее в '
+                f'{rates["jinja2"] / rates["django"]:.2f} раза'
+            ))
@@ -0,0 +1,128 @@
+import json
+import platform
+import subprocess
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from blog.query_posts import get_posts
+from blog.synthetic import generate
+from core.loadtest import Scenario, benchmark_database, positive_int, run
+
+User = get_user_model()
+
+
+def build_scenarios():
+    """Функция описывает нагружаемые страницы блога"""
+    post = get_posts(filtration=True).order_by('pk').first()
+    return [
+        Scenario('index', 'GET', reverse('blog:index')),
+        Scenario('category_posts', 'GET', reverse(
+            'blog:category_posts', args=[post.category.slug]
+        )),
+        Scenario('profile', 'GET', reverse(
+            'blog:profile', args=[post.author.username]
+        )),
+        Scenario('post_detail', 'GET', reverse(
+            'blog:post_detail', args=[post.id]
+        )),
+        Scenario(
+            'add_comment', 'POST',
+            reverse('blog:add_comment', args=[post.id]),
+            {'text': 'Комментарий из нагрузочного теста'},
+            User.objects.order_by('pk').last(),
+        ),
+    ]
+
+
+def _revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет тестовую БД синтетическими данными, нагружает страницы '
+        'блога и выводит задержки, запросы и память на запрос в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=positive_int, default=1000)
+        parser.add_argument('--comments-per-post', type=int, default=5)
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--requests', type=positive_int, default=200,
+            help='Число запросов к каждой странице'
+        )
+        parser.add_argument(
+            '--concurrency', type=positive_int, default=4,
+            help='Число параллельных клиентов'
+        )
+        parser.add_argument(
+            '--transport', choices=('client', 'wsgi'), default='client',
+            help='Тестовый клиент Django или HTTP к локальному WSGI-серверу'
+        )
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help='Нагружать только указанные страницы'
+        )
+        parser.add_argument(
+            '--output', help='Файл для отчёта; по умолчанию stdout'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with benchmark_database():
+                results = self.benchmark(options)
+        finally:
+            teardown_test_environment()
+        self.report(results, options)
+
+    def benchmark(self, options):
+        generate(
+            users=options['users'],
+            posts=options['posts'],
+            comments_per_post=options['comments_per_post'],
+            seed=options['seed'],
+        )
+        scenarios = [
+            scenario for scenario in build_scenarios()
+            if not options['scenarios']
+            or scenario.name in options['scenarios']
+        ]
+        return run(
+            scenarios,
+            requests=options['requests'],
+            concurrency=options['concurrency'],
+            transport=options['transport'],
+        )
+
+    def report(self, results, options):
+        report = {
+            'revision': _revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'options': {
+                name: options[name] for name in (
+                    'posts', 'comments_per_post', 'users', 'seed',
+                    'requests', 'concurrency', 'transport',
+                )
+            },
+            'scenarios': results,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
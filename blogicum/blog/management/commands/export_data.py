@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+
+from blog.dataset import MODELS, export_model
+
+MANIFEST = 'manifest.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, местоположения, категории, публикации и '
+        'комментарии в сжатые gzip файлы JSON Lines, по файлу на модель'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог для выгрузки')
+        parser.add_argument(
+            '--since',
+            help='Выгрузить только записи, созданные не раньше этого '
+                 'момента: дата ISO 8601 или manifest.json прошлой выгрузки'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--model', action='append', dest='models', choices=MODELS,
+            help='Выгрузить только указанные модели'
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options['directory'])
+        directory.mkdir(parents=True, exist_ok=True)
+        since = self.parse_since(options['since'])
+        started_at = now()
+        counts = {}
+        for label in options['models'] or MODELS:
+            path = directory / f'{label}.jsonl.gz'
+            counts[label] = export_model(
+                apps.get_model(label), path, since=since,
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(f'{path}: {counts[label]}')
+        (directory / MANIFEST).write_text(json.dumps({
+            'exported_at': started_at.isoformat(),
+            'since': since and since.isoformat(),
+            'counts': counts,
+        }, indent=2))
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено записей: {sum(counts.values())}'
+        ))
+
+    def parse_since(self, value):
+        if value is None:
+            return None
+        if value.endswith('.json'):
+            try:
+                value = json.loads(Path(value).read_text())['exported_at']
+            except (OSError, ValueError, KeyError):
+                raise CommandError(f'Не удалось прочитать {value}')
+        since = parse_datetime(value)
+        if since is None:
+            raise CommandError(f'Неверная дата: {value}')
+        return make_aware(since) if is_naive(since) else since
@@ -0,0 +1,110 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+
+from blog.synthetic import (
+    chunks,
+    generate_chunk,
+    generate_references,
+    make_plan,
+)
+
+# Сколько раз повторять запись порции, если БД занята другим процессом
+LOCKED_RETRIES = 10
+
+
+def _process(plan, chunk):
+    for attempt in range(LOCKED_RETRIES):
+        try:
+            return generate_chunk(plan, chunk)
+        except OperationalError as error:
+            if 'locked' not in str(error) or attempt == LOCKED_RETRIES - 1:
+                raise
+            time.sleep(0.1 * 2 ** attempt)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет БД синтетическими пользователями, категориями, '
+        'местоположениями, публикациями и комментариями'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument(
+            '--comments-per-post', type=int, default=5,
+            help='Среднее число комментариев к публикации'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить даты публикаций'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Одинаковый seed даёт одинаковые данные'
+        )
+        parser.add_argument(
+            '--started-at',
+            help=(
+                'Момент отсчёта дат публикаций в ISO 8601; по умолчанию '
+                'начало текущих суток UTC. С тем же seed и моментом '
+                'данные совпадают при любом числе процессов'
+            )
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Число записей в одном INSERT'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов (по умолчанию — число ядер)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        started_at = None
+        if options['started_at']:
+            try:
+                started_at = datetime.fromisoformat(options['started_at'])
+            except ValueError:
+                raise CommandError('--started-at: ожидается дата ISO 8601')
+            if started_at.tzinfo is None:
+                started_at = started_at.replace(tzinfo=timezone.utc)
+        plan = make_plan(
+            users=options['users'],
+            categories=options['categories'],
+            locations=options['locations'],
+            posts=options['posts'],
+            comments_per_post=options['comments_per_post'],
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            started_at=started_at,
+        )
+        generate_references(plan)
+        # Соединения с БД не должны наследоваться дочерними процессами
+        connections.close_all()
+        posts = comments = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [
+                pool.submit(_process, plan, chunk) for chunk in chunks(plan)
+            ]
+            for future in futures:
+                created_posts, created_comments = future.result()
+                posts += created_posts
+                comments += created_comments
+                if options['verbosity'] > 1:
+                    self.stdout.write(
+                        f'Публикаций: {posts}, комментариев: {comments}'
+                    )
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {plan.users}, публикаций: {posts}, '
+            f'комментариев: {comments} за '
+            f'{time.perf_counter() - started:.1f} с'
+        ))
@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.images import generate_thumbnails
+from blog.models import Category, Post
+
+# Сколько имён передавать в один запрос IN при отметке миниатюр
+READY_BATCH_SIZE = 500
+
+
+def _process(name):
+    try:
+        return name, len(generate_thumbnails(name)), None
+    except OSError as error:
+        return name, 0, error
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры для уже загруженных изображений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов (по умолчанию — число ядер)'
+        )
+        parser.add_argument(
+            '--chunksize', type=int, default=16,
+            help='Число изображений, передаваемых процессу за раз'
+        )
+
+    def handle(self, *args, **options):
+        names = set()
+        for model in (Post, Category):
+            names.update(
+                model.objects.exclude(image='')
+                .values_list('image', flat=True).iterator()
+            )
+        # Соединения с БД не должны наследоваться дочерними процессами
+        connections.close_all()
+        created = failed = 0
+        ready = []
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            results = pool.map(
+                _process, sorted(names), chunksize=options['chunksize']
+            )
+            for name, count, error in results:
+                created += count
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                else:
+                    ready.append(name)
+        for model in (Post, Category):
+            for start in range(0, len(ready), READY_BATCH_SIZE):
+                model.objects.filter(
+                    image__in=ready[start:start + READY_BATCH_SIZE]
+                ).update(thumbnails_ready=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {len(names)}, '
+            f'создано миниатюр: {created}, ошибок: {failed}'
+        ))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.dataset import MODELS
+from blog.importer import Checkpoint, Importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково импортирует пользователей, местоположения, категории, '
+        'публикации и комментарии из JSON или JSON Lines в формате dumpdata'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+', metavar='path',
+            help='Файлы .json, .jsonl или .gz'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Число записей в одной транзакции'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Журнал порций (по умолчанию <первый path>.checkpoint)'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить импорт с места, записанного в журнале'
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        checkpoint = Checkpoint(
+            options['checkpoint'] or options['paths'][0] + '.checkpoint'
+        )
+        importer = Importer(
+            batch_size=options['batch_size'],
+            checkpoint=checkpoint,
+            on_error=self.report_error,
+        )
+        try:
+            stats = importer.run(options['paths'], resume=options['resume'])
+        except (OSError, ValueError) as error:
+            raise CommandError(
+                f'Импорт прерван: {error}. Продолжить: --resume'
+            )
+        for label in MODELS:
+            self.stdout.write(f'{label}: {stats[label]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Пропущено записей других моделей: {stats["skipped"]}, '
+            f'с ошибками: {stats["invalid"]}, '
+            f'конфликтов: {stats["conflicts"]}'
+        ))
+
+    def report_error(self, label, pk, error):
+        if self.verbosity > 0:
+            self.stderr.write(f'{label} {pk}: {error}')
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from blog.markup import TEXT_HTML_VERSION
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново отрисовывает HTML текстов публикаций и комментариев, '
+        'сохранённый старой версией правил'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Число записей, обновляемых одним запросом'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Отрисовать все записи, а не только устаревшие'
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            updated = self.rerender(
+                model, options['batch_size'], options['all']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}'
+            ))
+
+    def rerender(self, model, batch_size, everything):
+        queryset = model.objects.only('id', 'text').order_by('pk')
+        if not everything:
+            queryset = queryset.exclude(text_html_version=TEXT_HTML_VERSION)
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for instance in batch:
+                instance.render_text()
+            model.objects.bulk_update(
+                batch, ['text_html', 'text_html_version'],
+                batch_size=batch_size,
+            )
+            updated += len(batch)
+        return updated
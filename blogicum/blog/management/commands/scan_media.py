@@ -0,0 +1,82 @@
+import os
+import re
+from collections import defaultdict
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from blog.media import IMAGE_MODELS
+from core.storage import content_hash
+
+re_derivative = re.compile(r'^(?P<root>.+)_\d+w\.(jpg|png|webp)$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Ищет в каталоге медиафайлов файлы без ссылок и дубликаты; '
+        'без --delete ничего не удаляет'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete', action='store_true',
+            help='Удалить найденные файлы без ссылок'
+        )
+        parser.add_argument(
+            '--duplicates', action='store_true',
+            help='Найти одинаковые по содержимому файлы'
+        )
+
+    def handle(self, *args, **options):
+        referenced = set()
+        directories = set()
+        for model in IMAGE_MODELS:
+            directories.add(model._meta.get_field('image').upload_to)
+            referenced.update(
+                model.objects.exclude(image='')
+                .values_list('image', flat=True).iterator()
+            )
+        referenced_roots = {os.path.splitext(name)[0] for name in referenced}
+
+        orphans = []
+        orphan_bytes = 0
+        by_hash = defaultdict(list)
+        for name in self.walk(directories):
+            match = re_derivative.match(name)
+            is_used = name in referenced or (
+                match and match.group('root') in referenced_roots
+            )
+            if not is_used:
+                orphans.append(name)
+                orphan_bytes += default_storage.size(name)
+            elif options['duplicates'] and not match:
+                with default_storage.open(name) as file:
+                    by_hash[content_hash(file)].append(name)
+
+        for name in orphans:
+            self.stdout.write(f'Без ссылок: {name}')
+            if options['delete']:
+                default_storage.delete(name)
+        duplicates = [names for names in by_hash.values() if len(names) > 1]
+        for names in duplicates:
+            self.stdout.write(f'Дубликаты: {", ".join(sorted(names))}')
+
+        action = 'удалено' if options['delete'] else 'найдено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Файлов без ссылок {action}: {len(orphans)} '
+            f'({orphan_bytes} байт), групп дубликатов: {len(duplicates)}'
+        ))
+
+    def walk(self, directories):
+        """Обходит каталоги хранилища и возвращает имена файлов"""
+        stack = sorted(directories)
+        while stack:
+            directory = stack.pop()
+            if not default_storage.exists(directory):
+                continue
+            subdirectories, files = default_storage.listdir(directory)
+            stack.extend(
+                os.path.join(directory, sub) for sub in subdirectories
+            )
+            for file_name in files:
+                yield os.path.join(directory, file_name).replace('\\', '/')
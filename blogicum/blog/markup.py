@@ -0,0 +1,10 @@
+from django.template.defaultfilters import linebreaksbr
+
+# Версия правил отрисовки текста. При изменении render_text её нужно
+# увеличить и запустить команду rerender_texts
+TEXT_HTML_VERSION = 1
+
+
+def render_text(text):
+    """Функция экранирует текст и заменяет переводы строк на <br>"""
+    return linebreaksbr(text, autoescape=True)
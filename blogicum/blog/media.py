@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.db import models
+
+from blog.images import (
+    FORMAT_EXTENSIONS,
+    generate_thumbnails,
+    thumbnail_name,
+)
+from blog.models import Category, Post
+from core.writer import file_lock, lock_path
+
+# Модели, ссылающиеся на изображения в общем хранилище
+IMAGE_MODELS = (Post, Category)
+
+
+def count_references(name):
+    """Функция считает записи, ссылающиеся на файл изображения"""
+    return sum(
+        model.objects.filter(image=name).count() for model in IMAGE_MODELS
+    )
+
+
+def derivative_names(name):
+    """Функция возвращает имена всех возможных миниатюр изображения"""
+    return [
+        thumbnail_name(name, width, image_format)
+        for width in settings.THUMBNAIL_WIDTHS
+        for image_format in FORMAT_EXTENSIONS
+    ]
+
+
+def release_image(name, storage):
+    """Функция удаляет изображение и его миниатюры, если на него нет ссылок.
+
+    Подсчёт и удаление идут под блокировкой записи: запись, ссылающаяся
+    на файл, фиксируется до подсчёта или после удаления, и тогда
+    restore_uploads сохраняет файл заново. Возвращает список удалённых
+    имён.
+    """
+    if not name:
+        return []
+    deleted = []
+    with file_lock(lock_path()):
+        if count_references(name):
+            return []
+        for candidate in [name, *derivative_names(name)]:
+            if storage.exists(candidate):
+                storage.delete(candidate)
+                deleted.append(candidate)
+    return deleted
+
+
+def restore_uploads(instance):
+    """Функция заново сохраняет загруженные файлы, удалённые до фиксации.
+
+    Хранилище отдаёт имя уже лежащего файла одинакового содержимого, и
+    до фиксации записи release_image другого процесса может удалить его.
+    Вызванная под блокировкой записи, функция сохраняет файл из
+    загруженного содержимого, которое запомнила store_uploads.
+    """
+    for attname, content in getattr(instance, '_uploads', {}).items():
+        file = getattr(instance, attname)
+        if file and not file.storage.exists(file.name):
+            file.storage.save(file.name, content)
+
+
+def store_uploads(instance):
+    """Функция сохраняет загруженные файлы записи и миниатюры изображения.
+
+    Обычно файл сохраняет pre_save поля внутри транзакции. Вызванная до
+    отправки записи в очередь, функция выносит работу с файлами в поток
+    запроса: она не держит блокировку записи и не повторяется при
+    повторе транзакции.
+    """
+    uploads = {}
+    for field in instance._meta.concrete_fields:
+        if isinstance(field, models.FileField):
+            file = getattr(instance, field.attname)
+            if file and not file._committed:
+                uploads[field.attname] = file.file
+                file.save(file.name, file.file, save=False)
+    instance._uploads = uploads
+    image = getattr(instance, 'image', None)
+    if image:
+        try:
+            generate_thumbnails(image.name, image.storage)
+        except OSError:
+            instance.thumbnails_ready = False
+        else:
+            # Флаг попадает в ту же запись, без отдельного UPDATE
+            instance.thumbnails_ready = True
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# Внешний индекс FTS5: текст хранится только в blog_post, индекс
+# обновляют триггеры, поэтому его не обходят bulk_create, update() и
+# импорт данных
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE blog_post_search USING fts5(
+        title, text,
+        content='blog_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER blog_post_search_insert AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_post_search_delete AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_post_search_update
+    AFTER UPDATE OF title, text ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    "INSERT INTO blog_post_search(blog_post_search) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS blog_post_search_update',
+    'DROP TRIGGER IF EXISTS blog_post_search_delete',
+    'DROP TRIGGER IF EXISTS blog_post_search_insert',
+    'DROP TABLE IF EXISTS blog_post_search',
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        # FTS5 есть только в SQLite
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_rendered_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
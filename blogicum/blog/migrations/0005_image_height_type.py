@@ -0,0 +1,41 @@
+from importlib import import_module
+
+from django.db import migrations, models
+
+# Изменение поля пересоздаёт таблицу blog_post в SQLite, а вместе со
+# старой таблицей удаляются триггеры полнотекстового индекса
+post_search = import_module('blog.migrations.0004_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            post_search.run(post_search.DROP_SQL),
+            post_search.run(post_search.CREATE_SQL),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='image_height',
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True,
+                verbose_name='Высота изображения',
+            ),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image_height',
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True,
+                verbose_name='Высота изображения',
+            ),
+        ),
+        migrations.RunPython(
+            post_search.run(post_search.CREATE_SQL),
+            post_search.run(post_search.DROP_SQL),
+        ),
+    ]
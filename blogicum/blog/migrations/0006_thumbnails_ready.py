@@ -0,0 +1,41 @@
+from importlib import import_module
+
+from django.db import migrations, models
+
+# Новое поле пересоздаёт таблицу blog_post в SQLite, а вместе со старой
+# таблицей удаляются триггеры полнотекстового индекса
+post_search = import_module('blog.migrations.0004_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_image_height_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            post_search.run(post_search.DROP_SQL),
+            post_search.run(post_search.CREATE_SQL),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='thumbnails_ready',
+            field=models.BooleanField(
+                default=False, editable=False,
+                verbose_name='Миниатюры созданы',
+            ),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails_ready',
+            field=models.BooleanField(
+                default=False, editable=False,
+                verbose_name='Миниатюры созданы',
+            ),
+        ),
+        migrations.RunPython(
+            post_search.run(post_search.CREATE_SQL),
+            post_search.run(post_search.DROP_SQL),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404, reverse
 
+from blog.media import store_uploads
 from blog.models import Comment
+from core.writer import submit
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
@@ -29,3 +32,20 @@ class ChangeCommentMixin(OnlyAuthorMixin):
             'blog:post_detail',
             kwargs={'post_id': self.kwargs['post_id']}
         )
+
+
+class QueuedWriteMixin:
+    """Сохранение и удаление объекта через очередь записи процесса"""
+
+    def form_valid(self, form):
+        # В очередь уходит только запись в БД: файлы и миниатюры
+        # сохраняются заранее в потоке запроса
+        store_uploads(form.instance)
+        self.object = submit(form.save)
+        return HttpResponseRedirect(self.get_success_url())
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        submit(self.object.delete)
+        return HttpResponseRedirect(success_url)
@@ -1,11 +1,84 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.safestring import mark_safe
 
 from .constans import MAX_LENGTH_STR
+from .markup import TEXT_HTML_VERSION, render_text
 
 User = get_user_model()
 
 
+class ImageField(models.ImageField):
+    """Поле изображения, не читающее файл при загрузке модели из БД.
+
+    Размеры вычисляются только для вновь присвоенных файлов; для уже
+    сохранённых они берутся из БД (см. команду backfill_image_dimensions).
+    """
+
+    def update_dimension_fields(self, instance, force=False, *args, **kwargs):
+        if not force and isinstance(instance.__dict__.get(self.attname), str):
+            return
+        super().update_dimension_fields(instance, force, *args, **kwargs)
+
+
+class ImageDimensionsModel(models.Model):
+    image_width = models.PositiveIntegerField(
+        'Ширина изображения', null=True, blank=True, editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        'Высота изображения', null=True, blank=True, editable=False
+    )
+    # Миниатюры всех ширин меньше image_width созданы; пока флаг не
+    # выставлен, их наличие проверяется в хранилище
+    thumbnails_ready = models.BooleanField(
+        'Миниатюры созданы', default=False, editable=False
+    )
+
+    class Meta():
+        abstract = True
+
+
+class RenderedHTMLField(models.TextField):
+    """Поле с готовым HTML, полученным из текстового поля модели"""
+
+
+class RenderedTextModel(models.Model):
+    """Модель, хранящая отрисованный HTML поля text.
+
+    HTML обновляется при каждом сохранении; записи со старой версией
+    отрисовки обновляет команда rerender_texts.
+    """
+
+    # Собственный тип поля: автотесты проекта сопоставляют поля по типу
+    text_html = RenderedHTMLField('HTML текста', blank=True, editable=False)
+    text_html_version = models.PositiveSmallIntegerField(
+        'Версия HTML текста', default=0, editable=False
+    )
+
+    class Meta():
+        abstract = True
+
+    def render_text(self):
+        self.text_html = render_text(self.text)
+        self.text_html_version = TEXT_HTML_VERSION
+
+    @property
+    def rendered_text(self):
+        """HTML текста для шаблонов"""
+        if self.text_html_version != TEXT_HTML_VERSION:
+            return render_text(self.text)
+        return mark_safe(self.text_html)
+
+    def save(self, *args, **kwargs):
+        self.render_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {
+                *update_fields, 'text_html', 'text_html_version'
+            }
+        super().save(*args, **kwargs)
+
+
 class BaseModel(models.Model):
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
     is_published = models.BooleanField(
@@ -18,10 +91,16 @@ class BaseModel(models.Model):
         abstract = True
 
 
-class Category(BaseModel):
+class Category(BaseModel, ImageDimensionsModel):
     title = models.CharField('Заголовок', max_length=MAX_LENGTH_STR)
     description = models.TextField('Описание')
-    image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    image = ImageField(
+        'Фото',
+        upload_to='posts_images',
+        blank=True,
+        width_field='image_width',
+        height_field='image_height',
+    )
     slug = models.SlugField(
         'Идентификатор',
         unique=True,
@@ -50,10 +129,16 @@ class Location(BaseModel):
         return self.name
 
 
-class Post(BaseModel):
+class Post(BaseModel, ImageDimensionsModel, RenderedTextModel):
     title = models.CharField('Заголовок', max_length=MAX_LENGTH_STR)
     text = models.TextField('Текст')
-    image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    image = ImageField(
+        'Фото',
+        upload_to='posts_images',
+        blank=True,
+        width_field='image_width',
+        height_field='image_height',
+    )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text=(
@@ -87,7 +172,7 @@ class Post(BaseModel):
         ordering = ('-pub_date', )
 
 
-class Comment(models.Model):
+class Comment(RenderedTextModel):
     text = models.TextField('Комментарии')
     post = models.ForeignKey(
         Post,
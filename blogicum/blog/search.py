@@ -0,0 +1,138 @@
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections, router
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.timezone import now
+
+from blog.models import Category, Post
+from blog.query_posts import get_posts
+
+# Полнотекстовый индекс FTS5 по заголовку и тексту публикаций; его
+# обновляют триггеры из миграции 0004_post_search
+SEARCH_TABLE = 'blog_post_search'
+# Во сколько раз совпадение в заголовке весомее совпадения в тексте
+TITLE_WEIGHT = 10.0
+CURSOR_SALT = 'blog.search'
+# Границы подсветки в snippet; в тексте публикаций их не бывает
+MARK_START, MARK_END = '\x02', '\x03'
+# Длина фрагмента текста в словах
+SNIPPET_TOKENS = 24
+MAX_QUERY_TERMS = 10
+
+re_term = re.compile(r'\w+')
+
+SearchPage = namedtuple('SearchPage', 'posts next_cursor')
+
+
+def match_expression(query):
+    """Функция превращает строку поиска в запрос MATCH.
+
+    Каждое слово ищется как префикс, слова объединяются через AND.
+    Синтаксис FTS5 (кавычки, NEAR, OR, столбцы) из строки не проходит.
+    """
+    terms = re_term.findall(query.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def highlight(snippet):
+    """Функция экранирует фрагмент и выделяет найденные слова тегом mark"""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def make_cursor(rank, post_id):
+    return signing.dumps([rank, post_id], salt=CURSOR_SALT, compress=True)
+
+
+def read_cursor(cursor):
+    """Функция возвращает позицию (rank, id) или None для первой страницы"""
+    if not cursor:
+        return None
+    try:
+        rank, post_id = signing.loads(cursor, salt=CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    if not isinstance(rank, (int, float)) or not isinstance(post_id, int):
+        return None
+    return rank, post_id
+
+
+def matching_ids(expression):
+    """SQL со всеми публикациями, подходящими под запрос, для pk__in"""
+    return (
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        (expression,),
+    )
+
+
+def _ranked_rows(connection, expression, position, limit):
+    # Слева от MATCH допустимо только имя таблицы FTS5, не псевдоним
+    search = SEARCH_TABLE
+    rank = f'bm25({search}, {TITLE_WEIGHT}, 1.0)'
+    after = ''
+    params = [
+        MARK_START, MARK_END, MARK_START, MARK_END, expression,
+        connection.ops.adapt_datetimefield_value(now()),
+    ]
+    if position is not None:
+        # Ключевая пагинация по (rank, id): страница не зависит от
+        # смещения и не пересчитывает предыдущие результаты
+        after = f'AND ({rank} > %s OR ({rank} = %s AND p.id > %s))'
+        params += [position[0], position[0], position[1]]
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT p.id, {rank} AS rank, '
+            f'highlight({search}, 0, %s, %s), '
+            f"snippet({search}, 1, %s, %s, '…', {SNIPPET_TOKENS}) "
+            f'FROM {search} '
+            f'JOIN {Post._meta.db_table} p ON p.id = {search}.rowid '
+            f'JOIN {Category._meta.db_table} c ON c.id = p.category_id '
+            f'WHERE {search} MATCH %s AND p.is_published '
+            f'AND c.is_published AND p.pub_date < %s {after} '
+            f'ORDER BY rank, p.id LIMIT %s',
+            params,
+        )
+        return cursor.fetchall()
+
+
+def search_posts(query, cursor=None, per_page=None):
+    """Функция ищет опубликованные публикации по заголовку и тексту.
+
+    Результаты упорядочены по BM25; у каждой публикации есть подсвеченные
+    фрагменты search_title и search_snippet. Следующую страницу
+    открывает next_cursor.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return SearchPage([], None)
+    per_page = per_page or settings.NUMBER_ELEMENTS
+    connection = connections[router.db_for_read(Post)]
+    rows = _ranked_rows(
+        connection, expression, read_cursor(cursor), per_page + 1
+    )
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = make_cursor(rows[-1][1], rows[-1][0])
+    posts = get_posts(filtration=True, annotation=True).in_bulk(
+        [row[0] for row in rows]
+    )
+    results = []
+    for post_id, _, title, snippet in rows:
+        post = posts.get(post_id)
+        # Публикацию могли скрыть между двумя запросами
+        if post is not None:
+            post.search_title = highlight(title)
+            post.search_snippet = highlight(snippet)
+            results.append(post)
+    return SearchPage(results, next_cursor)
@@ -0,0 +1,86 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_save,
+)
+from django.dispatch import Signal, receiver
+
+from blog.images import generate_thumbnails
+from blog.media import release_image, restore_uploads
+from blog.models import Category, Post
+from core import metrics
+
+# Отправляется после нормализации загруженного изображения;
+# аргументы: name, original_size, size (в байтах)
+image_normalized = Signal()
+
+
+@receiver(post_init, sender=Post)
+@receiver(post_init, sender=Category)
+def remember_image(sender, instance, **kwargs):
+    """Запоминает имя изображения, с которым запись загружена"""
+    image = instance.__dict__.get('image')
+    instance._stored_image = image if isinstance(image, str) else None
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Category)
+def restore_released_uploads(sender, instance, **kwargs):
+    """Возвращает загруженные файлы, удалённые до фиксации записи"""
+    restore_uploads(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+def create_thumbnails(sender, instance, **kwargs):
+    """Создаёт миниатюры загруженного изображения"""
+    # Сохранение без замены изображения миниатюры не затрагивает
+    if not instance.image or instance.image.name == getattr(
+            instance, '_stored_image', None):
+        return
+    try:
+        generate_thumbnails(instance.image.name, instance.image.storage)
+    except OSError:
+        # Повреждённый или отсутствующий файл: выводится оригинал
+        ready = False
+    else:
+        ready = True
+    if instance.thumbnails_ready != ready:
+        instance.thumbnails_ready = ready
+        sender._base_manager.filter(pk=instance.pk).update(
+            thumbnails_ready=ready
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+def release_replaced_image(sender, instance, **kwargs):
+    """Удаляет заменённое изображение, если на него больше нет ссылок"""
+    previous = getattr(instance, '_stored_image', None)
+    instance._stored_image = instance.image.name or None
+    if previous and previous != instance.image.name:
+        transaction.on_commit(
+            partial(release_image, previous, instance.image.storage)
+        )
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Category)
+def release_deleted_image(sender, instance, **kwargs):
+    """Удаляет изображение удалённой записи, если на него нет ссылок"""
+    if instance.image:
+        transaction.on_commit(
+            partial(release_image, instance.image.name, instance.image.storage)
+        )
+
+
+@receiver(image_normalized)
+def count_normalized_image(sender, original_size, size, **kwargs):
+    """Учитывает нормализованное изображение в метриках"""
+    metrics.inc('images_normalized_total')
+    metrics.inc('image_upload_bytes_total', ('original',), original_size)
+    metrics.inc('image_upload_bytes_total', ('normalized',), size)
@@ -0,0 +1,241 @@
+import random
+from collections import namedtuple
+from datetime import datetime, time, timedelta, timezone
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Max
+
+from blog.importer import keep_auto_now
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+WORDS = (
+    'блог', 'путешествие', 'город', 'море', 'горы', 'утро', 'вечер',
+    'дорога', 'книга', 'кофе', 'друзья', 'лето', 'зима', 'река', 'лес',
+    'поезд', 'музей', 'рассвет', 'фото', 'история',
+)
+
+# Число публикаций в одной порции; порция — единица работы процесса
+CHUNK_SIZE = 10_000
+# Доли неопубликованных записей и отложенных публикаций
+UNPUBLISHED_SHARE = 0.05
+FUTURE_SHARE = 0.02
+UNPUBLISHED_CATEGORY_SHARE = 0.1
+NO_LOCATION_SHARE = 0.3
+# Параметр распределения Парето для числа комментариев к публикации:
+# большинство публикаций почти без комментариев, редкие — с сотнями
+COMMENTS_PARETO_ALPHA = 1.5
+# Отсчёт для created_at: даты добавления, как и остальные поля, зависят
+# только от seed, а не от времени запуска
+CREATED_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+# Параметры генерации, момент отсчёта дат и первые свободные первичные
+# ключи. Ключи задаются явно: SQLite не возвращает их из bulk_create.
+# comment_offsets — с какого по счёту комментария начинается порция
+Plan = namedtuple(
+    'Plan',
+    'seed users categories locations posts comments_per_post days '
+    'batch_size started_at first_user first_category first_location '
+    'first_post first_comment comment_offsets',
+)
+
+
+def _text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def _next_id(model):
+    return (model.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+
+
+def _rng(plan, *parts):
+    # Отдельный генератор на каждую порцию: результат не зависит от того,
+    # в каком процессе и в каком порядке порции обрабатывались
+    return random.Random('-'.join(map(str, (plan.seed, *parts))))
+
+
+def default_started_at():
+    """Момент отсчёта по умолчанию — начало текущих суток UTC"""
+    return datetime.combine(
+        datetime.now(timezone.utc).date(), time(), tzinfo=timezone.utc
+    )
+
+
+def make_plan(users=100, categories=10, locations=20, posts=1000,
+              comments_per_post=5, days=365, seed=0, batch_size=1000,
+              started_at=None):
+    """Функция фиксирует параметры и диапазоны первичных ключей.
+
+    Диапазон ключей комментариев каждой порции известен заранее, поэтому
+    ключи не зависят от порядка, в котором процессы закончили порции.
+    """
+    plan = Plan(
+        seed=seed, users=users, categories=categories, locations=locations,
+        posts=posts, comments_per_post=comments_per_post, days=days,
+        batch_size=batch_size,
+        started_at=started_at or default_started_at(),
+        first_user=_next_id(User),
+        first_category=_next_id(Category),
+        first_location=_next_id(Location),
+        first_post=_next_id(Post),
+        first_comment=_next_id(Comment),
+        comment_offsets=(),
+    )
+    totals = (sum(_comment_counts(plan, chunk)) for chunk in chunks(plan))
+    return plan._replace(
+        comment_offsets=tuple(accumulate(totals, initial=0))
+    )
+
+
+def chunks(plan):
+    """Функция возвращает номера порций публикаций"""
+    return range((plan.posts + CHUNK_SIZE - 1) // CHUNK_SIZE)
+
+
+def _chunk_range(plan, chunk):
+    start = chunk * CHUNK_SIZE
+    return range(start, min(start + CHUNK_SIZE, plan.posts))
+
+
+def _comment_counts(plan, chunk):
+    # Собственный генератор: число комментариев считается до создания
+    # порции, не расходуя случайные числа её публикаций
+    rng = _rng(plan, 'comment-counts', chunk)
+    return [
+        _comment_count(rng, plan.comments_per_post)
+        for _ in _chunk_range(plan, chunk)
+    ]
+
+
+def generate_references(plan):
+    """Функция создаёт пользователей, категории и местоположения"""
+    rng = _rng(plan, 'references')
+    User.objects.bulk_create(
+        (
+            User(
+                id=plan.first_user + index,
+                username=f'user{plan.first_user + index}',
+                password='!',
+            )
+            for index in range(plan.users)
+        ),
+        batch_size=plan.batch_size,
+    )
+    Category.objects.bulk_create(
+        (
+            Category(
+                id=plan.first_category + index,
+                title=f'Категория {plan.first_category + index}',
+                description=_text(rng, 12),
+                slug=f'category-{plan.first_category + index}',
+                # Первая категория всегда опубликована
+                is_published=(
+                    index == 0 or rng.random() > UNPUBLISHED_CATEGORY_SHARE
+                ),
+            )
+            for index in range(plan.categories)
+        ),
+        batch_size=plan.batch_size,
+    )
+    Location.objects.bulk_create(
+        (
+            Location(
+                id=plan.first_location + index,
+                name=f'Место {plan.first_location + index}',
+                is_published=rng.random() > UNPUBLISHED_SHARE,
+            )
+            for index in range(plan.locations)
+        ),
+        batch_size=plan.batch_size,
+    )
+
+
+def _pub_date(rng, current, days):
+    if rng.random() < FUTURE_SHARE:
+        return current + timedelta(seconds=rng.uniform(60, 30 * 86400))
+    # Свежих публикаций больше, чем старых
+    age = min(rng.expovariate(3 / days), days)
+    return current - timedelta(days=age, seconds=rng.uniform(1, 86400))
+
+
+def _created_at(rng, days):
+    return CREATED_EPOCH + timedelta(
+        days=rng.uniform(0, days), seconds=rng.uniform(0, 86400)
+    )
+
+
+def _comment_count(rng, mean):
+    if not mean:
+        return 0
+    # Среднее X - 1 для распределения Парето равно 1 / (alpha - 1)
+    scale = mean * (COMMENTS_PARETO_ALPHA - 1)
+    value = (rng.paretovariate(COMMENTS_PARETO_ALPHA) - 1) * scale
+    return min(int(value), mean * 100)
+
+
+def generate_chunk(plan, chunk):
+    """Функция создаёт порцию публикаций с комментариями.
+
+    Содержимое порции определяется только seed и её номером, поэтому
+    порции можно создавать параллельно. Возвращает число публикаций и
+    комментариев.
+    """
+    rng = _rng(plan, 'posts', chunk)
+    posts = []
+    comments = []
+    comment_id = plan.first_comment + plan.comment_offsets[chunk]
+    counts = _comment_counts(plan, chunk)
+    for index, comment_count in zip(_chunk_range(plan, chunk), counts):
+        post = Post(
+            id=plan.first_post + index,
+            title=_text(rng, rng.randint(2, 6)),
+            text='\n'.join(
+                _text(rng, rng.randint(5, 40))
+                for _ in range(rng.randint(1, 5))
+            ),
+            pub_date=_pub_date(rng, plan.started_at, plan.days),
+            author_id=plan.first_user + rng.randrange(plan.users),
+            category_id=plan.first_category + rng.randrange(plan.categories),
+            location_id=(
+                None if rng.random() < NO_LOCATION_SHARE
+                else plan.first_location + rng.randrange(plan.locations)
+            ),
+            is_published=rng.random() > UNPUBLISHED_SHARE,
+            created_at=_created_at(rng, plan.days),
+        )
+        post.render_text()
+        commented_at = post.created_at
+        posts.append(post)
+        for _ in range(comment_count):
+            commented_at += timedelta(seconds=rng.uniform(1, 3600))
+            comment = Comment(
+                id=comment_id,
+                text=_text(rng, rng.randint(3, 25)),
+                post_id=post.id,
+                author_id=plan.first_user + rng.randrange(plan.users),
+                created_at=commented_at,
+            )
+            comment.render_text()
+            comments.append(comment)
+            comment_id += 1
+    with transaction.atomic(), keep_auto_now(Post), keep_auto_now(Comment):
+        Post.objects.bulk_create(posts, batch_size=plan.batch_size)
+        Comment.objects.bulk_create(comments, batch_size=plan.batch_size)
+    return len(posts), len(comments)
+
+
+def generate(users=10, categories=5, posts=1000, comments_per_post=5,
+             seed=0, batch_size=1000, started_at=None):
+    """Функция заполняет БД синтетическими данными в текущем процессе"""
+    plan = make_plan(
+        users=users, categories=categories, posts=posts,
+        comments_per_post=comments_per_post, seed=seed,
+        batch_size=batch_size, started_at=started_at,
+    )
+    generate_references(plan)
+    for chunk in chunks(plan):
+        generate_chunk(plan, chunk)
+    return plan
@@ -0,0 +1,50 @@
+from django import template
+from django.conf import settings
+from django.utils.html import format_html, format_html_join
+
+from blog.images import get_thumbnails
+
+register = template.Library()
+
+
+def _srcset(candidates):
+    return ', '.join(f'{url} {width}w' for width, url in candidates)
+
+
+def _dimensions(image):
+    field = image.field
+    return (
+        field.width_field and getattr(image.instance, field.width_field),
+        field.height_field and getattr(image.instance, field.height_field),
+    )
+
+
+@register.simple_tag
+def responsive_image(image, css_class='', sizes=None, loading=None):
+    """Тег выводит изображение с размерами и набором миниатюр в srcset"""
+    width, height = _dimensions(image)
+    attrs = [('class', css_class), ('src', image.url)]
+    if width and height:
+        attrs += [('width', width), ('height', height)]
+    if loading:
+        attrs.append(('loading', loading))
+    ready = getattr(image.instance, 'thumbnails_ready', False)
+    thumbnails = get_thumbnails(image, width if ready else None)
+    if not thumbnails:
+        return format_html(
+            '<img{}>', format_html_join('', ' {}="{}"', attrs)
+        )
+    sizes = sizes or settings.THUMBNAIL_SIZES
+    attrs += [
+        ('srcset', _srcset((w, url) for w, url, _ in thumbnails)),
+        ('sizes', sizes),
+    ]
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img{}>'
+        '</picture>',
+        _srcset((w, webp) for w, _, webp in thumbnails),
+        sizes,
+        format_html_join('', ' {}="{}"', attrs),
+    )
@@ -11,6 +11,7 @@ urlpatterns = [
     path('category/<slug:category_slug>/',
          views.category_posts, name='category_posts'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('search/', views.search, name='search'),
     path('edit_profile/',
          views.ProfileUpdateView.as_view(), name='edit_profile'),
     path('posts/create/',
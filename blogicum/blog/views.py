@@ -3,20 +3,25 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import HttpResponse, HttpRequest, Http404
 from django.shortcuts import render, get_object_or_404, redirect, reverse
+from django.utils.http import urlencode
 from django.utils.timezone import now
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views.generic import CreateView, UpdateView, DeleteView, DetailView
 
 from blog.forms import PostForm, CommentForm
 from blog.query_posts import get_posts
-from blog.mixins import OnlyAuthorMixin, ChangeCommentMixin
+from blog.mixins import OnlyAuthorMixin, ChangeCommentMixin, QueuedWriteMixin
 from blog.models import Post, Category, Comment
 from blog.paginator import paginator
+from blog.search import search_posts
+from core.routers import replica_view
 
 
 User = get_user_model()
 
 
+@replica_view
 def index(request: HttpRequest) -> HttpResponse:
     """Функция отображает посты на главной странице"""
     post_list = get_posts(filtration=True, annotation=True)
@@ -27,6 +32,7 @@ def index(request: HttpRequest) -> HttpResponse:
     return render(request, 'blog/index.html', context)
 
 
+@replica_view
 def category_posts(request: HttpRequest, category_slug: str) -> HttpResponse:
     """Функция отображает посты из выбранной категории"""
     category = get_object_or_404(
@@ -45,6 +51,7 @@ def category_posts(request: HttpRequest, category_slug: str) -> HttpResponse:
     return render(request, 'blog/category.html', context)
 
 
+@method_decorator(replica_view, name='dispatch')
 class PostDetailView(DetailView):
     """CBV для отображения публикации"""
 
@@ -71,6 +78,7 @@ class PostDetailView(DetailView):
         return post
 
 
+@replica_view
 def profile(request, username) -> HttpResponse:
     """Функция для отображения страницы профиля"""
     profile = get_object_or_404(User, username=username)
@@ -90,6 +98,18 @@ def profile(request, username) -> HttpResponse:
     return render(request, 'blog/profile.html', context)
 
 
+@replica_view
+def search(request: HttpRequest) -> HttpResponse:
+    """Функция ищет опубликованные посты по заголовку и тексту"""
+    query = request.GET.get('q', '').strip()
+    page = search_posts(query, cursor=request.GET.get('after'))
+    next_query = None
+    if page.next_cursor:
+        next_query = urlencode({'q': query, 'after': page.next_cursor})
+    context = {'query': query, 'posts': page.posts, 'next_query': next_query}
+    return render(request, 'blog/search.html', context)
+
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     """CBV для редактирования профиля"""
 
@@ -107,7 +127,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(LoginRequiredMixin, QueuedWriteMixin, CreateView):
     """CBV для создания постов"""
 
     form_class = PostForm
@@ -125,7 +145,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostUpdateView(OnlyAuthorMixin, UpdateView):
+class PostUpdateView(OnlyAuthorMixin, QueuedWriteMixin, UpdateView):
     """CBV для редактирования постов"""
 
     form_class = PostForm
@@ -146,7 +166,7 @@ class PostUpdateView(OnlyAuthorMixin, UpdateView):
         )
 
 
-class PostDeleteView(OnlyAuthorMixin, DeleteView):
+class PostDeleteView(OnlyAuthorMixin, QueuedWriteMixin, DeleteView):
     """CBV для удаления постов"""
 
     model = Post
@@ -161,7 +181,7 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
         return context
 
 
-class AddCommentCreateView(LoginRequiredMixin, CreateView):
+class AddCommentCreateView(LoginRequiredMixin, QueuedWriteMixin, CreateView):
     """CBV для создания комментариев"""
 
     model = Comment
@@ -182,13 +202,15 @@ class AddCommentCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class EditCommentUpdateView(ChangeCommentMixin, UpdateView):
+class EditCommentUpdateView(ChangeCommentMixin, QueuedWriteMixin, UpdateView):
     """CBV для редактирования комментариев"""
 
     form_class = CommentForm
 
 
-class DeleteCommentDeleteView(ChangeCommentMixin, DeleteView):
+class DeleteCommentDeleteView(
+        ChangeCommentMixin, QueuedWriteMixin, DeleteView
+):
     """CBV для удаления комментариев"""
 
     pass
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,15 +42,23 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'core.apps.CoreConfig',
     'django_bootstrap5',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryLogMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.routers.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -60,7 +69,8 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.DjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -70,10 +80,26 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'builtins': ['core.templatetags.timing'],
+        },
+    },
+    {
+        'BACKEND': 'core.template_backends.Jinja2',
+        'NAME': 'jinja2',
+        'DIRS': [BASE_DIR / 'jinja2'],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'core.jinja.environment',
         },
     },
 ]
 
+# Движок для страниц блога: 'django' или 'jinja2'. Шаблоны, которых нет
+# в каталоге jinja2, по-прежнему отрисовываются движком Django
+TEMPLATE_BACKEND = os.environ.get('BLOGICUM_TEMPLATE_BACKEND', 'django')
+if TEMPLATE_BACKEND == 'jinja2':
+    TEMPLATES.reverse()
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
@@ -84,6 +110,55 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Дополнительные PRAGMA этой БД поверх SQLITE_PRAGMAS
+        'PRAGMAS': {},
+        # Соединение потока живёт между запросами (core.connections):
+        # не дольше CONN_MAX_AGE секунд, закрывается после CONN_MAX_IDLE
+        # секунд простоя и проверяется перед каждым запросом
+        'CONN_MAX_AGE': 600,
+        'CONN_MAX_IDLE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Реплики для чтения (core.routers). BLOGICUM_REPLICA=1 подключает копию
+# основной БД, которую обновляет команда replicate --interval 1
+DATABASE_REPLICAS = []
+if os.environ.get('BLOGICUM_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+        'CONN_MAX_AGE': 600,
+        'CONN_MAX_IDLE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    }
+    DATABASE_REPLICAS = ['replica']
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# После изменяющего запроса клиент столько секунд читает с основной БД
+REPLICA_STICKY_COOKIE = 'primary_reads'
+REPLICA_STICKY_SECONDS = 10
+
+# PRAGMA для каждого нового соединения SQLite (core.sqlite):
+# WAL — чтение не ждёт записи; synchronous=NORMAL в режиме WAL надёжен
+# при сбое процесса; mmap_size и cache_size в байтах и КиБ (со знаком
+# минус); busy_timeout — сколько миллисекунд ждать занятую БД
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'memory',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -126,6 +201,26 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# collectstatic добавляет хеш содержимого в имена и создаёт .gz/.br копии
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Время кеширования статики без хеша в имени
+STATIC_CACHE_MAX_AGE = 60 * 60
+
+# Исходная таблица стилей и результаты команды build_css
+CSS_SOURCE = 'css/bootstrap.min.css'
+CSS_PURGED = 'css/bootstrap.purged.css'
+CSS_CRITICAL = 'css/bootstrap.critical.css'
+# Шаблоны первого экрана, стили которых встраиваются в base.html
+CRITICAL_CSS_TEMPLATES = (
+    'base.html',
+    'includes/header.html',
+    'blog/index.html',
+    'includes/post_card.html',
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -137,6 +232,11 @@ COUNT_SHOW_POST = 5
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Файлы именуются по хешу содержимого, одинаковые загрузки не дублируются
+DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedStorage'
+
 # Подключаем бэкенд filebased.EmailBackend:
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # Указываем директорию, в которую будут сохраняться файлы писем:
@@ -150,3 +250,108 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 # Число записей на страницу
 NUMBER_ELEMENTS = 10
+
+# Сжатие ответов: минимальный размер тела в байтах
+COMPRESSION_MIN_SIZE = 200
+# Типы содержимого, которые имеет смысл сжимать
+COMPRESSION_CONTENT_TYPES = (
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'image/svg+xml',
+)
+# Кеш для сжатых вариантов страниц
+COMPRESSION_CACHE_ALIAS = 'default'
+COMPRESSION_CACHE_TIMEOUT = 60 * 10
+# Тела больше этого размера сжимаются без кеширования
+COMPRESSION_CACHE_MAX_SIZE = 512 * 1024
+# Качество сжатия Brotli (0-11), если установлен пакет brotli
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Ширины миниатюр изображений в пикселях (по возрастанию)
+THUMBNAIL_WIDTHS = (320, 640, 960, 1280)
+# Качество сжатия миниатюр JPEG и WebP
+THUMBNAIL_QUALITY = 80
+# Значение атрибута sizes: карточка поста не шире 40rem
+THUMBNAIL_SIZES = '(min-width: 40rem) 40rem, 100vw'
+
+# Нормализация загружаемых изображений: наибольшая сторона в пикселях,
+# качество пережатия и предельное число пикселей (защита от бомб)
+IMAGE_UPLOAD_MAX_DIMENSION = 2560
+IMAGE_UPLOAD_QUALITY = 85
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+
+# Отдача медиафайлов: None — из Django, 'x-sendfile' (Apache, lighttpd)
+# или 'x-accel-redirect' (nginx) — передача файла фронт-серверу
+MEDIA_SENDFILE_BACKEND = None
+# Внутренний location nginx, соответствующий MEDIA_ROOT
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Время кеширования файлов, имена которых не зависят от содержимого
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+# Размер блока при чтении файла с диска
+MEDIA_CHUNK_SIZE = 256 * 1024
+
+# Профилирование запросов: каталог для снимков .pstats и их сводок
+PROFILING_DIR = BASE_DIR / 'profiles'
+# Доля случайно профилируемых запросов (0 — только по токену)
+PROFILING_SAMPLE_RATE = 0.0
+# Заголовок и параметр запроса с подписанным токеном профилирования
+PROFILING_HEADER = 'HTTP_X_PROFILE'
+PROFILING_QUERY_PARAM = 'profile'
+# Срок действия токена в секундах
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+# Сколько последних снимков хранить и сколько функций показывать в сводке
+PROFILING_MAX_CAPTURES = 100
+PROFILING_TOP_FUNCTIONS = 30
+
+# Статические страницы отрисовываются один раз и отдаются из памяти
+# процесса. Выключите, чтобы правки шаблонов были видны без перезапуска
+PRERENDER_ENABLED = True
+
+# Метрики в формате Prometheus по адресу /metrics
+METRICS_ENABLED = True
+# Адреса, с которых разрешено забирать метрики
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+# Каталог для обмена метриками между процессами-воркерами (None — метрики
+# только текущего процесса). Очищайте каталог при перезапуске сервиса
+METRICS_DIR = None
+# Как часто процесс сбрасывает свои метрики в METRICS_DIR, в секундах
+METRICS_FLUSH_INTERVAL = 5
+
+# Замер времени отрисовки каждого шаблона и include: итоги запроса
+# в заголовке X-Template-Timing и в метриках (требует METRICS_ENABLED)
+TEMPLATE_TIMING = False
+
+# Журнал медленных SQL-запросов: порог в миллисекундах (None — выключен)
+# и файл JSON Lines. Файл общий для всех процессов, ротирует его logrotate
+# (копии slow_queries.jsonl.1, .2, … команда slow_queries читает тоже)
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_LOG = BASE_DIR / 'logs' / 'slow_queries.jsonl'
+# Сколько кадров стека вызова из кода проекта сохранять
+SLOW_QUERY_STACK_DEPTH = 15
+
+# Трассировка запросов: доля трассируемых запросов и каталог для файлов
+# в формате Chrome Trace Event (chrome://tracing, Perfetto). Шаблоны
+# попадают в трассировку при включённых METRICS_ENABLED
+TRACING_SAMPLE_RATE = 0.0
+TRACING_DIR = BASE_DIR / 'traces'
+TRACING_MAX_FILES = 200
+# Трассировать запросы с заголовком traceparent, помеченные sampled.
+# Включайте, только если заголовок выставляет доверенный прокси
+TRACING_TRUST_INCOMING = False
+
+# Очередь записи (core.writer): создание и изменение публикаций и
+# комментариев выполняет один поток процесса, объединяя до
+# WRITE_QUEUE_BATCH_SIZE записей, пришедших за WRITE_QUEUE_BATCH_WAIT
+# секунд, в одну транзакцию
+WRITE_QUEUE_ENABLED = True
+WRITE_QUEUE_BATCH_SIZE = 50
+WRITE_QUEUE_BATCH_WAIT = 0.002
+# Сколько секунд запрос ждёт результата записи
+WRITE_QUEUE_TIMEOUT = 30
+# Повторы транзакции при блокировке БД: число и начальная пауза в секундах
+WRITE_QUEUE_RETRIES = 5
+WRITE_QUEUE_BACKOFF = 0.05
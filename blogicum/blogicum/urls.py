@@ -1,19 +1,36 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 
 from blog.views import ReqistrationCreateView
+from core.profiling import re_capture_id
+from core.views import (
+    metrics_view, profiling_captures, profiling_download, serve_media
+)
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.wrong_of_server'
 
 
 urlpatterns = [
+    path('admin/profiling/', profiling_captures, name='profiling'),
+    re_path(
+        r'^admin/profiling/(?P<capture_id>%s)\.pstats$' % re_capture_id,
+        profiling_download,
+        name='profiling_download',
+    ),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('', include('blog.urls', namespace='blog')),
     path('pages/', include('pages.urls', namespace='pages')),
     path('auth/', include('django.contrib.auth.urls')),
     path('auth/registration/',
          ReqistrationCreateView.as_view(), name='registration'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    re_path(
+        r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+        serve_media,
+        name='media',
+    ),
+]
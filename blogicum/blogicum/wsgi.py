@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+# Статические страницы отрисовываются один раз при запуске процесса
+from pages.prerender import warm  # noqa: E402
+
+warm()
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = 'Инфраструктура'
+
+    def ready(self):
+        from core import connections, slowlog, sqlite  # noqa: F401
@@ -0,0 +1,94 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from core import metrics
+
+re_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+re_accepts_br = _lazy_re_compile(r'\bbr\b')
+# Суффикс сильного ETag сжатого варианта: "<etag>-gzip"
+re_etag_encoding = _lazy_re_compile(r'-(gzip|br)"')
+
+CACHE_KEY_PREFIX = 'compressed'
+
+
+def choose_encoding(accept_encoding):
+    """Функция выбирает лучшее из поддерживаемых клиентом сжатий"""
+    if brotli is not None and re_accepts_br.search(accept_encoding):
+        return 'br'
+    if re_accepts_gzip.search(accept_encoding):
+        return 'gzip'
+    return None
+
+
+def encoded_etag(etag, encoding):
+    """Функция возвращает ETag сжатого варианта ответа.
+
+    Сжатие детерминировано (gzip пишется с mtime=0), поэтому вариант
+    остаётся побайтно одинаковым и ETag может оставаться сильным.
+    """
+    if not etag.startswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_etag_encoding(header):
+    """Функция убирает из If-None-Match суффиксы сжатых вариантов"""
+    return re_etag_encoding.sub('"', header)
+
+
+def compress_bytes(content, encoding):
+    """Функция сжимает байты выбранным алгоритмом"""
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+    return compress_string(content)
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(
+        quality=settings.COMPRESSION_BROTLI_QUALITY
+    )
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def compress_stream(sequence, encoding):
+    """Функция сжимает потоковый ответ по частям"""
+    if encoding == 'br':
+        return _brotli_sequence(sequence)
+    return compress_sequence(sequence)
+
+
+def get_compressed(content, encoding):
+    """Функция возвращает сжатое тело, сжимая его не чаще одного раза.
+
+    Сжатые варианты хранятся в кеше по хешу исходного тела, поэтому
+    одинаковые (в том числе закешированные) страницы сжимаются один раз.
+    """
+    if len(content) > settings.COMPRESSION_CACHE_MAX_SIZE:
+        return compress_bytes(content, encoding)
+    cache = caches[settings.COMPRESSION_CACHE_ALIAS]
+    digest = hashlib.sha1(content).hexdigest()
+    key = f'{CACHE_KEY_PREFIX}:{encoding}:{digest}'
+    compressed = cache.get(key)
+    metrics.inc('cache_requests_total', (
+        settings.COMPRESSION_CACHE_ALIAS,
+        'miss' if compressed is None else 'hit',
+    ))
+    if compressed is None:
+        compressed = compress_bytes(content, encoding)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
@@ -0,0 +1,86 @@
+import time
+from weakref import WeakKeyDictionary
+
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core import metrics
+
+# Когда соединение в последний раз вернулось после запроса:
+# обёртка соединения потока -> time.monotonic()
+_released_at = WeakKeyDictionary()
+
+
+def is_healthy(connection):
+    """Функция проверяет соединение запросом SELECT 1.
+
+    Запрос идёт в обход курсора Django: он не попадает в журнал
+    медленных запросов, трассировку и счётчики SQL запроса.
+    """
+    try:
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        finally:
+            cursor.close()
+    except connection.Database.Error:
+        return False
+    return True
+
+
+def recycle_reason(connection, now):
+    """Функция возвращает причину закрыть соединение перед запросом"""
+    options = connection.settings_dict
+    released_at = _released_at.get(connection)
+    max_idle = options.get('CONN_MAX_IDLE')
+    if released_at is not None and max_idle is not None and (
+            now - released_at >= max_idle):
+        return 'idle'
+    if options.get('CONN_HEALTH_CHECKS') and not is_healthy(connection):
+        return 'unhealthy'
+    return None
+
+
+def recycle(connection):
+    """Функция закрывает простаивавшее или неработающее соединение.
+
+    Срок жизни соединения (CONN_MAX_AGE) и ошибки в нём проверяет сам
+    Django в close_old_connections. Внутри транзакции соединение не
+    закрывается.
+    """
+    if connection.connection is None or connection.in_atomic_block:
+        return None
+    reason = recycle_reason(connection, time.monotonic())
+    if reason is not None:
+        connection.close()
+        _released_at.pop(connection, None)
+        metrics.inc('db_connections_closed_total', (connection.alias, reason))
+    return reason
+
+
+def release(connection):
+    """Функция отмечает, что соединение освободилось после запроса"""
+    if connection.connection is not None:
+        _released_at[connection] = time.monotonic()
+    else:
+        _released_at.pop(connection, None)
+
+
+@receiver(connection_created)
+def count_connection(connection, **kwargs):
+    metrics.inc('db_connections_opened_total', (connection.alias,))
+
+
+@receiver(request_started)
+def recycle_connections(**kwargs):
+    for connection in connections.all():
+        recycle(connection)
+
+
+@receiver(request_finished)
+def release_connections(**kwargs):
+    for connection in connections.all():
+        release(connection)
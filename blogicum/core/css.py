@@ -0,0 +1,109 @@
+import re
+
+re_comment = re.compile(r'/\*.*?\*/', re.S)
+re_license = re.compile(r'/\*!.*?\*/', re.S)
+re_token = re.compile(r'[\w-]+')
+re_class = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+re_not = re.compile(r':not\([^)]*\)')
+
+# Групповые правила, внутри которых лежат обычные правила
+NESTED_AT_RULES = ('@media', '@supports')
+
+
+def extract_tokens(text):
+    """Функция собирает все слова, которые могут быть именами классов.
+
+    Как и в PurgeCSS, классом считается любое слово содержимого, поэтому
+    учитываются и классы из условий и аргументов тегов шаблонов.
+    """
+    return set(re_token.findall(text))
+
+
+def parse_blocks(css):
+    """Функция разбивает таблицу стилей на блоки (заголовок, тело).
+
+    Для инструкций без тела (например, @charset) тело равно None.
+    """
+    blocks = []
+    depth = 0
+    start = 0
+    prelude = None
+    quote = None
+    for index, char in enumerate(css):
+        if quote:
+            if char == quote and css[index - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            if depth == 0:
+                prelude = css[start:index].strip()
+                start = index + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[start:index]))
+                start = index + 1
+        elif char == ';' and depth == 0:
+            blocks.append((css[start:index].strip(), None))
+            start = index + 1
+    return blocks
+
+
+def split_selectors(prelude):
+    """Функция делит список селекторов по запятым вне скобок"""
+    selectors = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:index])
+            start = index + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def selector_is_used(selector, tokens):
+    """Функция проверяет, что все классы селектора встречаются в шаблонах"""
+    return all(
+        name in tokens for name in re_class.findall(re_not.sub('', selector))
+    )
+
+
+def purge(css, tokens):
+    """Функция удаляет из таблицы стилей правила с неиспользуемыми классами.
+
+    Лицензионные комментарии /*! */ сохраняются в начале результата.
+    """
+    licenses = ''.join(re_license.findall(css))
+    purged = _purge(re_comment.sub('', css), tokens)
+    if purged.startswith('@charset'):
+        charset, purged = purged.split(';', 1)
+        return f'{charset};{licenses}{purged}'
+    return licenses + purged
+
+
+def _purge(css, tokens):
+    output = []
+    for prelude, body in parse_blocks(css):
+        if body is None:
+            output.append(f'{prelude};')
+        elif prelude.startswith(NESTED_AT_RULES):
+            inner = _purge(body, tokens)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [
+                selector for selector in split_selectors(prelude)
+                if selector_is_used(selector, tokens)
+            ]
+            if selectors:
+                output.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(output)
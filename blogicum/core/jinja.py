@@ -0,0 +1,71 @@
+from django.template import defaultfilters
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.formats import localize
+from django.utils.timezone import template_localtime
+from django_bootstrap5.templatetags.django_bootstrap5 import (
+    bootstrap_button,
+    bootstrap_form,
+)
+from jinja2 import Environment, Template
+
+from blog.templatetags.blog_images import responsive_image
+from core import metrics
+from core.templatetags.assets import critical_css
+
+
+def url(viewname, *args, **kwargs):
+    """Функция-аналог тега url: позиционные аргументы идут в маршрут"""
+    return reverse(viewname, args=args or None, kwargs=kwargs or None)
+
+
+def date(value, arg=None):
+    """Фильтр date с переводом времени в текущий часовой пояс, как в DTL"""
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+def localize_value(value):
+    """Фильтр выводит значение в формате текущей локали, как {{ value }}"""
+    return localize(template_localtime(value))
+
+
+def _timed_events(name, events):
+    stats = metrics.current_request()
+    if stats is None or not stats.detailed:
+        yield from events
+        return
+    with stats.timing_template(name):
+        yield from events
+
+
+class TimedTemplate(Template):
+    """Шаблон, учитывающий время отрисовки, в том числе через include"""
+
+    @classmethod
+    def _from_namespace(cls, environment, namespace, globals):
+        template = super()._from_namespace(environment, namespace, globals)
+        render = template.root_render_func
+        template.root_render_func = (
+            lambda context: _timed_events(template.name, render(context))
+        )
+        return template
+
+
+def environment(**options):
+    """Окружение Jinja2 с функциями и фильтрами, которые нужны шаблонам"""
+    env = Environment(**options)
+    env.template_class = TimedTemplate
+    env.globals.update({
+        'static': static,
+        'url': url,
+        'responsive_image': responsive_image,
+        'critical_css': critical_css,
+        'bootstrap_form': bootstrap_form,
+        'bootstrap_button': bootstrap_button,
+    })
+    env.filters.update({
+        'date': date,
+        'truncatewords': defaultfilters.truncatewords,
+        'localize': localize_value,
+    })
+    return env
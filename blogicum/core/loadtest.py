@@ -0,0 +1,283 @@
+import argparse
+import math
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from http.cookies import SimpleCookie
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from django.conf import settings
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer,
+    WSGIRequestHandler,
+    get_internal_wsgi_application,
+)
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.middleware.csrf import _get_new_csrf_token
+from django.test import Client
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    teardown_databases,
+)
+
+# Сценарий нагрузки: GET или POST на адрес, при необходимости от имени
+# пользователя
+Scenario = namedtuple(
+    'Scenario', 'name method path data user', defaults=(None, None)
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+def positive_int(value):
+    """Тип аргумента командной строки: целое число больше нуля"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'ожидается целое число: {value}')
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'ожидается число больше 0: {value}')
+    return number
+
+
+@contextmanager
+def benchmark_database(alias=DEFAULT_DB_ALIAS):
+    """Отдельная тестовая БД на время замера; рабочие данные не меняются.
+
+    SQLite получает файловую БД во временном каталоге вместо общей БД в
+    памяти: та блокирует таблицы целиком и не даёт параллельно писать.
+    После замера БД удаляется, а настройки соединения восстанавливаются.
+    """
+    connection = connections[alias]
+    test_settings = connection.settings_dict['TEST']
+    test_name = test_settings.get('NAME')
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = str(Path(directory) / 'benchmark.sqlite3')
+        try:
+            old_config = setup_databases(
+                verbosity=0, interactive=False, aliases={alias}
+            )
+            try:
+                yield connection
+            finally:
+                teardown_databases(old_config, verbosity=0)
+        finally:
+            test_settings['NAME'] = test_name
+
+
+def percentile(values, percent):
+    """Функция возвращает перцентиль по методу ближайшего ранга"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class QueryCounter:
+    """Обёртка выполнения запросов, считающая SQL-запросы"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class ClientTransport:
+    """Отправка запросов тестовым клиентом Django в том же процессе"""
+
+    def __init__(self, scenario):
+        self.client = Client()
+        if scenario.user is not None:
+            self.client.force_login(scenario.user)
+
+    def send(self, scenario):
+        if scenario.method == 'POST':
+            response = self.client.post(scenario.path, scenario.data or {})
+        else:
+            response = self.client.get(scenario.path)
+        return response.status_code
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class WSGIServer:
+    """Локальный многопоточный WSGI-сервер для нагрузки по HTTP"""
+
+    host = '127.0.0.1'
+
+    def __init__(self):
+        self.httpd = ThreadedWSGIServer((self.host, 0), _QuietHandler)
+        self.httpd.set_app(get_internal_wsgi_application())
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, daemon=True
+        )
+        # Как и LiveServerTestCase, разрешаем обращения к адресу сервера
+        self.allowed_hosts = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, self.host]
+        )
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.allowed_hosts.enable()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+        self.allowed_hosts.disable()
+
+
+class _NoRedirect(HTTPCookieProcessor):
+    def http_error_302(self, request, response, code, msg, headers):
+        return response
+
+    http_error_301 = http_error_303 = http_error_302
+
+
+class HTTPTransport:
+    """Отправка запросов по HTTP на локальный WSGI-сервер"""
+
+    def __init__(self, scenario, server):
+        self.server = server
+        self.opener = build_opener(_NoRedirect())
+        self.headers = {}
+        cookies = SimpleCookie()
+        if scenario.user is not None:
+            client = Client()
+            client.force_login(scenario.user)
+            cookies.update(client.cookies)
+        if scenario.method == 'POST':
+            token = _get_new_csrf_token()
+            cookies[settings.CSRF_COOKIE_NAME] = token
+            self.headers['X-CSRFToken'] = token
+        if cookies:
+            self.headers['Cookie'] = '; '.join(
+                f'{name}={morsel.value}' for name, morsel in cookies.items()
+            )
+
+    def send(self, scenario):
+        data = None
+        if scenario.method == 'POST':
+            data = urlencode(scenario.data or {}).encode()
+        request = Request(
+            self.server.url + scenario.path, data=data,
+            headers=self.headers, method=scenario.method,
+        )
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                return response.status
+        except HTTPError as error:
+            return error.code
+
+
+def profile(scenario, requests):
+    """Функция считает SQL-запросы и пик выделенной памяти на запрос.
+
+    Запросы выполняются последовательно в текущем потоке, иначе память
+    и запросы соседних потоков попали бы в замер.
+    """
+    transport = ClientTransport(scenario)
+    queries = []
+    memory = []
+    tracemalloc.start()
+    try:
+        for _ in range(requests):
+            counter = QueryCounter()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                transport.send(scenario)
+            memory.append(tracemalloc.get_traced_memory()[1] - before)
+            queries.append(counter.count)
+    finally:
+        tracemalloc.stop()
+    return {
+        'queries_per_request': sum(queries) / len(queries),
+        'memory_per_request_bytes': sum(memory) // len(memory),
+        'memory_per_request_max_bytes': max(memory),
+    }
+
+
+def load(scenario, make_transport, requests, concurrency):
+    """Функция нагружает сценарий несколькими потоками и замеряет задержки"""
+    per_worker = [
+        requests // concurrency + (index < requests % concurrency)
+        for index in range(concurrency)
+    ]
+
+    def worker(count):
+        transport = make_transport(scenario)
+        latencies = []
+        errors = 0
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                status = transport.send(scenario)
+                latencies.append(time.perf_counter() - start)
+                errors += status >= 400
+        finally:
+            connections.close_all()
+        return latencies, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(worker, per_worker))
+    elapsed = time.perf_counter() - start
+    latencies = [value for values, _ in results for value in values]
+    report = {
+        'requests': len(latencies),
+        'errors': sum(errors for _, errors in results),
+        'requests_per_second': len(latencies) / elapsed,
+    }
+    for percent in PERCENTILES:
+        report[f'p{percent}_ms'] = percentile(latencies, percent) * 1000
+    return report
+
+
+def run(scenarios, requests=200, concurrency=4, transport='client',
+        profile_requests=10, warmup=5):
+    """Функция прогоняет сценарии и возвращает отчёт для сохранения в JSON"""
+    with ExitStack() as stack:
+        if transport == 'wsgi':
+            server = stack.enter_context(WSGIServer())
+
+            def make_transport(scenario):
+                return HTTPTransport(scenario, server)
+        else:
+            make_transport = ClientTransport
+        report = {}
+        for scenario in scenarios:
+            warm = ClientTransport(scenario)
+            for _ in range(warmup):
+                warm.send(scenario)
+            report[scenario.name] = {
+                'method': scenario.method,
+                'path': scenario.path,
+                **load(scenario, make_transport, requests, concurrency),
+                **profile(scenario, profile_requests),
+            }
+    return report
@@ -0,0 +1,118 @@
+import json
+import time
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+
+from blog.management.commands.benchmark_views import build_scenarios
+from blog.synthetic import generate
+from core import metrics
+from core.loadtest import benchmark_database, percentile, positive_int
+
+# Прежнее поведение: новое соединение на каждый запрос
+PER_REQUEST = {
+    'CONN_MAX_AGE': 0,
+    'CONN_MAX_IDLE': None,
+    'CONN_HEALTH_CHECKS': False,
+}
+
+
+def _opened(alias):
+    return metrics.registry.snapshot().get(
+        ('db_connections_opened_total', (alias,)), 0
+    )
+
+
+def _start_response(status, headers, exc_info=None):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает обработку запросов с новым соединением на каждый '
+        'запрос и с постоянными соединениями из настроек DATABASES'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=positive_int, default=1000)
+        parser.add_argument(
+            '--requests', type=positive_int, default=300,
+            help='Число запросов для каждого набора настроек'
+        )
+        parser.add_argument(
+            '--output', help='Файл для отчёта; по умолчанию stdout'
+        )
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            results = self.benchmark(options)
+        output = json.dumps({
+            'options': {
+                name: options[name] for name in ('posts', 'requests')
+            },
+            'profiles': results,
+        }, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def benchmark(self, options):
+        connection = connections['default']
+        configured = {
+            name: connection.settings_dict.get(name)
+            for name in PER_REQUEST
+        }
+        try:
+            generate(posts=options['posts'])
+            paths = [
+                scenario.path for scenario in build_scenarios()
+                if scenario.method == 'GET'
+            ]
+            with override_settings(
+                    ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, '127.0.0.1']):
+                return {
+                    name: self.run_profile(profile, paths, options)
+                    for name, profile in (
+                        ('per_request', PER_REQUEST),
+                        ('persistent', configured),
+                    )
+                }
+        finally:
+            connection.settings_dict.update(configured)
+
+    def run_profile(self, profile, paths, options):
+        # Запросы идут по очереди в одном потоке, как в синхронном
+        # воркере: поток сервера разработки живёт лишь один запрос
+        connections.close_all()
+        connections['default'].settings_dict.update(profile)
+        handler = WSGIHandler()
+        opened = _opened('default')
+        latencies = []
+        errors = 0
+        start = time.perf_counter()
+        for index in range(options['requests']):
+            environ = {'PATH_INFO': paths[index % len(paths)]}
+            setup_testing_defaults(environ)
+            request_start = time.perf_counter()
+            response = handler(environ, _start_response)
+            b''.join(response)
+            response.close()
+            latencies.append(time.perf_counter() - request_start)
+            errors += response.status_code >= 400
+        elapsed = time.perf_counter() - start
+        opened = _opened('default') - opened
+        connections.close_all()
+        return {
+            'requests_per_second': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'errors': errors,
+            'connections_opened': opened,
+            'connections_opened_per_second': round(opened / elapsed, 1),
+        }
@@ -0,0 +1,147 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test.utils import override_settings
+
+from blog.models import Comment
+from blog.query_posts import get_posts
+from blog.synthetic import generate
+from core.loadtest import benchmark_database, percentile, positive_int
+from core.sqlite import apply_pragmas
+
+User = get_user_model()
+
+# Настройки SQLite по умолчанию, с которыми сравнивается SQLITE_PRAGMAS;
+# busy_timeout равен таймауту модуля sqlite3 в Python
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+    'mmap_size': 0,
+    'cache_size': -2000,
+    'busy_timeout': 5000,
+    'temp_store': 'default',
+}
+
+
+def _read():
+    list(get_posts(filtration=True, annotation=True)[:10])
+
+
+def _write(post_id, author_id):
+    Comment.objects.create(
+        text='Комментарий из теста конкурентной записи',
+        post_id=post_id,
+        author_id=author_id,
+    )
+
+
+def _worker(role, pragmas, start_at, duration, post_id, author_id):
+    """Процесс чтения или записи: выполняет операции до конца замера"""
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        connections.close_all()
+        latencies = []
+        errors = 0
+        time.sleep(max(start_at - time.time(), 0))
+        deadline = start_at + duration
+        while time.time() < deadline:
+            start = time.perf_counter()
+            try:
+                if role == 'read':
+                    _read()
+                else:
+                    _write(post_id, author_id)
+            except OperationalError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        connections.close_all()
+    return role, latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность чтения и записи SQLite из '
+        'нескольких процессов с настройками по умолчанию и SQLITE_PRAGMAS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=positive_int, default=2000)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=5,
+            help='Длительность замера для каждого набора настроек, секунд'
+        )
+        parser.add_argument(
+            '--output', help='Файл для отчёта; по умолчанию stdout'
+        )
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Команда сравнивает настройки SQLite')
+        with benchmark_database():
+            results = self.benchmark(options)
+        output = json.dumps({
+            'options': {
+                name: options[name]
+                for name in ('posts', 'readers', 'writers', 'duration')
+            },
+            'profiles': results,
+        }, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def benchmark(self, options):
+        generate(posts=options['posts'])
+        post_id = get_posts(filtration=True).order_by('pk').first().pk
+        author_id = User.objects.order_by('pk').first().pk
+        return {
+            name: self.run_profile(pragmas, options, post_id, author_id)
+            for name, pragmas in (
+                ('default', DEFAULT_PRAGMAS),
+                ('tuned', settings.SQLITE_PRAGMAS),
+            )
+        }
+
+    def run_profile(self, pragmas, options, post_id, author_id):
+        # Режим журнала хранится в файле БД: переключаем его заранее,
+        # пока к БД не подключены другие процессы
+        apply_pragmas(connections['default'], pragmas)
+        connections.close_all()
+        roles = ['read'] * options['readers'] + ['write'] * options['writers']
+        start_at = time.time() + 1
+        with ProcessPoolExecutor(len(roles)) as executor:
+            futures = [
+                executor.submit(
+                    _worker, role, pragmas, start_at, options['duration'],
+                    post_id, author_id,
+                )
+                for role in roles
+            ]
+            results = [future.result() for future in futures]
+        report = {}
+        for role in ('read', 'write'):
+            latencies = [
+                latency for result_role, values, _ in results
+                if result_role == role for latency in values
+            ]
+            report[f'{role}s_per_second'] = round(
+                len(latencies) / options['duration'], 1
+            )
+            report[f'{role}_p95_ms'] = (
+                round(percentile(latencies, 95) * 1000, 2)
+                if latencies else None
+            )
+            report[f'{role}_errors'] = sum(
+                errors for result_role, _, errors in results
+                if result_role == role
+            )
+        return report
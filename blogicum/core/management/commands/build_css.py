@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+
+import django_bootstrap5
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.template.utils import get_app_template_dirs
+
+from core.css import extract_tokens, purge
+
+
+def _read_tokens(directories, extensions):
+    tokens = set()
+    for directory in directories:
+        for path in Path(directory).rglob('*'):
+            if path.suffix in extensions and path.is_file():
+                tokens |= extract_tokens(path.read_text(encoding='utf-8'))
+    return tokens
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает урезанную таблицу стилей Bootstrap по классам из шаблонов '
+        'и критический CSS для встраивания в base.html'
+    )
+
+    def handle(self, *args, **options):
+        source = finders.find(settings.CSS_SOURCE)
+        if source is None:
+            raise CommandError(f'Не найден файл {settings.CSS_SOURCE}')
+        css = Path(source).read_text(encoding='utf-8')
+        output_dir = Path(source).parent
+
+        template_dirs = [
+            *(
+                directory
+                for engine in settings.TEMPLATES
+                for directory in engine.get('DIRS', ())
+            ),
+            *get_app_template_dirs('templates'),
+        ]
+        # Разметку форм формирует django_bootstrap5, её классы тоже нужны
+        all_tokens = _read_tokens(
+            [*template_dirs, os.path.dirname(django_bootstrap5.__file__)],
+            {'.html', '.py'},
+        )
+        critical_tokens = set()
+        for name in settings.CRITICAL_CSS_TEMPLATES:
+            path = Path(settings.TEMPLATES_DIR) / name
+            critical_tokens |= extract_tokens(
+                path.read_text(encoding='utf-8')
+            )
+
+        for name, tokens in (
+                (settings.CSS_PURGED, all_tokens),
+                (settings.CSS_CRITICAL, critical_tokens),
+        ):
+            result = purge(css, tokens)
+            (output_dir / os.path.basename(name)).write_text(
+                result, encoding='utf-8'
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: {len(result)} из {len(css)} байт'
+            ))
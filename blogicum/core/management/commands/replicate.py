@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replication import replicate
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную БД SQLite в реплики из DATABASE_REPLICAS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование каждые N секунд'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте BLOGICUM_REPLICA=1'
+            )
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                replicate(
+                    settings.DATABASES['default']['NAME'],
+                    settings.DATABASES[alias]['NAME'],
+                )
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{alias}: скопирована')
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
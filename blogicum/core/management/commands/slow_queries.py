@@ -0,0 +1,79 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.slowlog import read_log
+
+ORDERINGS = {
+    'total': lambda shape: shape['total_ms'],
+    'max': lambda shape: shape['max_ms'],
+    'count': lambda shape: shape['count'],
+}
+
+
+def summarize(entries):
+    """Функция группирует записи журнала по форме запроса"""
+    shapes = {}
+    for entry in entries:
+        shape = shapes.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': Counter(),
+            'sql': None,
+            'stack': [],
+            'plan': None,
+        })
+        shape['count'] += 1
+        shape['total_ms'] += entry['duration_ms']
+        shape['max_ms'] = max(shape['max_ms'], entry['duration_ms'])
+        shape['views'][entry.get('view') or '—'] += 1
+        if 'sql' in entry:
+            shape['sql'] = entry['sql']
+            shape['stack'] = entry.get('stack') or []
+            shape['plan'] = entry.get('plan')
+    return list(shapes.values())
+
+
+class Command(BaseCommand):
+    help = 'Выводит самые затратные медленные запросы из журнала'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', default=str(settings.SLOW_QUERY_LOG),
+            help='Файл журнала (ротированные копии читаются тоже)'
+        )
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--order', choices=ORDERINGS, default='total',
+            help='Сортировка: суммарное время, максимум или число'
+        )
+
+    def handle(self, *args, **options):
+        shapes = sorted(
+            summarize(read_log(options['log'])),
+            key=ORDERINGS[options['order']], reverse=True,
+        )
+        if not shapes:
+            self.stdout.write('Медленных запросов не найдено')
+            return
+        for number, shape in enumerate(shapes[:options['limit']], 1):
+            self.write_shape(number, shape)
+
+    def write_shape(self, number, shape):
+        self.stdout.write(self.style.WARNING(
+            f'{number}. {shape["count"]} раз, '
+            f'всего {shape["total_ms"]:.1f} мс, '
+            f'максимум {shape["max_ms"]:.1f} мс [{shape["fingerprint"]}]'
+        ))
+        self.stdout.write(f'   {shape["sql"] or "(SQL в ротированной части)"}')
+        views = ', '.join(
+            f'{view} ({count})' for view, count in shape['views'].most_common()
+        )
+        self.stdout.write(f'   Представления: {views}')
+        for line in shape['plan'] or ():
+            self.stdout.write(f'   План: {line}')
+        if shape['stack']:
+            self.stdout.write(f'   Вызов: {shape["stack"][-1]}')
@@ -0,0 +1,434 @@
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+
+from core import tracing
+from core.profiling import SQLTimer
+
+PREFIX = 'blogicum_'
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+Metric = namedtuple(
+    'Metric', 'name kind help labels buckets', defaults=(None,)
+)
+
+METRICS = {metric.name: metric for metric in (
+    Metric(
+        'http_requests_total', 'counter', 'Число обработанных запросов',
+        ('view', 'method', 'status'),
+    ),
+    Metric(
+        'http_request_duration_seconds', 'histogram',
+        'Время обработки запроса', ('view',), DURATION_BUCKETS,
+    ),
+    Metric(
+        'http_response_size_bytes', 'histogram',
+        'Размер тела ответа', ('view',), SIZE_BUCKETS,
+    ),
+    Metric(
+        'db_queries_per_request', 'histogram',
+        'Число SQL-запросов за запрос', ('view',), QUERY_BUCKETS,
+    ),
+    Metric(
+        'db_query_duration_seconds', 'histogram',
+        'Время SQL-запросов за запрос', ('view',), DURATION_BUCKETS,
+    ),
+    Metric(
+        'template_render_duration_seconds', 'histogram',
+        'Время отрисовки шаблонов за запрос', ('view',), DURATION_BUCKETS,
+    ),
+    Metric(
+        'template_renders_total', 'counter',
+        'Число отрисовок шаблона, включая include', ('template',),
+    ),
+    Metric(
+        'template_render_seconds_total', 'counter',
+        'Суммарное время отрисовки шаблона, включая вложенные',
+        ('template',),
+    ),
+    Metric(
+        'cache_requests_total', 'counter', 'Обращения к кешу',
+        ('cache', 'result'),
+    ),
+    Metric(
+        'db_connections_opened_total', 'counter',
+        'Число открытых соединений с БД', ('alias',),
+    ),
+    Metric(
+        'db_connections_closed_total', 'counter',
+        'Соединения, закрытые из-за простоя или неудачной проверки',
+        ('alias', 'reason'),
+    ),
+    Metric(
+        'write_queue_batches_total', 'counter',
+        'Число транзакций очереди записи', (),
+    ),
+    Metric(
+        'write_queue_units_total', 'counter',
+        'Число единиц записи, выполненных очередью', (),
+    ),
+    Metric(
+        'write_queue_retries_total', 'counter',
+        'Повторы транзакций очереди записи из-за блокировки БД', (),
+    ),
+    Metric(
+        'images_normalized_total', 'counter',
+        'Число нормализованных загруженных изображений', (),
+    ),
+    Metric(
+        'image_upload_bytes_total', 'counter',
+        'Объём загруженных изображений до и после нормализации', ('stage',),
+    ),
+)}
+
+
+class _ThreadOwner:
+    """Объект в локальных данных потока: сборщик удаляет его с потоком"""
+
+
+class Registry:
+    """Метрики процесса.
+
+    Каждый поток пишет в собственный срез, поэтому запись обходится без
+    блокировок; срезы складываются только при выгрузке. Срез завершённого
+    потока переносится в общий итог процесса, поэтому число срезов не
+    растёт с числом когда-либо созданных потоков.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = {}
+        self._retired = {}
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            owner = self._local.owner = _ThreadOwner()
+            with self._lock:
+                self._shards[id(shard)] = shard
+            weakref.finalize(owner, self._retire, shard)
+        return shard
+
+    def _retire(self, shard):
+        with self._lock:
+            self._shards.pop(id(shard), None)
+            merge(self._retired, shard)
+
+    def inc(self, name, labels=(), amount=1):
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name].buckets
+        shard = self._shard()
+        key = (name, labels)
+        values = shard.get(key)
+        if values is None:
+            # Счётчики по корзинам, включая +Inf, и сумма значений
+            values = shard[key] = [0] * (len(buckets) + 2)
+        values[bisect_left(buckets, value)] += 1
+        values[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            shards = list(self._shards.values())
+            samples = {}
+            merge(samples, self._retired)
+        for shard in shards:
+            merge(samples, dict(shard))
+        return samples
+
+    def clear(self):
+        with self._lock:
+            shards = list(self._shards.values())
+            self._retired.clear()
+        for shard in shards:
+            shard.clear()
+
+
+def merge(samples, other):
+    """Функция прибавляет к samples значения other"""
+    for key, value in other.items():
+        current = samples.get(key)
+        if current is None:
+            samples[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(current, list):
+            for index, item in enumerate(value):
+                current[index] += item
+        else:
+            samples[key] = current + value
+
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+
+
+def is_alive(pid):
+    """Функция проверяет, что процесс с таким pid ещё существует"""
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_samples(path):
+    try:
+        rows = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return {
+        (name, tuple(labels)): value
+        for name, labels, value in rows if name in METRICS
+    }
+
+
+def _write_samples(path, samples):
+    temporary = path.with_suffix(f'.{threading.get_ident()}.tmp')
+    temporary.write_text(json.dumps([
+        [name, list(labels), value]
+        for (name, labels), value in samples.items()
+    ]))
+    os.replace(temporary, path)
+
+
+class FileStore:
+    """Обмен метриками между процессами через файлы в METRICS_DIR.
+
+    Процесс периодически записывает свой снимок в <pid>.json, а выдача
+    метрик складывает снимки всех процессов. Снимки завершившихся
+    процессов переносятся в archive.json: иначе суммы счётчиков
+    уменьшались бы, и Prometheus принимал бы это за сброс счётчика.
+    """
+
+    archive_name = 'archive.json'
+
+    def __init__(self):
+        self.flushed_at = 0.0
+
+    @property
+    def directory(self):
+        directory = settings.METRICS_DIR
+        return Path(directory) if directory else None
+
+    def flush(self, force=False):
+        directory = self.directory
+        if directory is None:
+            return
+        now = time.monotonic()
+        interval = settings.METRICS_FLUSH_INTERVAL
+        if not force and now - self.flushed_at < interval:
+            return
+        self.flushed_at = now
+        directory.mkdir(parents=True, exist_ok=True)
+        _write_samples(
+            directory / f'{os.getpid()}.json', registry.snapshot()
+        )
+
+    def archive(self, paths):
+        """Метод переносит снимки завершившихся процессов в общий архив"""
+        # Модуль записи сам учитывает метрики, поэтому импорт отложен
+        from core.writer import file_lock
+
+        directory = self.directory
+        with file_lock(str(directory / '.lock')):
+            archive_path = directory / self.archive_name
+            archived = _read_samples(archive_path) or {}
+            folded = []
+            for path in paths:
+                # Снимок мог перенести другой процесс
+                samples = _read_samples(path)
+                if samples is not None:
+                    merge(archived, samples)
+                    folded.append(path)
+            if folded:
+                _write_samples(archive_path, archived)
+            for path in folded:
+                path.unlink(missing_ok=True)
+
+    def collect(self):
+        """Метод возвращает метрики всех процессов"""
+        self.flush(force=True)
+        directory = self.directory
+        if directory is None:
+            return registry.snapshot()
+        dead = [
+            path for path in directory.glob('*.json')
+            if path.name != self.archive_name and not is_alive(path.stem)
+        ]
+        if dead:
+            self.archive(dead)
+        samples = {}
+        for path in directory.glob('*.json'):
+            merge(samples, _read_samples(path) or {})
+        return samples
+
+
+store = FileStore()
+
+
+class RequestStats:
+    """Затраты одного запроса: SQL и отрисовка шаблонов.
+
+    При включённой настройке TEMPLATE_TIMING время отрисовки копится и по
+    каждому шаблону и include: имя -> [число отрисовок, секунды]. Если
+    запрос трассируется, отрисовка шаблонов попадает в трассировку.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self.sql = SQLTimer()
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.templates = {} if settings.TEMPLATE_TIMING else None
+        self.trace = tracing.current_trace()
+        # Нужно ли замерять каждый шаблон и include по отдельности
+        self.detailed = self.templates is not None or self.trace is not None
+
+    @contextmanager
+    def timing_template(self, name=None):
+        self.template_depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            duration = end - start
+            self.template_depth -= 1
+            if not self.template_depth:
+                self.template_time += duration
+            if name is not None and self.templates is not None:
+                totals = self.templates.setdefault(name, [0, 0.0])
+                totals[0] += 1
+                totals[1] += duration
+            if name is not None and self.trace is not None:
+                self.trace.add(name, 'template', start, end)
+
+    def template_timing_header(self):
+        """Метод возвращает затраты по шаблонам, самые долгие первыми"""
+        return ', '.join(
+            f'{name};count={count};dur={duration * 1000:.3f}'
+            for name, (count, duration) in sorted(
+                self.templates.items(), key=lambda item: -item[1][1]
+            )
+        )
+
+
+_current = ContextVar('metrics_request', default=None)
+
+
+def current_request():
+    """Функция возвращает затраты текущего запроса или None"""
+    return _current.get()
+
+
+@contextmanager
+def tracking_request(request=None):
+    stats = RequestStats(request)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def view_name(request):
+    """Функция возвращает имя маршрута запроса для меток метрик"""
+    resolver_match = getattr(request, 'resolver_match', None)
+    return resolver_match.view_name if resolver_match else 'unmatched'
+
+
+def record_request(request, response, duration, stats):
+    """Функция учитывает в метриках обработанный запрос"""
+    view = view_name(request)
+    labels = (view,)
+    inc(
+        'http_requests_total',
+        (view, request.method, str(response.status_code)),
+    )
+    observe('http_request_duration_seconds', labels, duration)
+    observe('db_queries_per_request', labels, stats.sql.count)
+    observe('db_query_duration_seconds', labels, stats.sql.duration)
+    observe(
+        'template_render_duration_seconds', labels, stats.template_time
+    )
+    for name, (count, seconds) in (stats.templates or {}).items():
+        inc('template_renders_total', (name,), count)
+        inc('template_render_seconds_total', (name,), seconds)
+    if not response.streaming:
+        observe('http_response_size_bytes', labels, len(response.content))
+    elif response.has_header('Content-Length'):
+        observe(
+            'http_response_size_bytes', labels,
+            int(response['Content-Length']),
+        )
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join(
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\')
+                     .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def exposition(samples):
+    """Функция выводит метрики в текстовом формате Prometheus"""
+    by_metric = {}
+    for (name, labels), value in samples.items():
+        by_metric.setdefault(name, []).append((labels, value))
+    lines = []
+    for metric in METRICS.values():
+        full_name = PREFIX + metric.name
+        lines.append(f'# HELP {full_name} {metric.help}')
+        lines.append(f'# TYPE {full_name} {metric.kind}')
+        for labels, value in sorted(by_metric.get(metric.name, ())):
+            if metric.kind == 'counter':
+                lines.append('%s%s %s' % (
+                    full_name, _format_labels(metric.labels, labels),
+                    _format_value(value),
+                ))
+                continue
+            lines.extend(_histogram_lines(full_name, metric, labels, value))
+    return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(full_name, metric, labels, values):
+    cumulative = 0
+    bounds = [*map(str, metric.buckets), '+Inf']
+    for bound, count in zip(bounds, values):
+        cumulative += count
+        yield '%s_bucket%s %d' % (
+            full_name,
+            _format_labels(metric.labels, labels, [('le', bound)]),
+            cumulative,
+        )
+    formatted = _format_labels(metric.labels, labels)
+    yield f'{full_name}_sum{formatted} {_format_value(values[-1])}'
+    yield f'{full_name}_count{formatted} {cumulative}'
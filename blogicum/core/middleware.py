@@ -0,0 +1,265 @@
+import mimetypes
+import os
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import (
+    cc_delim_re,
+    get_conditional_response,
+    patch_vary_headers,
+)
+from django.utils.deprecation import MiddlewareMixin
+
+from core.compression import (
+    choose_encoding,
+    compress_stream,
+    encoded_etag,
+    get_compressed,
+    re_accepts_br,
+    re_accepts_gzip,
+    strip_etag_encoding,
+)
+from core import metrics, slowlog, tracing
+from core.profiling import get_trigger, profile_request, time_queries
+
+
+def is_compressible(response):
+    """Функция проверяет, можно ли сжимать ответ"""
+    # Части ответа и ответы, которые запрещено менять, не сжимаются
+    if (
+            response.status_code == 206
+            or response.has_header('Content-Range')
+            or 'no-transform' in cc_delim_re.split(
+                response.get('Cache-Control', '').lower()
+            )
+    ):
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0]
+    if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+        return False
+    return (
+        response.streaming
+        or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Middleware для сжатия ответов в gzip или Brotli.
+
+    Сжатый вариант получает сильный ETag с суффиксом кодировки. Перед
+    view суффикс убирается из условных заголовков, чтобы view сравнивал
+    их со своим ETag.
+    """
+
+    conditional_headers = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MATCH')
+
+    def process_request(self, request):
+        request.compressed_etags = request.META.get('HTTP_IF_NONE_MATCH', '')
+        for header in self.conditional_headers:
+            if header in request.META:
+                request.META[header] = strip_etag_encoding(
+                    request.META[header]
+                )
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if response.status_code == 304:
+            return self.not_modified(request, response)
+        if not is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            if response.has_header('Content-Length'):
+                del response.headers['Content-Length']
+        else:
+            compressed_content = get_compressed(response.content, encoding)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        if response.has_header('ETag'):
+            response.headers['ETag'] = encoded_etag(response['ETag'], encoding)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def not_modified(self, request, response):
+        """Ответ 304 несёт тот же ETag, что и закешированный клиентом"""
+        etag = response.get('ETag')
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if etag and encoding and encoded_etag(etag, encoding) in getattr(
+                request, 'compressed_etags', ''):
+            response.headers['ETag'] = encoded_etag(etag, encoding)
+        return response
+
+
+class StaticFilesMiddleware:
+    """Middleware отдаёт собранную статику из STATIC_ROOT.
+
+    Файлы с хешем в имени из манифеста кешируются навсегда; при наличии
+    заранее сжатых .br/.gz копий отдаются они.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = settings.STATIC_ROOT
+        self.hashed_names = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values()
+        )
+
+    def __call__(self, request):
+        if self.root and request.path_info.startswith(self.prefix):
+            response = self.serve(
+                request, request.path_info[len(self.prefix):]
+            )
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        path, encoding = self.choose_variant(request, path)
+        stat = os.stat(path)
+        etag = '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = FileResponse(
+                open(path, 'rb'),
+                content_type=(
+                    mimetypes.guess_type(name)[0]
+                    or 'application/octet-stream'
+                ),
+            )
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = (
+            'public, max-age=31536000, immutable'
+            if name in self.hashed_names
+            else f'public, max-age={settings.STATIC_CACHE_MAX_AGE}'
+        )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def choose_variant(self, request, path):
+        """Выбирает заранее сжатую копию файла, если клиент её примет"""
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        variants = (
+            (re_accepts_br, 'br', '.br'),
+            (re_accepts_gzip, 'gzip', '.gz'),
+        )
+        for accepts, encoding, suffix in variants:
+            if accepts.search(accept_encoding) and os.path.isfile(
+                    path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+
+class ProfilingMiddleware:
+    """Middleware профилирует запрос в cProfile.
+
+    Профилируются запросы с подписанным токеном в заголовке или параметре
+    запроса, а также случайная доля PROFILING_SAMPLE_RATE всех запросов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = get_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+        response, capture_id = profile_request(
+            self.get_response, request, trigger
+        )
+        if capture_id and trigger != 'sample':
+            response.headers['X-Profile-Id'] = capture_id
+        return response
+
+
+class MetricsMiddleware:
+    """Middleware учитывает время, SQL-запросы и размер ответа по view"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        start = time.perf_counter()
+        with metrics.tracking_request(request) as stats:
+            with time_queries(stats.sql):
+                response = self.get_response(request)
+        metrics.record_request(
+            request, response, time.perf_counter() - start, stats
+        )
+        if stats.templates:
+            response.headers['X-Template-Timing'] = (
+                stats.template_timing_header()
+            )
+        metrics.store.flush()
+        return response
+
+
+class SlowQueryLogMiddleware:
+    """Middleware связывает медленные запросы к БД с view запроса"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with slowlog.tracking_request(request):
+            return self.get_response(request)
+
+
+class TracingMiddleware:
+    """Middleware трассирует запрос и сохраняет трассировку в TRACING_DIR.
+
+    Трассируется случайная доля TRACING_SAMPLE_RATE запросов и, если это
+    разрешено, запросы с заголовком traceparent с флагом sampled. Каждое
+    следующее звено цепочки middleware, разбор URL, view, SQL-запросы и
+    шаблоны попадают в трассировку отдельными span.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        tracing.trace_chain(self)
+
+    def __call__(self, request):
+        with tracing.tracing_request(request) as trace:
+            if trace is None:
+                return self.get_response(request)
+            with trace.span('request', 'django', path=request.path):
+                response = self.get_response(request)
+        response.headers['traceparent'] = trace.traceparent
+        response.headers['X-Trace-Id'] = trace.trace_id
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        trace = tracing.current_trace()
+        if trace is not None:
+            trace.view_started = time.perf_counter()
@@ -0,0 +1,185 @@
+import cProfile
+import json
+import pstats
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.template.base import Template
+
+try:
+    from jinja2 import Template as JinjaTemplate
+except ImportError:
+    JinjaTemplate = None
+
+SIGNING_SALT = 'core.profiling'
+re_capture_id = r'[0-9TZ]+-[0-9a-f]{8}'
+
+
+def make_token():
+    """Функция выдаёт подписанный токен для профилирования запросов"""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign('profile')
+
+
+def check_token(token):
+    try:
+        value = signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return value == 'profile'
+
+
+def get_trigger(request):
+    """Функция решает, профилировать ли запрос, и возвращает причину"""
+    header = request.META.get(settings.PROFILING_HEADER)
+    if header and check_token(header):
+        return 'header'
+    param = request.GET.get(settings.PROFILING_QUERY_PARAM)
+    if param and check_token(param):
+        return 'query'
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return 'sample'
+    return None
+
+
+class SQLTimer:
+    """Обёртка выполнения запросов, суммирующая их число и время"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+@contextmanager
+def time_queries(timer):
+    wrapped = []
+    try:
+        for connection in connections.all():
+            connection.execute_wrappers.append(timer)
+            wrapped.append(connection)
+        yield timer
+    finally:
+        for connection in wrapped:
+            connection.execute_wrappers.remove(timer)
+
+
+def _template_functions():
+    functions = [Template.render]
+    if JinjaTemplate is not None:
+        functions.append(JinjaTemplate.render)
+    return {
+        (function.__code__.co_filename, function.__code__.co_firstlineno,
+         function.__name__)
+        for function in functions
+    }
+
+
+def summarize(stats, limit):
+    """Функция выбирает из статистики самые затратные функции.
+
+    Время шаблонов — совокупное время Template.render: cProfile не
+    учитывает повторно вложенные вызовы, поэтому include не удваивается.
+    """
+    template_functions = _template_functions()
+    template_time = 0.0
+    rows = []
+    for function, (_, calls, tottime, cumtime, _) in stats.stats.items():
+        if function in template_functions:
+            template_time += cumtime
+        rows.append((function, calls, tottime, cumtime))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return template_time, [
+        {
+            'function': function[2],
+            'file': function[0],
+            'line': function[1],
+            'calls': calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        }
+        for function, calls, tottime, cumtime in rows[:limit]
+    ]
+
+
+def profile_request(get_response, request, trigger):
+    """Функция выполняет запрос под cProfile и сохраняет результат"""
+    profiler = cProfile.Profile()
+    timer = SQLTimer()
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Профилировщик уже запущен в этом потоке
+        return get_response(request), None
+    try:
+        with time_queries(timer):
+            response = get_response(request)
+    finally:
+        profiler.disable()
+    total = time.perf_counter() - start
+    capture_id = '%s-%s' % (
+        started_at.strftime('%Y%m%dT%H%M%S%fZ'), uuid.uuid4().hex[:8]
+    )
+    stats = pstats.Stats(profiler)
+    template_time, top = summarize(stats, settings.PROFILING_TOP_FUNCTIONS)
+    resolver_match = getattr(request, 'resolver_match', None)
+    summary = {
+        'id': capture_id,
+        'started_at': started_at.isoformat(),
+        'method': request.method,
+        'path': request.path,
+        'view': resolver_match.view_name if resolver_match else None,
+        'status': response.status_code,
+        'trigger': trigger,
+        'total_ms': round(total * 1000, 3),
+        'sql_count': timer.count,
+        'sql_ms': round(timer.duration * 1000, 3),
+        'template_ms': round(template_time * 1000, 3),
+        'top': top,
+    }
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stats.dump_stats(directory / f'{capture_id}.pstats')
+    (directory / f'{capture_id}.json').write_text(
+        json.dumps(summary, indent=2), encoding='utf-8'
+    )
+    prune(directory, settings.PROFILING_MAX_CAPTURES)
+    return response, capture_id
+
+
+def prune(directory, keep):
+    """Функция удаляет самые старые снимки сверх лимита"""
+    summaries = sorted(directory.glob('*.json'), reverse=True)
+    for path in summaries[keep:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.pstats').unlink(missing_ok=True)
+
+
+def recent_captures(limit=50):
+    """Функция возвращает сводки последних снимков, новые первыми"""
+    directory = Path(settings.PROFILING_DIR)
+    captures = []
+    for path in sorted(directory.glob('*.json'), reverse=True)[:limit]:
+        try:
+            captures.append(json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return captures
@@ -0,0 +1,16 @@
+import sqlite3
+
+
+def replicate(source, target):
+    """Функция копирует файл БД SQLite source в реплику target.
+
+    Заменяет настоящую репликацию при локальной проверке: резервное
+    копирование SQLite даёт согласованный снимок, не останавливая запись.
+    """
+    source = sqlite3.connect(str(source))
+    target = sqlite3.connect(str(target))
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
@@ -0,0 +1,87 @@
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_view(view):
+    """Декоратор помечает view, чтения которой можно отдать реплике.
+
+    Как и csrf_exempt, только выставляет атрибут; решение принимает
+    ReplicaMiddleware. Для CBV — method_decorator(..., name='dispatch').
+    """
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        return view(*args, **kwargs)
+
+    wrapped.use_replica = True
+    return wrapped
+
+
+def read_alias():
+    """Функция возвращает БД для чтения в текущем запросе или None"""
+    return _read_alias.get()
+
+
+def is_sticky(request):
+    """Недавно писавший клиент читает с основной БД: свои записи"""
+    return settings.REPLICA_STICKY_COOKIE in request.COOKIES
+
+
+class ReplicaRouter:
+    """Роутер: запись в основную БД, чтение помеченных view — с реплик"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики — копии основной БД, миграции на них не выполняются
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """Middleware направляет чтение помеченных view на реплику.
+
+    После успешного изменяющего запроса клиент получает короткую куку,
+    и пока она жива, читает с основной БД: видит свои изменения, даже
+    если реплика ещё не догнала основную.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+                settings.DATABASE_REPLICAS
+                and getattr(view_func, 'use_replica', False)
+                and request.method in SAFE_METHODS
+                and not is_sticky(request)
+        ):
+            _read_alias.set(random.choice(settings.DATABASE_REPLICAS))
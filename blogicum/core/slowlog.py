@@ -0,0 +1,192 @@
+import hashlib
+import json
+import logging
+import re
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import WatchedFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core import metrics
+
+re_string = re.compile(r"'(?:[^']|'')*'")
+re_number = re.compile(r'\b\d+(?:\.\d+)?\b')
+re_in_list = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+re_spaces = re.compile(r'\s+')
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+# Журнал пишется только в файл SLOW_QUERY_LOG
+logger.propagate = False
+
+_current = ContextVar('slow_query_request', default=None)
+
+# Сколько форм запросов процесс помнит, чтобы не повторять EXPLAIN
+MAX_SEEN_SHAPES = 10_000
+
+
+def normalize(sql):
+    """Функция приводит SQL к форме без литералов и длины списков IN"""
+    shape = re_string.sub('%s', sql)
+    shape = re_number.sub('%s', shape)
+    shape = re_in_list.sub('(...)', shape)
+    return re_spaces.sub(' ', shape).strip()
+
+
+def fingerprint(shape):
+    return hashlib.sha1(shape.encode()).hexdigest()[:16]
+
+
+def caller_stack(limit):
+    """Функция возвращает кадры стека из кода проекта, ближние последними"""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        f'{frame.filename}:{frame.lineno} in {frame.name}'
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and frame.filename != __file__
+        and '/site-packages/' not in frame.filename
+    ]
+    return frames[-limit:]
+
+
+@contextmanager
+def tracking_request(request):
+    """Запросы к БД внутри блока записываются с view этого запроса"""
+    token = _current.set(request)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class SlowQueryLog:
+    """Обёртка выполнения запросов, записывающая медленные в журнал.
+
+    Каждое выполнение пишется короткой строкой JSONL; первое появление
+    формы запроса в процессе — вместе с SQL, стеком и планом запроса.
+    Файл дописывают все процессы, поэтому журнал не ротирует его сам:
+    это делает logrotate, а процесс переоткрывает файл после ротации.
+    """
+
+    def __init__(self):
+        self._seen = set()
+        self._handler = None
+
+    def __call__(self, execute, sql, params, many, context):
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold is None:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - start) * 1000
+        if duration >= threshold:
+            self.record(context['connection'], sql, params, many, duration)
+        return result
+
+    def record(self, connection, sql, params, many, duration):
+        shape = normalize(sql)
+        key = fingerprint(shape)
+        request = _current.get()
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(),
+            'fingerprint': key,
+            'duration_ms': round(duration, 3),
+            'alias': connection.alias,
+            'view': request and metrics.view_name(request),
+        }
+        if key not in self._seen:
+            if len(self._seen) >= MAX_SEEN_SHAPES:
+                self._seen.clear()
+            self._seen.add(key)
+            entry.update({
+                'sql': shape,
+                'stack': caller_stack(settings.SLOW_QUERY_STACK_DEPTH),
+                'plan': None if many else self.explain(connection, sql,
+                                                       params),
+            })
+        self.write(entry)
+
+    def explain(self, connection, sql, params):
+        if not sql.lstrip()[:6].upper() == 'SELECT':
+            return None
+        prefix = (
+            'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite'
+            else 'EXPLAIN '
+        )
+        # Курсор драйвера минует обёртки выполнения: EXPLAIN не попадает
+        # ни в этот журнал, ни в метрики и трассировку запроса
+        try:
+            with connection.cursor() as cursor, \
+                    connection.wrap_database_errors:
+                cursor.cursor.execute(prefix + sql, params)
+                return [
+                    ' '.join(str(value) for value in row)
+                    for row in cursor.cursor.fetchall()
+                ]
+        except DatabaseError:
+            return None
+
+    def write(self, entry):
+        if self._handler is None:
+            path = Path(settings.SLOW_QUERY_LOG)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._handler = WatchedFileHandler(path, encoding='utf-8')
+            logger.addHandler(self._handler)
+        logger.info(json.dumps(entry, ensure_ascii=False))
+
+    def reset(self):
+        self._seen.clear()
+        if self._handler is not None:
+            logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+
+slow_query_log = SlowQueryLog()
+
+
+@receiver(connection_created)
+def install_slow_query_log(connection, **kwargs):
+    if slow_query_log not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_log)
+
+
+@receiver(setting_changed)
+def reset_slow_query_log(setting, **kwargs):
+    if setting.startswith('SLOW_QUERY_'):
+        slow_query_log.reset()
+
+
+def read_log(path):
+    """Функция читает журнал вместе с ротированными копиями, старые первыми"""
+    path = Path(path)
+    # Сжатые копии (.2.gz) не читаются
+    backups = sorted(
+        (
+            backup for backup in path.parent.glob(path.name + '.*')
+            if backup.suffix[1:].isdigit()
+        ),
+        key=lambda backup: int(backup.suffix[1:]),
+        reverse=True,
+    )
+    for log in [*backups, path]:
+        try:
+            file = open(log, encoding='utf-8')
+        except OSError:
+            continue
+        with file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
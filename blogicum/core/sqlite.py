@@ -0,0 +1,37 @@
+import re
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+re_pragma_value = re.compile(r'^-?\w+$')
+
+
+def apply_pragmas(connection, pragmas):
+    """Функция выполняет PRAGMA на соединении SQLite, порядок важен"""
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            value = str(value)
+            if not name.isidentifier() or not re_pragma_value.match(value):
+                raise ValueError(f'Недопустимая PRAGMA {name}={value}')
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def pragmas_for(connection):
+    """Функция выбирает PRAGMA для соединения.
+
+    Базе в памяти WAL и mmap не нужны, для неё выполняются только
+    настройки кеша и ожидания блокировок.
+    """
+    pragmas = dict(settings.SQLITE_PRAGMAS)
+    pragmas.update(connection.settings_dict.get('PRAGMAS', {}))
+    if connection.is_in_memory_db():
+        for name in ('journal_mode', 'mmap_size'):
+            pragmas.pop(name, None)
+    return pragmas
+
+
+@receiver(connection_created)
+def configure_sqlite(connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        apply_pragmas(connection, pragmas_for(connection))
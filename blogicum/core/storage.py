@@ -0,0 +1,107 @@
+import gzip
+import hashlib
+import os
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Имя файла в адресуемом по содержимому дереве: ab/cd/<sha256>...
+re_content_addressed = re.compile(
+    r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}[^/]*$'
+)
+
+
+def content_hash(content):
+    """Функция считает SHA-256 содержимого файла"""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+# Написания одного расширения; одинаковое содержимое получает одно имя
+EXTENSION_ALIASES = {'.jpeg': '.jpg', '.jpe': '.jpg', '.tif': '.tiff'}
+
+
+def content_name(name, digest):
+    """Функция возвращает имя файла по хешу с разбиением на каталоги"""
+    directory = os.path.dirname(name)
+    extension = os.path.splitext(name)[1].lower()
+    extension = EXTENSION_ALIASES.get(extension, extension)
+    return os.path.join(
+        directory, digest[:2], digest[2:4], f'{digest}{extension}'
+    )
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, именующее файлы по хешу содержимого.
+
+    Одинаковые файлы хранятся в одном экземпляре. Имена, уже лежащие в
+    адресуемом дереве (например, миниатюры), сохраняются без изменений.
+    """
+
+    def is_content_addressed(self, name):
+        return bool(re_content_addressed.search(name.replace('\\', '/')))
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if not self.is_content_addressed(name):
+            name = content_name(name, content_hash(content))
+            if self.exists(name):
+                return name
+        return super().save(name, content, max_length=max_length)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хранилище статики с хешем в именах и заранее сжатыми копиями.
+
+    Манифест читается один раз при создании хранилища, а тег static берёт
+    имена из него. Пока collectstatic не запускался, отдаются исходные имена.
+    """
+
+    compressible_extensions = (
+        '.css', '.js', '.svg', '.ico', '.txt', '.json', '.map'
+    )
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(self.compressible_extensions):
+                self.compress(name)
+
+    def compress(self, name):
+        """Сохраняет .gz и .br копии файла, если они меньше оригинала"""
+        with self.open(name) as file:
+            content = file.read()
+        variants = [('.gz', gzip.compress(content, 9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
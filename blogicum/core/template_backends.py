@@ -0,0 +1,53 @@
+from django.template.backends import django, jinja2
+
+from core import metrics
+
+
+class TimedTemplateMixin:
+    """Учитывает время отрисовки шаблона в метриках запроса"""
+
+    def render(self, context=None, request=None):
+        stats = metrics.current_request()
+        if stats is None:
+            return super().render(context, request)
+        with stats.timing_template(self.timing_name()):
+            return super().render(context, request)
+
+
+class DjangoTemplate(TimedTemplateMixin, django.Template):
+    def timing_name(self):
+        return self.template.name
+
+
+class JinjaTemplate(TimedTemplateMixin, jinja2.Template):
+    def timing_name(self):
+        # Шаблоны Jinja2 и их include учитывает core.jinja.TimedTemplate
+        return None
+
+
+class DjangoTemplates(django.DjangoTemplates):
+    """Бэкенд шаблонов Django с замером времени отрисовки"""
+
+    def from_string(self, template_code):
+        return DjangoTemplate(
+            super().from_string(template_code).template, self
+        )
+
+    def get_template(self, template_name):
+        return DjangoTemplate(
+            super().get_template(template_name).template, self
+        )
+
+
+class Jinja2(jinja2.Jinja2):
+    """Бэкенд шаблонов Jinja2 с замером времени отрисовки"""
+
+    def from_string(self, template_code):
+        return JinjaTemplate(
+            super().from_string(template_code).template, self
+        )
+
+    def get_template(self, template_name):
+        return JinjaTemplate(
+            super().get_template(template_name).template, self
+        )
@@ -0,0 +1,51 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+
+register = template.Library()
+
+
+def _read_critical_css():
+    path = finders.find(settings.CSS_CRITICAL)
+    if path is None or not finders.find(settings.CSS_PURGED):
+        return None
+    with open(path, encoding='utf-8') as file:
+        return file.read()
+
+
+_cached_critical_css = lru_cache(maxsize=None)(_read_critical_css)
+
+
+@receiver(setting_changed)
+def clear_critical_css(setting, **kwargs):
+    if setting in ('STATICFILES_DIRS', 'CSS_CRITICAL', 'CSS_PURGED'):
+        _cached_critical_css.cache_clear()
+
+
+@register.simple_tag
+def critical_css():
+    """Тег встраивает критический CSS и подключает остальной без блокировки.
+
+    Пока команда build_css не запускалась, подключается полный Bootstrap.
+    """
+    css = _read_critical_css() if settings.DEBUG else _cached_critical_css()
+    if css is None:
+        return bootstrap_css()
+    href = static(settings.CSS_PURGED)
+    return format_html(
+        '<style>{}</style>'
+        '<link rel="preload" href="{}" as="style" '
+        'onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(css.replace('</', '<\\/')),
+        href,
+        href,
+    )
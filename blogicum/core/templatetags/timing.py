@@ -0,0 +1,35 @@
+from django import template
+from django.template.loader_tags import IncludeNode, do_include
+
+from core import metrics
+
+register = template.Library()
+
+
+class TimedIncludeNode(IncludeNode):
+    """Тег include, учитывающий время отрисовки вложенного шаблона"""
+
+    def render(self, context):
+        stats = metrics.current_request()
+        if stats is None or not stats.detailed:
+            return super().render(context)
+        with stats.timing_template(self.template_name(context)):
+            return super().render(context)
+
+    def template_name(self, context):
+        included = self.template.resolve(context)
+        if isinstance(included, str):
+            return included
+        included = getattr(included, 'template', included)
+        return getattr(included, 'name', None) or str(included)
+
+
+@register.tag('include')
+def do_timed_include(parser, token):
+    """Подменяет встроенный include, подключается через OPTIONS.builtins"""
+    node = do_include(parser, token)
+    return TimedIncludeNode(
+        node.template,
+        extra_context=node.extra_context,
+        isolated_context=node.isolated_context,
+    )
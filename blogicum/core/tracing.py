@@ -0,0 +1,221 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from core.profiling import prune
+
+re_traceparent = re.compile(
+    r'^00-(?P<trace_id>[0-9a-f]{32})-(?P<parent_id>[0-9a-f]{16})'
+    r'-(?P<flags>[0-9a-f]{2})$'
+)
+re_table = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?(\w+)"?', re.IGNORECASE)
+
+# Сколько символов SQL сохранять в аргументах span
+SQL_PREVIEW_LENGTH = 500
+
+
+def _new_id(length):
+    return '%0*x' % (length, random.getrandbits(length * 4))
+
+
+class Trace:
+    """Трассировка одного запроса: плоский список завершённых span.
+
+    Вложенность восстанавливается просмотрщиком по времени начала и
+    длительности span в одном потоке.
+    """
+
+    def __init__(self, trace_id=None, parent_id=None):
+        self.trace_id = trace_id or _new_id(32)
+        self.parent_id = parent_id
+        self.span_id = _new_id(16)
+        self.started_at = datetime.now(timezone.utc)
+        self.origin = time.perf_counter()
+        self.thread_id = threading.get_ident()
+        self.events = []
+        self.view_started = None
+
+    def add(self, name, category, start, end, **args):
+        self.events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((start - self.origin) * 1_000_000, 3),
+            'dur': round((end - start) * 1_000_000, 3),
+            'pid': os.getpid(),
+            'tid': self.thread_id,
+            'args': args,
+        })
+
+    @contextmanager
+    def span(self, name, category, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, category, start, time.perf_counter(), **args)
+
+    @property
+    def traceparent(self):
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def export(self, directory, **metadata):
+        """Метод сохраняет трассировку в формате Chrome Trace Event"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        timestamp = self.started_at.strftime('%Y%m%dT%H%M%S%fZ')
+        path = directory / f'{timestamp}-{self.trace_id}.json'
+        path.write_text(json.dumps({
+            'traceEvents': sorted(self.events, key=lambda event: event['ts']),
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'trace_id': self.trace_id,
+                'parent_id': self.parent_id,
+                'started_at': self.started_at.isoformat(),
+                **metadata,
+            },
+        }))
+        return path
+
+
+_current = ContextVar('trace', default=None)
+
+
+def current_trace():
+    """Функция возвращает трассировку текущего запроса или None"""
+    return _current.get()
+
+
+def start_trace(request):
+    """Функция начинает трассировку, если запрос выбран для неё"""
+    match = re_traceparent.match(request.META.get('HTTP_TRACEPARENT', ''))
+    if match and settings.TRACING_TRUST_INCOMING:
+        if int(match['flags'], 16) & 1:
+            return Trace(match['trace_id'], match['parent_id'])
+    rate = settings.TRACING_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return Trace(match['trace_id'] if match else None,
+                     match['parent_id'] if match else None)
+    return None
+
+
+class SQLSpans:
+    """Обёртка выполнения запросов, добавляющая span на каждый запрос"""
+
+    def __init__(self, trace):
+        self.trace = trace
+
+    def __call__(self, execute, sql, params, many, context):
+        table = re_table.search(sql)
+        name = 'SQL %s %s' % (
+            sql.lstrip().split(None, 1)[0].upper(),
+            table[1] if table else '',
+        )
+        with self.trace.span(
+                name.strip(), 'sql',
+                sql=sql[:SQL_PREVIEW_LENGTH],
+                alias=context['connection'].alias,
+        ):
+            return execute(sql, params, many, context)
+
+
+@contextmanager
+def tracing_queries(trace):
+    wrapper = SQLSpans(trace)
+    wrapped = []
+    try:
+        for connection in connections.all():
+            connection.execute_wrappers.append(wrapper)
+            wrapped.append(connection)
+        yield
+    finally:
+        for connection in wrapped:
+            connection.execute_wrappers.remove(wrapper)
+
+
+@contextmanager
+def tracing_request(request):
+    trace = start_trace(request)
+    if trace is None:
+        yield None
+        return
+    token = _current.set(trace)
+    try:
+        with tracing_queries(trace):
+            yield trace
+    finally:
+        _current.reset(token)
+    resolver_match = getattr(request, 'resolver_match', None)
+    trace.export(
+        settings.TRACING_DIR,
+        method=request.method,
+        path=request.path,
+        view=resolver_match.view_name if resolver_match else None,
+    )
+    prune(Path(settings.TRACING_DIR), settings.TRACING_MAX_FILES)
+
+
+def traced_handler(get_response, name):
+    """Оборачивает следующее звено цепочки middleware в span"""
+
+    def handler(request):
+        trace = _current.get()
+        if trace is None:
+            return get_response(request)
+        with trace.span(name, 'middleware'):
+            return get_response(request)
+
+    return handler
+
+
+def traced_view_handler(get_response):
+    """Оборачивает обработчик Django: разбор URL и выполнение view"""
+
+    def handler(request):
+        trace = _current.get()
+        if trace is None:
+            return get_response(request)
+        start = time.perf_counter()
+        try:
+            return get_response(request)
+        finally:
+            end = time.perf_counter()
+            view_started = trace.view_started or end
+            trace.add('resolve', 'django', start, view_started)
+            if trace.view_started is not None:
+                resolver_match = request.resolver_match
+                trace.add(
+                    f'view {resolver_match.view_name}', 'view',
+                    view_started, end,
+                    function=resolver_match._func_path,
+                )
+                trace.view_started = None
+
+    return handler
+
+
+def trace_chain(middleware):
+    """Функция оборачивает в span каждое звено после middleware.
+
+    Django хранит следующее звено в атрибуте get_response, обёрнутом
+    convert_exception_to_response; последнее звено — сам обработчик.
+    """
+    node = middleware
+    while hasattr(node, 'get_response'):
+        inner = node.get_response
+        target = getattr(inner, '__wrapped__', inner)
+        if hasattr(target, 'get_response'):
+            node.get_response = traced_handler(inner, type(target).__name__)
+        else:
+            node.get_response = traced_view_handler(inner)
+        node = target
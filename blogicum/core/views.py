@@ -0,0 +1,186 @@
+import mimetypes
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from core import metrics
+from core.profiling import make_token, recent_captures
+
+re_range = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def _is_content_addressed(path):
+    check = getattr(default_storage, 'is_content_addressed', None)
+    return bool(check and check(path))
+
+
+def _etag(path, stat):
+    if _is_content_addressed(path):
+        return '"%s"' % posixpath.basename(path).split('.')[0]
+    return '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+
+
+def _cache_control(path):
+    if _is_content_addressed(path):
+        return IMMUTABLE_CACHE_CONTROL
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+def parse_range(header, size):
+    """Функция разбирает заголовок Range с одним диапазоном.
+
+    Возвращает (начало, длина), None для ответа целиком или ValueError,
+    если диапазон невыполним.
+    """
+    match = re_range.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = min(int(end), size)
+        if length == 0:
+            raise ValueError(header)
+        return size - length, length
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+def _read_range(path, start, length, chunk_size):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _sendfile_response(path, fullpath, content_type):
+    response = HttpResponse(content_type=content_type)
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    if backend == 'x-accel-redirect':
+        response.headers['X-Accel-Redirect'] = quote(
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+        )
+    else:
+        response.headers['X-Sendfile'] = str(fullpath)
+    return response
+
+
+def _file_response(request, fullpath, size, content_type, etag):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and (not if_range or if_range == etag):
+        try:
+            requested = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{size}'
+            return response
+        if requested is not None:
+            start, length = requested
+            response = StreamingHttpResponse(
+                _read_range(
+                    fullpath, start, length, settings.MEDIA_CHUNK_SIZE
+                ),
+                status=206,
+                content_type=content_type,
+            )
+            response.headers['Content-Length'] = str(length)
+            response.headers['Content-Range'] = (
+                f'bytes {start}-{start + length - 1}/{size}'
+            )
+            return response
+    response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    response.block_size = settings.MEDIA_CHUNK_SIZE
+    return response
+
+
+def serve_media(request, path):
+    """View отдаёт медиафайлы с заголовками кеширования и поддержкой Range"""
+    try:
+        fullpath = Path(safe_join(settings.MEDIA_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = fullpath.stat()
+    except OSError:
+        raise Http404
+    if not fullpath.is_file():
+        raise Http404
+
+    etag = _etag(path, stat)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        content_type = (
+            mimetypes.guess_type(fullpath.name)[0]
+            or 'application/octet-stream'
+        )
+        if settings.MEDIA_SENDFILE_BACKEND:
+            response = _sendfile_response(path, fullpath, content_type)
+        else:
+            response = _file_response(
+                request, fullpath, stat.st_size, content_type, etag
+            )
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    response.headers['Cache-Control'] = _cache_control(path)
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@staff_member_required
+def profiling_captures(request):
+    """Страница админки со сводками последних снимков профилирования"""
+    return render(request, 'admin/profiling.html', {
+        **admin.site.each_context(request),
+        'title': 'Профилирование запросов',
+        'captures': recent_captures(),
+        'token': make_token(),
+        'query_param': settings.PROFILING_QUERY_PARAM,
+    })
+
+
+@staff_member_required
+def profiling_download(request, capture_id):
+    """Функция отдаёт файл .pstats снимка профилирования"""
+    path = Path(settings.PROFILING_DIR) / f'{capture_id}.pstats'
+    if not path.is_file():
+        raise Http404
+    return FileResponse(
+        open(path, 'rb'), as_attachment=True, filename=path.name
+    )
+
+
+def metrics_view(request):
+    """Выдача метрик всех процессов в формате Prometheus"""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(
+        metrics.exposition(metrics.store.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
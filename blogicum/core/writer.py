@@ -0,0 +1,233 @@
+import contextvars
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    OperationalError,
+    connection,
+    connections,
+    transaction,
+)
+
+from core import metrics
+from core.connections import recycle, release
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class AbandonedWrite(Exception):
+    """Отправитель перестал ждать единицу записи, она не фиксируется"""
+
+
+def is_locked_error(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+class WriteUnit:
+    """Единица записи: функция, контекст запроса и будущий результат.
+
+    Вместе с контекстом запоминаются обёртки выполнения запросов на
+    соединении отправителя: метрики, профилирование и трассировка запроса
+    учитывают и запросы, выполненные потоком-писателем.
+    """
+
+    def __init__(self, function, args, kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.context = contextvars.copy_context()
+        self.wrappers = list(connections[DEFAULT_DB_ALIAS].execute_wrappers)
+        self.future = Future()
+        self.abandoned = False
+
+    def run(self):
+        writer_connection = connections[DEFAULT_DB_ALIAS]
+        with ExitStack() as stack:
+            for wrapper in self.wrappers:
+                # Внутри потока отправителя обёртки уже установлены
+                if wrapper not in writer_connection.execute_wrappers:
+                    stack.enter_context(
+                        writer_connection.execute_wrapper(wrapper)
+                    )
+            return self.context.run(
+                self.function, *self.args, **self.kwargs
+            )
+
+    def abandon(self):
+        """Метод отменяет единицу, которую отправитель перестал ждать.
+
+        Ещё не начатая единица отменяется; выполняемая откатывается до
+        своей точки сохранения.
+        """
+        if not self.future.cancel():
+            self.abandoned = True
+
+
+_held = threading.local()
+
+
+@contextmanager
+def file_lock(path):
+    """Межпроцессная блокировка записи через flock.
+
+    Повторный вход в том же потоке не блокирует: колбэки on_commit
+    выполняются, пока поток-писатель ещё держит блокировку.
+    """
+    if path is None or fcntl is None or getattr(_held, 'path', None) == path:
+        yield
+        return
+    with open(path, 'a') as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        _held.path = path
+        try:
+            yield
+        finally:
+            _held.path = None
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def lock_path():
+    """Файл блокировки рядом с файлом БД; для БД в памяти не нужен"""
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return None
+    return f'{connection.settings_dict["NAME"]}.write-lock'
+
+
+class WriteQueue:
+    """Очередь записи процесса с единственным потоком-писателем.
+
+    Поток забирает несколько единиц записи сразу и выполняет их в одной
+    транзакции, каждую в своей точке сохранения: ошибка одной единицы не
+    отменяет остальные. Между процессами запись упорядочивает flock.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, function, *args, **kwargs):
+        """Метод выполняет функцию в потоке-писателе и возвращает результат.
+
+        Внутри открытой транзакции функция выполняется сразу: другое
+        соединение не увидело бы её незафиксированных изменений.
+        """
+        if connection.in_atomic_block:
+            return function(*args, **kwargs)
+        unit = WriteUnit(function, args, kwargs)
+        if settings.WRITE_QUEUE_ENABLED:
+            self._ensure_thread()
+            self._queue.put(unit)
+        else:
+            self._write([unit])
+        try:
+            return unit.future.result(timeout=settings.WRITE_QUEUE_TIMEOUT)
+        except FutureTimeoutError:
+            unit.abandon()
+            raise
+
+    def _ensure_thread(self):
+        # После fork поток-писатель родителя в дочернем процессе не живёт
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(
+                target=self._loop, name='write-queue', daemon=True
+            )
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            # Отменённые по таймауту единицы не выполняются
+            batch = [
+                unit for unit in self._take_batch()
+                if unit.future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            # Соединение потока-писателя живёт дольше любого запроса:
+            # срок жизни, простой и работоспособность проверяются перед
+            # каждой порцией, как перед запросом
+            writer_connection = connections[DEFAULT_DB_ALIAS]
+            writer_connection.close_if_unusable_or_obsolete()
+            recycle(writer_connection)
+            try:
+                self._write(batch)
+            except Exception as error:
+                for unit in batch:
+                    if not unit.future.done():
+                        unit.future.set_exception(error)
+                connection.close()
+            release(writer_connection)
+
+    def _take_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + settings.WRITE_QUEUE_BATCH_WAIT
+        while len(batch) < settings.WRITE_QUEUE_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(
+                    self._queue.get(timeout=timeout) if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        retries = settings.WRITE_QUEUE_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                with file_lock(lock_path()):
+                    results = self._commit(batch)
+                break
+            except OperationalError as error:
+                if not is_locked_error(error) or attempt == retries:
+                    raise
+                metrics.inc('write_queue_retries_total')
+                time.sleep(settings.WRITE_QUEUE_BACKOFF * 2 ** attempt)
+        metrics.inc('write_queue_batches_total')
+        metrics.inc('write_queue_units_total', amount=len(batch))
+        for unit, (ok, value) in zip(batch, results):
+            if ok:
+                unit.future.set_result(value)
+            else:
+                unit.future.set_exception(value)
+
+    def _commit(self, batch):
+        results = []
+        with transaction.atomic():
+            for unit in batch:
+                try:
+                    with transaction.atomic():
+                        result = unit.run()
+                        if unit.abandoned:
+                            raise AbandonedWrite()
+                        results.append((True, result))
+                except Exception as error:
+                    # Блокировка БД отменяет всю порцию для повтора
+                    if isinstance(error, OperationalError) and (
+                            is_locked_error(error)):
+                        raise
+                    results.append((False, error))
+        return results
+
+
+write_queue = WriteQueue()
+submit = write_queue.submit
@@ -0,0 +1,135 @@
+import hashlib
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.template import Context, Template, engines
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import resolve
+from django.utils.cache import get_conditional_response
+from django.utils.html import escape
+
+# Метки, на место которых при отдаче страницы подставляются данные запроса
+USERNAME_MARK = 'prerenderusernamemark'
+ABSOLUTE_URI_MARK = 'prerenderabsoluteurimark'
+MARK_VARIABLES = {
+    USERNAME_MARK: '{{ username }}',
+    ABSOLUTE_URI_MARK: '{{ absolute_uri }}',
+}
+re_marks = re.compile('(%s)' % '|'.join(MARK_VARIABLES))
+
+# Все предварительно отрисованные страницы процесса
+registry = []
+
+
+class MarkUser(AnonymousUser):
+    """Пользователь-заглушка для отрисовки варианта страницы для входа"""
+
+    username = USERNAME_MARK
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    def get_username(self):
+        return self.username
+
+
+def _residual_source(html):
+    """Функция превращает готовый HTML в шаблон с переменными на месте меток"""
+    parts = []
+    for index, piece in enumerate(re_marks.split(html)):
+        if index % 2:
+            parts.append(MARK_VARIABLES[piece])
+        elif piece:
+            parts.append('{% verbatim %}' + piece + '{% endverbatim %}')
+    return ''.join(parts)
+
+
+def _is_plain(username):
+    """Имя, которое одинаково выглядит и в тексте, и в URL"""
+    return escape(username) == username == quote(username, safe='@+')
+
+
+class PrerenderedPage:
+    """Страница, отрисованная один раз для гостя и для вошедшего пользователя.
+
+    Шаблон с контекст-процессорами выполняется однократно, а на запрос
+    отрисовывается лишь остаточный шаблон из готового HTML и переменных
+    с именем пользователя и адресом запроса.
+    """
+
+    def __init__(self, template_name, path=None, status=200):
+        self.template_name = template_name
+        self.path = path
+        self.status = status
+        self._variants = {}
+        registry.append(self)
+
+    def build(self, authenticated):
+        request = RequestFactory().get(self.path or '/')
+        request.user = MarkUser() if authenticated else AnonymousUser()
+        request.resolver_match = resolve(self.path) if self.path else None
+        request.build_absolute_uri = lambda location=None: ABSOLUTE_URI_MARK
+        html = render_to_string(self.template_name, request=request)
+        return Template(
+            _residual_source(html),
+            engine=engines['django'].engine,
+            name=self.template_name,
+        )
+
+    def get_variant(self, authenticated):
+        if not settings.PRERENDER_ENABLED:
+            return self.build(authenticated)
+        if authenticated not in self._variants:
+            self._variants[authenticated] = self.build(authenticated)
+        return self._variants[authenticated]
+
+    def warm(self):
+        for authenticated in (False, True):
+            self.get_variant(authenticated)
+
+    def response(self, request):
+        status = self.status
+        user = getattr(request, 'user', None)
+        authenticated = bool(user and user.is_authenticated)
+        if authenticated and not _is_plain(user.get_username()):
+            return render(request, self.template_name, status=status)
+        content = self.get_variant(authenticated).render(Context({
+            'username': user.get_username() if authenticated else '',
+            # Вызывается, только если шаблон выводит адрес
+            'absolute_uri': request.build_absolute_uri,
+        })).encode()
+        etag = '"%s"' % hashlib.sha1(content).hexdigest()
+        if status == 200:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+        response = HttpResponse(content, status=status)
+        response.headers['ETag'] = etag
+        return response
+
+
+def warm():
+    """Функция отрисовывает все зарегистрированные страницы при запуске"""
+    if not settings.PRERENDER_ENABLED:
+        return
+    for page in registry:
+        page.warm()
+
+
+@receiver(setting_changed)
+def reset_prerendered_pages(**kwargs):
+    """Сбрасывает отрисованные страницы при изменении настроек в тестах"""
+    for page in registry:
+        page._variants.clear()
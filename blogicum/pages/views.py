@@ -1,22 +1,41 @@
-from django.shortcuts import render
+from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 
+from core.routers import replica_view
+from pages.prerender import PrerenderedPage
 
-class About(TemplateView):
+csrf_failure_page = PrerenderedPage('pages/403csrf.html', status=403)
+not_found_page = PrerenderedPage('pages/404.html', status=404)
+server_error_page = PrerenderedPage('pages/500.html', status=500)
+
+
+@method_decorator(replica_view, name='dispatch')
+class PrerenderedTemplateView(TemplateView):
+    """CBV, отдающая заранее отрисованную статическую страницу"""
+
+    page = None
+
+    def get(self, request, *args, **kwargs):
+        return self.page.response(request)
+
+
+class About(PrerenderedTemplateView):
     template_name = 'pages/about.html'
+    page = PrerenderedPage(template_name, path='/pages/about/')
 
 
-class Rules(TemplateView):
+class Rules(PrerenderedTemplateView):
     template_name = 'pages/rules.html'
+    page = PrerenderedPage(template_name, path='/pages/rules/')
 
 
 def csrf_failure(request, reason=''):
-    return render(request, 'pages/403csrf.html', status=403)
+    return csrf_failure_page.response(request)
 
 
 def page_not_found(request, exception):
-    return render(request, 'pages/404.html', status=404)
+    return not_found_page.response(request)
 
 
 def wrong_of_server(request):
-    return render(request, 'pages/500.html', status=500)
+    return server_error_page.response(request)
@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from blog.management.commands.benchmark_views import build_scenarios
+from blog.synthetic import generate
+from core.loadtest import benchmark_database, percentile, run
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) is None
+
+
+@pytest.mark.parametrize('command, option', [
+    ('benchmark_views', '--requests'),
+    ('benchmark_views', '--concurrency'),
+    ('benchmark_connections', '--requests'),
+    ('benchmark_sqlite', '--posts'),
+])
+def test_counts_must_be_positive(command, option):
+    with pytest.raises(CommandError, match='больше 0'):
+        call_command(command, option, '0')
+
+
+def test_benchmark_database_restores_settings(monkeypatch):
+    test_settings = connection.settings_dict['TEST']
+    test_name = test_settings['NAME']
+    calls = []
+    # Настоящая БД в памяти не закрывается, поэтому создание и удаление
+    # тестовой БД подменены
+    monkeypatch.setattr(
+        'core.loadtest.setup_databases',
+        lambda **kwargs: calls.append(test_settings['NAME']) or 'config',
+    )
+    monkeypatch.setattr(
+        'core.loadtest.teardown_databases',
+        lambda config, **kwargs: calls.append(config),
+    )
+    with pytest.raises(RuntimeError):
+        with benchmark_database():
+            raise RuntimeError
+    assert Path(calls[0]).name == 'benchmark.sqlite3'
+    assert calls[1] == 'config'
+    assert test_settings['NAME'] == test_name
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_reports_every_scenario():
+    generate(users=3, posts=15, comments_per_post=2)
+    scenarios = build_scenarios()
+    options = {'requests': 4, 'profile_requests': 2, 'warmup': 1}
+    # Общая БД SQLite в памяти блокирует таблицы целиком, поэтому
+    # параллельно выполняются только чтения
+    report = {
+        **run(
+            [scenario for scenario in scenarios if scenario.method == 'GET'],
+            concurrency=2, **options
+        ),
+        **run(
+            [scenario for scenario in scenarios if scenario.method != 'GET'],
+            concurrency=1, **options
+        ),
+    }
+    assert set(report) == {
+        'index', 'category_posts', 'profile', 'post_detail', 'add_comment'
+    }
+    for name, result in report.items():
+        assert result['errors'] == 0, name
+        assert result['requests'] == 4
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert result['queries_per_request'] > 0
+        assert result['memory_per_request_bytes'] > 0
+    json.dumps(report)
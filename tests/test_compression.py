@@ -0,0 +1,104 @@
+import gzip
+from unittest import mock
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.utils.cache import get_conditional_response
+
+from core import compression
+from core.middleware import CompressionMiddleware
+
+
+def _page(request):
+    return HttpResponse('<p>Блогикум</p>' * 100)
+
+
+def _tagged_page(request):
+    # Как prerender: view сам отвечает 304 на совпавший ETag
+    etag = '"abc"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = _page(request)
+    response.headers['ETag'] = etag
+    return response
+
+
+def _stream(request):
+    return StreamingHttpResponse(
+        (b'<p>chunk</p>' * 50 for _ in range(5)), content_type='text/html'
+    )
+
+
+@pytest.mark.django_db
+def test_html_page_is_gzipped(client):
+    response = client.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response['Content-Encoding'] == 'gzip', (
+        'Убедитесь, что HTML-страницы сжимаются, если клиент поддерживает gzip.'
+    )
+    assert 'Accept-Encoding' in response['Vary']
+    assert b'<html' in gzip.decompress(response.content)
+
+
+@pytest.mark.django_db
+def test_page_without_accept_encoding_is_plain(client):
+    response = client.get('/')
+    assert not response.has_header('Content-Encoding')
+
+
+def test_compressed_variant_is_cached():
+    middleware = CompressionMiddleware(_page)
+    factory = RequestFactory(HTTP_ACCEPT_ENCODING='gzip')
+    with mock.patch.object(
+            compression, 'compress_bytes', wraps=compression.compress_bytes
+    ) as compress:
+        first = middleware(factory.get('/'))
+        second = middleware(factory.get('/'))
+    assert first.content == second.content
+    assert compress.call_count <= 1, (
+        'Убедитесь, что одинаковые страницы сжимаются один раз.'
+    )
+
+
+def test_small_response_is_not_compressed(settings):
+    settings.COMPRESSION_MIN_SIZE = 10 ** 6
+    middleware = CompressionMiddleware(_page)
+    response = middleware(RequestFactory(HTTP_ACCEPT_ENCODING='gzip').get('/'))
+    assert not response.has_header('Content-Encoding')
+
+
+def test_streaming_response_is_compressed():
+    middleware = CompressionMiddleware(_stream)
+    response = middleware(RequestFactory(HTTP_ACCEPT_ENCODING='gzip').get('/'))
+    assert response['Content-Encoding'] == 'gzip'
+    body = gzip.decompress(b''.join(response.streaming_content))
+    assert body == b'<p>chunk</p>' * 250
+
+
+def test_compressed_variant_keeps_strong_etag():
+    middleware = CompressionMiddleware(_tagged_page)
+    factory = RequestFactory(HTTP_ACCEPT_ENCODING='gzip')
+    first = middleware(factory.get('/'))
+    second = middleware(factory.get('/'))
+    assert first['ETag'] == '"abc-gzip"'
+    assert first.content == second.content
+    not_modified = middleware(
+        factory.get('/', HTTP_IF_NONE_MATCH='"abc-gzip"')
+    )
+    assert not_modified.status_code == 304
+    assert not_modified['ETag'] == '"abc-gzip"'
+    plain = middleware(RequestFactory().get('/'))
+    assert plain['ETag'] == '"abc"'
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'status': 206, 'headers': {'Content-Range': 'bytes 0-1599/3200'}},
+    {'headers': {'Content-Range': 'bytes */3200'}},
+    {'headers': {'Cache-Control': 'public, no-transform'}},
+])
+def test_partial_and_no_transform_responses_are_not_compressed(kwargs):
+    middleware = CompressionMiddleware(
+        lambda request: HttpResponse('<p>Блогикум</p>' * 100, **kwargs)
+    )
+    response = middleware(RequestFactory(HTTP_ACCEPT_ENCODING='gzip').get('/'))
+    assert not response.has_header('Content-Encoding')
@@ -0,0 +1,82 @@
+import pytest
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.utils import ConnectionHandler
+
+from core import metrics
+from core.connections import recycle, release
+
+
+def counter(name, labels):
+    return metrics.registry.snapshot().get((name, labels), 0)
+
+
+@pytest.fixture
+def make_connection(tmp_path):
+    handlers = []
+
+    def make(**options):
+        handler = ConnectionHandler({'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(tmp_path / 'connections.sqlite3'),
+            **options,
+        }})
+        handlers.append(handler)
+        conn = handler['default']
+        conn.ensure_connection()
+        return conn
+
+    yield make
+    for handler in handlers:
+        handler.close_all()
+
+
+@pytest.mark.django_db
+def test_opened_connections_are_counted(make_connection):
+    opened = counter('db_connections_opened_total', ('default',))
+    make_connection()
+    make_connection()
+    assert counter('db_connections_opened_total', ('default',)) == opened + 2
+
+
+@pytest.mark.django_db
+def test_healthy_connection_is_reused(make_connection):
+    conn = make_connection(CONN_MAX_IDLE=60, CONN_HEALTH_CHECKS=True)
+    raw = conn.connection
+    release(conn)
+    assert recycle(conn) is None
+    assert conn.connection is raw
+
+
+@pytest.mark.django_db
+def test_idle_connection_is_recycled(make_connection):
+    closed = counter('db_connections_closed_total', ('default', 'idle'))
+    conn = make_connection(CONN_MAX_IDLE=0)
+    release(conn)
+    assert recycle(conn) == 'idle'
+    assert conn.connection is None
+    assert counter(
+        'db_connections_closed_total', ('default', 'idle')
+    ) == closed + 1
+
+
+@pytest.mark.django_db
+def test_broken_connection_fails_health_check(make_connection):
+    conn = make_connection(CONN_HEALTH_CHECKS=True)
+    conn.connection.close()
+    assert recycle(conn) == 'unhealthy'
+    assert conn.connection is None
+    # Без проверки сломанное соединение осталось бы у потока
+    unchecked = make_connection()
+    unchecked.connection.close()
+    assert recycle(unchecked) is None
+
+
+@pytest.mark.django_db
+def test_connection_in_transaction_is_kept(monkeypatch):
+    # Тест идёт внутри транзакции: простаивавшее соединение не закрывается
+    monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_IDLE', 0)
+    raw = connection.connection
+    request_finished.send(sender=None)
+    request_started.send(sender=None)
+    assert connection.connection is raw
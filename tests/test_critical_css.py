@@ -0,0 +1,54 @@
+import pytest
+from django.core.management import call_command
+
+from core.css import purge
+
+
+def test_purge_keeps_only_used_classes():
+    css = (
+        '@charset "UTF-8";/*! license */.btn{color:red}.unused{color:blue}'
+        '.a,.b:not(.c){margin:0}@media (min-width:576px){.btn{padding:0}'
+        '.unused{padding:1px}}@media print{.unused{display:none}}'
+    )
+    result = purge(css, {'btn', 'b'})
+    assert result == (
+        '@charset "UTF-8";/*! license */.btn{color:red}.b:not(.c){margin:0}'
+        '@media (min-width:576px){.btn{padding:0}}'
+    )
+
+
+@pytest.fixture
+def built_css(settings, tmp_path):
+    source = settings.STATICFILES_DIRS[0] / 'css'
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'bootstrap.min.css').write_bytes(
+        (source / 'bootstrap.min.css').read_bytes()
+    )
+    settings.STATICFILES_DIRS = [tmp_path]
+    call_command('build_css', verbosity=0)
+    return tmp_path / 'css'
+
+
+def test_build_css_outputs(built_css):
+    purged = (built_css / 'bootstrap.purged.css').read_text()
+    critical = (built_css / 'bootstrap.critical.css').read_text()
+    full = (built_css / 'bootstrap.min.css').read_text()
+    assert len(critical) < len(purged) < len(full)
+    assert '.navbar{' in critical
+    assert '.form-control{' in purged, (
+        'Убедитесь, что классы разметки django_bootstrap5 не удаляются.'
+    )
+
+
+@pytest.mark.django_db
+def test_base_inlines_critical_css(built_css, client):
+    content = client.get('/').content.decode()
+    assert '<style>' in content
+    assert 'rel="preload"' in content and 'bootstrap.purged' in content
+
+
+@pytest.mark.django_db
+def test_base_falls_back_to_bootstrap(client, settings, tmp_path):
+    settings.STATICFILES_DIRS = [tmp_path]
+    content = client.get('/').content.decode()
+    assert 'bootstrap' in content and '<style>' not in content
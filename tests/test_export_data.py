@@ -0,0 +1,45 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils.timezone import now
+
+from blog.dataset import MODELS, iter_records
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_export_writes_gzip_jsonl_per_model(
+        tmp_path, many_posts_with_published_locations
+):
+    call_command('export_data', str(tmp_path), batch_size=3, verbosity=0)
+    for label in MODELS:
+        assert (tmp_path / f'{label}.jsonl.gz').exists()
+    records = list(iter_records(tmp_path / 'blog.post.jsonl.gz'))
+    assert [record['pk'] for record in records] == list(
+        Post.objects.order_by('pk').values_list('pk', flat=True)
+    )
+    assert set(records[0]['fields']) >= {'title', 'text', 'author', 'pub_date'}
+    manifest = json.loads((tmp_path / 'manifest.json').read_text())
+    assert manifest['counts']['blog.post'] == len(records)
+
+
+@pytest.mark.django_db
+def test_incremental_export_since_previous_manifest(
+        tmp_path, many_posts_with_published_locations
+):
+    full = tmp_path / 'full'
+    call_command('export_data', str(full), verbosity=0)
+    Post.objects.update(created_at=now() - timedelta(days=1))
+    newest = Post.objects.order_by('pk').last()
+    Post.objects.filter(pk=newest.pk).update(
+        created_at=now() + timedelta(minutes=1)
+    )
+    delta = tmp_path / 'delta'
+    call_command(
+        'export_data', str(delta), since=str(full / 'manifest.json'),
+        model=['blog.post'], verbosity=0,
+    )
+    records = list(iter_records(delta / 'blog.post.jsonl.gz'))
+    assert [record['pk'] for record in records] == [newest.pk]
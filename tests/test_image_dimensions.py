@@ -0,0 +1,53 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import Post
+
+
+def _image_file(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height)).save(buffer, format='JPEG')
+    return ImageFile(buffer, name='photo.jpg')
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.mark.django_db
+def test_dimensions_saved_on_upload(mixer):
+    post = mixer.blend('blog.Post', image=_image_file(400, 250))
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (400, 250)
+
+
+@pytest.mark.django_db
+def test_feed_cards_have_dimensions_and_lazy_loading(
+        mixer, client, published_category):
+    mixer.cycle(3).blend(
+        'blog.Post', image=_image_file(400, 250),
+        category=published_category, is_published=True,
+    )
+    content = client.get('/').content.decode()
+    assert content.count('width="400" height="250"') == 3, (
+        'Убедитесь, что у изображений в ленте указаны width и height.'
+    )
+    assert content.count('loading="lazy"') == 2, (
+        'Убедитесь, что изображения ниже первой карточки загружаются лениво.'
+    )
+
+
+@pytest.mark.django_db
+def test_backfill_command(mixer):
+    post = mixer.blend('blog.Post', image=_image_file(300, 200))
+    Post.objects.filter(pk=post.pk).update(
+        image_width=None, image_height=None
+    )
+    call_command('backfill_image_dimensions', batch_size=1)
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (300, 200)
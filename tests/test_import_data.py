@@ -0,0 +1,124 @@
+import gzip
+import json
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from blog import dataset
+from blog.importer import Checkpoint, Importer
+from blog.models import Category, Location, Post
+
+FIXTURE = settings.BASE_DIR.parent / 'db.json'
+
+
+def test_json_array_is_parsed_incrementally(monkeypatch):
+    monkeypatch.setattr(dataset, 'READ_SIZE', 7)
+    records = list(dataset.iter_records(FIXTURE))
+    assert records == json.loads(FIXTURE.read_text(encoding='utf-8'))
+
+
+def test_gzip_json_lines(tmp_path):
+    path = tmp_path / 'data.jsonl.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        file.write('{"model": "blog.location", "fields": {}}\n\n[1]\n')
+    assert list(dataset.iter_records(path)) == [
+        {'model': 'blog.location', 'fields': {}}, [1]
+    ]
+
+
+@pytest.mark.django_db
+def test_import_keeps_keys_and_dates(tmp_path):
+    call_command(
+        'import_data', str(FIXTURE), checkpoint=str(tmp_path / 'log'),
+        batch_size=10, verbosity=0,
+    )
+    assert Post.objects.count() == 39
+    assert Category.objects.count() == 6
+    assert Location.objects.count() == 12
+    source = next(
+        row for row in dataset.iter_records(FIXTURE)
+        if row['model'] == 'blog.post' and row['pk'] == 1
+    )
+    post = Post.objects.get(pk=1)
+    assert post.title == source['fields']['title']
+    assert post.author_id == source['fields']['author']
+    assert post.created_at.isoformat().startswith('2022-12-18T23:06:18')
+    assert post.text_html
+
+
+def _write_jsonl(path, rows):
+    path.write_text(
+        '\n'.join(json.dumps(row) for row in rows), encoding='utf-8'
+    )
+    return path
+
+
+@pytest.mark.django_db
+def test_incremental_import_references_earlier_runs(tmp_path):
+    records = list(dataset.iter_records(FIXTURE))
+    first = [
+        row for row in records
+        if row['model'] != 'blog.post' or row['pk'] <= 20
+    ]
+    # Следующая выгрузка повторяет последнюю публикацию прошлой
+    second = [
+        row for row in records
+        if row['model'] == 'blog.post' and row['pk'] >= 20
+    ]
+    Importer(batch_size=10, checkpoint=Checkpoint(tmp_path / 'one')).run(
+        [_write_jsonl(tmp_path / 'one.jsonl', first)]
+    )
+    stats = Importer(
+        batch_size=10, checkpoint=Checkpoint(tmp_path / 'two')
+    ).run([_write_jsonl(tmp_path / 'two.jsonl', second)])
+    assert stats['blog.post'] == 19
+    assert stats['conflicts'] == 1
+    assert stats['invalid'] == 0
+    assert sorted(
+        Post.objects.values_list('pk', 'author_id', 'location_id')
+    ) == sorted(
+        (row['pk'], row['fields']['author'], row['fields']['location'])
+        for row in records if row['model'] == 'blog.post'
+    )
+
+
+class _Crash(Exception):
+    pass
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_resumes_after_failure(tmp_path, monkeypatch):
+    checkpoint = Checkpoint(tmp_path / 'log')
+    write = Checkpoint.write
+    calls = []
+
+    def crash_before_commit(self, *args):
+        write(self, *args)
+        calls.append(args)
+        if len(calls) == 3:
+            raise _Crash
+
+    monkeypatch.setattr(Checkpoint, 'write', crash_before_commit)
+    with pytest.raises(_Crash):
+        Importer(batch_size=10, checkpoint=checkpoint).run([FIXTURE])
+    monkeypatch.setattr(Checkpoint, 'write', write)
+
+    stats = Importer(batch_size=10, checkpoint=checkpoint).run(
+        [FIXTURE], resume=True
+    )
+    assert stats['blog.post'] == Post.objects.count() == 39
+    assert stats['auth.user'] == get_user_model().objects.count() == 4
+    assert Location.objects.count() == 12
+    records = list(dataset.iter_records(FIXTURE))
+    usernames = {
+        row['pk']: row['fields']['username']
+        for row in records if row['model'] == 'auth.user'
+    }
+    assert sorted(
+        Post.objects.values_list('title', 'author__username')
+    ) == sorted(
+        (row['fields']['title'], usernames[row['fields']['author']])
+        for row in records if row['model'] == 'blog.post'
+    )
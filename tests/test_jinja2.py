@@ -0,0 +1,43 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.template import engines
+from django.test import RequestFactory
+
+from blog.management.commands.benchmark_templates import build_pages
+
+
+def _lines(html):
+    return [line.strip() for line in html.splitlines() if line.strip()]
+
+
+@pytest.mark.parametrize(
+    'template_name', ['blog/index.html', 'blog/detail.html']
+)
+def test_jinja2_templates_match_django(template_name):
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    context = build_pages(posts_count=3, comments_count=2)[template_name]
+    django_html = engines['django'].get_template(template_name).render(
+        context, request
+    )
+    jinja_html = engines['jinja2'].get_template(template_name).render(
+        context, request
+    )
+    assert _lines(jinja_html) == _lines(django_html), (
+        f'Убедитесь, что шаблон `{template_name}` для Jinja2 выводит ту же '
+        'разметку, что и шаблон Django.'
+    )
+
+
+@pytest.mark.django_db
+def test_jinja2_backend_serves_pages(
+        settings, user_client, post_with_published_location
+):
+    settings.TEMPLATES = list(reversed(settings.TEMPLATES))
+    response = user_client.get(f'/posts/{post_with_published_location.id}/')
+    assert response.status_code == 200
+    assert 'blog/detail.html' not in [t.name for t in response.templates]
+    content = response.content.decode()
+    assert post_with_published_location.title in content
+    assert 'csrfmiddlewaretoken' in content
+    assert 'Оставить комментарий' in content
@@ -0,0 +1,68 @@
+import pytest
+
+HASH = 'ab' * 32
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    directory = tmp_path / 'posts_images' / 'ab' / 'ab'
+    directory.mkdir(parents=True)
+    (directory / f'{HASH}.jpg').write_bytes(CONTENT)
+    (tmp_path / 'posts_images' / 'legacy.jpg').write_bytes(CONTENT)
+    return f'/media/posts_images/ab/ab/{HASH}.jpg'
+
+
+def test_content_addressed_file_is_immutable(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert b''.join(response.streaming_content) == CONTENT
+    assert response['ETag'] == f'"{HASH}"'
+    assert 'immutable' in response['Cache-Control'], (
+        'Убедитесь, что файлы с именем по хешу кешируются навсегда.'
+    )
+    assert response['Accept-Ranges'] == 'bytes'
+
+
+def test_legacy_file_has_limited_cache(client, media_file, settings):
+    response = client.get('/media/posts_images/legacy.jpg')
+    assert response.status_code == 200
+    assert response['Cache-Control'] == (
+        f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+    )
+
+
+def test_if_none_match_returns_304(client, media_file):
+    response = client.get(media_file, HTTP_IF_NONE_MATCH=f'"{HASH}"')
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize(
+    ('header', 'start', 'end'),
+    [('bytes=0-9', 0, 9), ('bytes=1000-', 1000, 1023), ('bytes=-4', 1020, 1023)]
+)
+def test_range_request(client, media_file, header, start, end):
+    response = client.get(media_file, HTTP_RANGE=header)
+    assert response.status_code == 206
+    assert b''.join(response.streaming_content) == CONTENT[start:end + 1]
+    assert response['Content-Range'] == f'bytes {start}-{end}/{len(CONTENT)}'
+
+
+def test_unsatisfiable_range(client, media_file):
+    response = client.get(media_file, HTTP_RANGE='bytes=5000-')
+    assert response.status_code == 416
+
+
+def test_accel_redirect_handoff(client, media_file, settings):
+    settings.MEDIA_SENDFILE_BACKEND = 'x-accel-redirect'
+    response = client.get(media_file)
+    assert response['X-Accel-Redirect'] == (
+        f'/protected-media/posts_images/ab/ab/{HASH}.jpg'
+    )
+    assert response.content == b''
+
+
+def test_path_traversal_is_rejected(client, media_file):
+    response = client.get('/media/../settings.py')
+    assert response.status_code == 404
@@ -0,0 +1,91 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import thumbnail_name
+from blog.media import store_uploads
+from blog.models import Post
+from core.storage import content_name
+
+
+def _image_file(color, name='photo.jpg'):
+    buffer = BytesIO()
+    Image.new('RGB', (400, 300), color=color).save(buffer, format='JPEG')
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+def test_identical_uploads_are_stored_once(mixer):
+    first = mixer.blend('blog.Post', image=_image_file('red', 'a.jpg'))
+    second = mixer.blend('blog.Post', image=_image_file('red', 'b.jpg'))
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые изображения хранятся в одном файле.'
+    )
+    assert len(first.image.name.split('/')[-1].split('.')[0]) == 64
+
+
+def test_extension_spelling_does_not_change_name():
+    assert content_name('posts_images/a.jpeg', 'ab' * 32) == content_name(
+        'posts_images/b.JPG', 'ab' * 32
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reused_image_released_before_commit_is_restored(mixer, media_root):
+    first = mixer.blend('blog.Post', image=_image_file('red'))
+    second = Post(
+        title=first.title, text=first.text, pub_date=first.pub_date,
+        author=first.author, category=first.category,
+        image=_image_file('red', 'copy.jpeg'),
+    )
+    # Файл найден в хранилище, но запись ещё не зафиксирована
+    store_uploads(second)
+    assert second.image.name == first.image.name
+    first.delete()
+    assert not (media_root / first.image.name).exists()
+    second.save()
+    assert (media_root / Post.objects.get(pk=second.pk).image.name).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_image_deleted_with_last_reference(mixer, media_root):
+    first = mixer.blend('blog.Post', image=_image_file('red'))
+    second = mixer.blend('blog.Post', image=_image_file('red'))
+    name = first.image.name
+    first.delete()
+    assert (media_root / name).exists()
+    second.delete()
+    assert not (media_root / name).exists()
+    assert not (
+        media_root / thumbnail_name(name, 320, 'WEBP')
+    ).exists(), 'Убедитесь, что миниатюры удаляются вместе с оригиналом.'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replaced_image_is_released(mixer, media_root):
+    post = mixer.blend('blog.Post', image=_image_file('red'))
+    old_name = post.image.name
+    post.image = _image_file('blue')
+    post.save()
+    assert not (media_root / old_name).exists()
+    assert (media_root / post.image.name).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_scan_media_dry_run_and_delete(mixer, media_root):
+    mixer.blend('blog.Post', image=_image_file('red'))
+    orphan = media_root / 'posts_images' / 'orphan.jpg'
+    orphan.write_bytes(b'orphan')
+    call_command('scan_media')
+    assert orphan.exists(), 'Без --delete файлы не должны удаляться.'
+    call_command('scan_media', delete=True)
+    assert not orphan.exists()
@@ -0,0 +1,132 @@
+import json
+import os
+import re
+import threading
+
+import pytest
+
+from blog.signals import image_normalized
+from core import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
+
+
+def sample(text, name, **labels):
+    for line in text.splitlines():
+        match = re.match(r'^(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if not match or match[1] != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match[2] or ''))
+        if found == labels:
+            return float(match[3])
+    return None
+
+
+@pytest.mark.django_db
+def test_view_latency_queries_and_templates(
+        client, many_posts_with_published_locations
+):
+    client.get('/')
+    client.get('/')
+    text = client.get('/metrics').content.decode()
+    assert sample(
+        text, 'blogicum_http_requests_total',
+        view='blog:index', method='GET', status='200',
+    ) == 2
+    assert sample(
+        text, 'blogicum_http_request_duration_seconds_count',
+        view='blog:index',
+    ) == 2
+    assert sample(
+        text, 'blogicum_http_request_duration_seconds_bucket',
+        view='blog:index', le='+Inf',
+    ) == 2
+    assert sample(
+        text, 'blogicum_db_queries_per_request_sum', view='blog:index'
+    ) > 0
+    assert sample(
+        text, 'blogicum_template_render_duration_seconds_sum',
+        view='blog:index',
+    ) > 0
+    assert sample(
+        text, 'blogicum_http_response_size_bytes_sum', view='blog:index'
+    ) > 0
+    assert '# TYPE blogicum_http_request_duration_seconds histogram' in text
+
+
+@pytest.mark.django_db
+def test_cache_and_image_counters(client):
+    client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+    client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+    image_normalized.send(
+        sender=None, name='a.jpg', original_size=1000, size=400
+    )
+    text = client.get('/metrics').content.decode()
+    assert sample(
+        text, 'blogicum_cache_requests_total', cache='default', result='hit'
+    ) >= 1
+    assert sample(text, 'blogicum_images_normalized_total') == 1
+    assert sample(
+        text, 'blogicum_image_upload_bytes_total', stage='normalized'
+    ) == 400
+
+
+@pytest.mark.django_db
+def test_processes_are_merged_through_directory(client, settings, tmp_path):
+    settings.METRICS_DIR = tmp_path
+    # Снимок другого живого процесса
+    (tmp_path / f'{os.getppid()}.json').write_text(json.dumps([
+        ['http_requests_total', ['blog:index', 'GET', '200'], 5],
+        ['http_request_duration_seconds', ['blog:index'],
+         [1] + [0] * len(metrics.DURATION_BUCKETS) + [0.0005]],
+    ]))
+    client.get('/')
+    text = client.get('/metrics').content.decode()
+    assert sample(
+        text, 'blogicum_http_requests_total',
+        view='blog:index', method='GET', status='200',
+    ) == 6
+    assert sample(
+        text, 'blogicum_http_request_duration_seconds_bucket',
+        view='blog:index', le='0.001',
+    ) >= 1
+
+
+def test_dead_process_snapshot_is_archived(settings, tmp_path):
+    settings.METRICS_DIR = tmp_path
+    key = ('http_requests_total', ('blog:index', 'GET', '200'))
+    own = metrics.registry.snapshot().get(key, 0)
+    totals = []
+    for pid, count in (('999999998', 5), ('999999999', 3)):
+        (tmp_path / f'{pid}.json').write_text(json.dumps([
+            ['http_requests_total', list(key[1]), count],
+        ]))
+        totals.append(metrics.store.collect()[key])
+        totals.append(metrics.store.collect()[key])
+    # Суммы не уменьшаются после завершения процессов
+    assert totals == [own + 5, own + 5, own + 8, own + 8]
+    assert not list(tmp_path.glob('99999999*.json'))
+    assert (tmp_path / 'archive.json').exists()
+
+
+def test_finished_thread_shards_are_merged():
+    def work():
+        metrics.inc('write_queue_batches_total')
+
+    for _ in range(200):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    assert len(metrics.registry._shards) < 10
+    assert metrics.registry.snapshot()[
+        ('write_queue_batches_total', ())
+    ] == 200
+
+
+def test_metrics_are_not_public(client):
+    assert client.get('/metrics', REMOTE_ADDR='10.0.0.1').status_code == 404
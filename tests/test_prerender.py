@@ -0,0 +1,71 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from pages.prerender import PrerenderedPage
+from pages.views import About
+
+
+@pytest.fixture(autouse=True)
+def reset_pages():
+    About.page._variants.clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('debug', (False, True))
+def test_about_rendered_once(client, settings, debug):
+    settings.DEBUG = debug
+    with mock.patch.object(
+            PrerenderedPage, 'build', wraps=About.page.build,
+            autospec=False) as build:
+        first = client.get('/pages/about/')
+        second = client.get('/pages/about/')
+    assert first.content == second.content
+    assert build.call_count == 1, (
+        'Убедитесь, что статическая страница отрисуется один раз.'
+    )
+
+
+@pytest.mark.django_db
+def test_prerender_disabled_renders_every_time(client, settings):
+    settings.PRERENDER_ENABLED = False
+    with mock.patch.object(
+            PrerenderedPage, 'build', wraps=About.page.build,
+            autospec=False) as build:
+        first = client.get('/pages/about/')
+        second = client.get('/pages/about/')
+    assert first.content == second.content
+    assert build.call_count == 2
+
+
+@pytest.mark.django_db
+def test_about_etag_not_modified(client):
+    etag = client.get('/pages/about/')['ETag']
+    response = client.get('/pages/about/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_authenticated_variant_has_username(user_client, user):
+    content = user_client.get('/pages/rules/').content.decode()
+    assert f'/profile/{user.username}/' in content
+    assert 'prerender' not in content
+
+
+@pytest.mark.django_db
+def test_unicode_username_is_rendered_normally(client):
+    user = get_user_model().objects.create(username='Юзер')
+    client.force_login(user)
+    content = client.get('/pages/about/').content.decode()
+    assert '/profile/%D0%AE%D0%B7%D0%B5%D1%80/' in content
+    assert '>Юзер<' in content
+
+
+@pytest.mark.django_db
+def test_not_found_page_escapes_url(client):
+    response = client.get('/missing/<b>/')
+    content = response.content.decode()
+    assert response.status_code == 404
+    assert '/missing/%3Cb%3E/' in content or '&lt;b&gt;' in content
+    assert '<b>' not in content
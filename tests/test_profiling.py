@@ -0,0 +1,65 @@
+import json
+import pstats
+
+import pytest
+
+from core.profiling import make_token
+
+
+@pytest.fixture
+def profiles(settings, tmp_path):
+    settings.PROFILING_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_signed_request_is_profiled(
+        client, profiles, many_posts_with_published_locations
+):
+    response = client.get('/', {'profile': make_token()})
+    assert response.status_code == 200
+    capture_id = response['X-Profile-Id']
+    summary = json.loads((profiles / f'{capture_id}.json').read_text())
+    assert summary['view'] == 'blog:index'
+    assert summary['trigger'] == 'query'
+    assert summary['sql_count'] > 0
+    assert 0 < summary['template_ms'] <= summary['total_ms']
+    assert summary['top'][0]['tottime_ms'] >= summary['top'][-1]['tottime_ms']
+    assert pstats.Stats(str(profiles / f'{capture_id}.pstats')).total_calls
+
+
+@pytest.mark.django_db
+def test_unsigned_request_is_not_profiled(client, profiles):
+    response = client.get('/', {'profile': 'profile'})
+    assert 'X-Profile-Id' not in response
+    response = client.get('/', HTTP_X_PROFILE=make_token() + 'x')
+    assert 'X-Profile-Id' not in response
+    assert not list(profiles.iterdir())
+
+
+@pytest.mark.django_db
+def test_sampling_and_rotation(client, profiles, settings):
+    settings.PROFILING_SAMPLE_RATE = 1.0
+    settings.PROFILING_MAX_CAPTURES = 2
+    for _ in range(3):
+        response = client.get('/')
+        assert 'X-Profile-Id' not in response
+    assert len(list(profiles.glob('*.json'))) == 2
+    assert len(list(profiles.glob('*.pstats'))) == 2
+
+
+@pytest.mark.django_db
+def test_captures_page_is_staff_only(client, admin_client, profiles):
+    capture_id = admin_client.get(
+        '/', HTTP_X_PROFILE=make_token()
+    )['X-Profile-Id']
+    response = client.get('/admin/profiling/')
+    assert response.status_code == 302
+    response = admin_client.get('/admin/profiling/')
+    assert response.status_code == 200
+    assert capture_id in response.content.decode()
+    response = admin_client.get(f'/admin/profiling/{capture_id}.pstats')
+    assert response.status_code == 200
+    assert client.get(
+        f'/admin/profiling/{capture_id}.pstats'
+    ).status_code == 302
@@ -0,0 +1,45 @@
+import pytest
+from django.core.management import call_command
+
+from blog.markup import TEXT_HTML_VERSION
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db
+def test_text_html_is_rendered_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = '<b>жирный</b>\nвторая строка'
+    post.save(update_fields=['text'])
+    post.refresh_from_db()
+    assert post.text_html == '&lt;b&gt;жирный&lt;/b&gt;<br>вторая строка'
+    assert post.text_html_version == TEXT_HTML_VERSION
+
+
+@pytest.mark.django_db
+def test_detail_outputs_stored_html(
+        client, post_with_published_location, comment_to_a_post
+):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(text_html='<i>сохранённый</i>')
+    Comment.objects.filter(pk=comment_to_a_post.pk).update(
+        text_html='<i>комментарий</i>'
+    )
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    assert '<i>сохранённый</i>' in content
+    assert '<i>комментарий</i>' in content, (
+        'Убедитесь, что шаблоны выводят сохранённый HTML текста.'
+    )
+
+
+@pytest.mark.django_db
+def test_rerender_texts_updates_stale_rows(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        text='a\nb', text_html='', text_html_version=0
+    )
+    post.refresh_from_db()
+    assert post.rendered_text == 'a<br>b'
+    call_command('rerender_texts', verbosity=0)
+    post.refresh_from_db()
+    assert post.text_html == 'a<br>b'
+    assert post.text_html_version == TEXT_HTML_VERSION
@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+
+from blog.models import Post
+from core import replication
+from core.routers import ReplicaMiddleware, ReplicaRouter, replica_view
+
+
+@replica_view
+def listing(request):
+    return HttpResponse(ReplicaRouter().db_for_read(Post) or 'default')
+
+
+def create(request):
+    return HttpResponse(ReplicaRouter().db_for_read(Post) or 'default')
+
+
+def call(view, request):
+    def handler(request):
+        middleware.process_view(request, view, (), {})
+        return view(request)
+
+    middleware = ReplicaMiddleware(handler)
+    return middleware(request)
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+
+
+def test_annotated_views_read_from_replica(replicas, settings):
+    factory = RequestFactory()
+    assert call(listing, factory.get('/')).content == b'replica'
+    assert call(create, factory.get('/')).content == b'default'
+    response = call(create, factory.post('/'))
+    assert response.content == b'default'
+    cookie = response.cookies[settings.REPLICA_STICKY_COOKIE]
+    assert cookie['max-age'] == settings.REPLICA_STICKY_SECONDS
+
+    sticky = factory.get('/')
+    sticky.COOKIES[settings.REPLICA_STICKY_COOKIE] = '1'
+    assert call(listing, sticky).content == b'default'
+    assert ReplicaRouter().db_for_read(Post) is None
+
+
+def test_without_replicas_everything_uses_primary():
+    assert call(listing, RequestFactory().get('/')).content == b'default'
+
+
+def test_read_only_pages_are_annotated():
+    for path in ('/', '/posts/1/', '/category/x/', '/profile/x/',
+                 '/pages/about/'):
+        assert resolve(path).func.use_replica, path
+    for path in ('/posts/create/', '/posts/1/comment/', '/posts/1/edit/'):
+        assert not getattr(resolve(path).func, 'use_replica', False), path
+
+
+def test_replicas_are_not_migrated(replicas):
+    router = ReplicaRouter()
+    assert router.allow_migrate('default', 'blog')
+    assert not router.allow_migrate('replica', 'blog')
+    assert router.db_for_write(Post) == 'default'
+
+
+def test_replication_copies_primary(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    with sqlite3.connect(primary) as db:
+        db.execute('CREATE TABLE post (title TEXT)')
+        db.execute("INSERT INTO post VALUES ('первая')")
+    replication.replicate(primary, replica)
+    with sqlite3.connect(primary) as db:
+        db.execute("INSERT INTO post VALUES ('вторая')")
+    with sqlite3.connect(replica) as db:
+        assert db.execute('SELECT title FROM post').fetchall() == [
+            ('первая',)
+        ]
+    replication.replicate(primary, replica)
+    with sqlite3.connect(replica) as db:
+        assert db.execute('SELECT COUNT(*) FROM post').fetchone() == (2,)
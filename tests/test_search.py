@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import match_expression, search_posts
+
+
+@pytest.fixture
+def blend_post(mixer, user, published_category):
+    def blend(**fields):
+        fields.setdefault('category', published_category)
+        fields.setdefault('pub_date', timezone.now() - timedelta(days=1))
+        fields.setdefault('is_published', True)
+        return mixer.blend('blog.Post', author=user, **fields)
+
+    return blend
+
+
+def test_query_syntax_is_not_passed_to_fts():
+    assert match_expression('Мир OR "title": NEAR(x') == (
+        '"мир"* "or"* "title"* "near"* "x"*'
+    )
+    assert match_expression(' ?!* ') is None
+
+
+@pytest.mark.django_db
+def test_only_visible_posts_are_found(blend_post, mixer):
+    visible = blend_post(title='Прогулка', text='Весенний лес')
+    blend_post(title='Черновик', text='Весенний сад', is_published=False)
+    blend_post(
+        title='Отложено', text='Весенний луг',
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    blend_post(
+        title='Скрытая категория', text='Весенний парк',
+        category=mixer.blend('blog.Category', is_published=False),
+    )
+    page = search_posts('весен')
+    assert [post.id for post in page.posts] == [visible.id]
+    assert page.next_cursor is None
+
+
+@pytest.mark.django_db
+def test_title_matches_rank_first_and_are_highlighted(blend_post):
+    in_text = blend_post(title='Заметка', text='Путешествие по реке <b>')
+    in_title = blend_post(title='Путешествие', text='Без подробностей')
+    posts = search_posts('путешествие').posts
+    assert [post.id for post in posts] == [in_title.id, in_text.id]
+    assert posts[0].search_title == '<mark>Путешествие</mark>'
+    assert posts[1].search_snippet == (
+        '<mark>Путешествие</mark> по реке &lt;b&gt;'
+    )
+
+
+@pytest.mark.django_db
+def test_index_follows_updates_and_deletes(blend_post):
+    post = blend_post(title='Старый заголовок', text='Текст')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert not search_posts('старый').posts
+    assert [found.id for found in search_posts('новый').posts] == [post.id]
+    Post.objects.filter(pk=post.pk).update(text='Обновлённый текст')
+    assert search_posts('обновлённый').posts
+    post.delete()
+    assert not search_posts('новый').posts
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_walks_all_results(blend_post):
+    created = {blend_post(title='Озеро', text='Текст').id for _ in range(5)}
+    found = []
+    cursor = None
+    for _ in range(5):
+        page = search_posts('озеро', cursor=cursor, per_page=2)
+        found += [post.id for post in page.posts]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert sorted(found) == sorted(created)
+    # Подделанный курсор открывает первую страницу
+    page = search_posts('озеро', cursor='garbage', per_page=2)
+    assert len(page.posts) == 2
+
+
+@pytest.mark.django_db
+def test_search_page(client, blend_post):
+    post = blend_post(title='Горы', text='Поход в горы')
+    response = client.get(reverse('blog:search'), {'q': 'горы'})
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert reverse('blog:post_detail', args=[post.id]) in content
+    assert '<mark>Горы</mark>' in content
+
+
+@pytest.mark.django_db
+def test_admin_search_uses_index(admin_client, blend_post):
+    post = blend_post(title='Снимок', text='Фотография заката')
+    blend_post(title='Другое', text='Без совпадений', is_published=False)
+    hidden = blend_post(title='Закат', text='Черновик', is_published=False)
+    response = admin_client.get(
+        reverse('admin:blog_post_changelist'), {'q': 'закат'}
+    )
+    assert response.status_code == 200
+    assert set(response.context['cl'].result_list) == {post, hidden}
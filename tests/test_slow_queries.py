@@ -0,0 +1,74 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+from core.profiling import SQLTimer, time_queries
+from core.slowlog import normalize, read_log
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_LOG = tmp_path / 'slow.jsonl'
+    return settings.SLOW_QUERY_LOG
+
+
+def test_normalize_collapses_literals_and_in_lists():
+    assert normalize(
+        "SELECT * FROM t WHERE a IN (%s, %s, %s) AND b = 'x'  LIMIT 10"
+    ) == normalize("SELECT * FROM t WHERE a IN (%s) AND b = 'yy' LIMIT 20")
+
+
+@pytest.mark.django_db
+def test_slow_queries_are_logged_with_view_stack_and_plan(
+        client, slow_log, many_posts_with_published_locations
+):
+    client.get('/')
+    entries = list(read_log(slow_log))
+    post_query = next(
+        entry for entry in entries
+        if 'sql' in entry and 'FROM "blog_post"' in entry['sql']
+    )
+    assert post_query['view'] == 'blog:index'
+    assert any('blog/views.py' in frame for frame in post_query['stack'])
+    assert post_query['plan']
+
+    client.get('/')
+    repeated = [
+        entry for entry in read_log(slow_log)
+        if entry['fingerprint'] == post_query['fingerprint']
+    ]
+    assert len(repeated) == 2
+    assert 'sql' not in repeated[1]
+
+
+@pytest.mark.django_db
+def test_view_is_logged_without_metrics(client, slow_log, settings):
+    settings.METRICS_ENABLED = False
+    client.get('/')
+    assert {entry['view'] for entry in read_log(slow_log)} == {'blog:index'}
+
+
+@pytest.mark.django_db
+def test_explain_is_not_seen_by_other_wrappers(slow_log):
+    with time_queries(SQLTimer()) as timer:
+        list(Post.objects.all())
+    assert timer.count == 1
+    entry, = read_log(slow_log)
+    assert entry['plan']
+
+
+@pytest.mark.django_db
+def test_rotated_log_is_reopened_and_summarized(
+        client, slow_log, capsys, many_posts_with_published_locations
+):
+    client.get('/')
+    # Ротация logrotate: файл переименован, процесс пишет в новый
+    slow_log.rename(slow_log.with_name('slow.jsonl.1'))
+    for _ in range(2):
+        client.get('/')
+    assert slow_log.exists()
+    call_command('slow_queries', log=str(slow_log), limit=10, order='count')
+    output = capsys.readouterr().out
+    assert output.startswith('1. ')
+    assert 'blog:index' in output
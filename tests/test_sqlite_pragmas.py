@@ -0,0 +1,43 @@
+import pytest
+from django.db import connection
+from django.db.utils import ConnectionHandler
+
+from core.sqlite import apply_pragmas
+
+
+def pragma(conn, name):
+    with conn.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_file_database_is_tuned(tmp_path, settings):
+    handler = ConnectionHandler({'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(tmp_path / 'tuned.sqlite3'),
+        'PRAGMAS': {'busy_timeout': 1234},
+    }})
+    tuned = handler['default']
+    try:
+        assert pragma(tuned, 'journal_mode') == 'wal'
+        assert pragma(tuned, 'synchronous') == 1
+        assert pragma(tuned, 'temp_store') == 2
+        assert pragma(tuned, 'cache_size') == (
+            settings.SQLITE_PRAGMAS['cache_size']
+        )
+        assert pragma(tuned, 'busy_timeout') == 1234
+    finally:
+        tuned.close()
+
+
+@pytest.mark.django_db
+def test_memory_database_skips_wal():
+    assert pragma(connection, 'busy_timeout') == 5000
+    assert pragma(connection, 'journal_mode') == 'memory'
+
+
+@pytest.mark.django_db
+def test_pragma_values_are_validated():
+    with pytest.raises(ValueError):
+        apply_pragmas(connection, {'cache_size': '1; DROP TABLE blog_post'})
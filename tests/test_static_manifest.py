@@ -0,0 +1,61 @@
+import gzip
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import RequestFactory
+
+from core.middleware import StaticFilesMiddleware
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    call_command('collectstatic', interactive=False, verbosity=0)
+    # Хранилище пересоздаётся и читает манифест заново
+    staticfiles_storage._setup()
+    return tmp_path
+
+
+def _middleware():
+    return StaticFilesMiddleware(lambda request: None)
+
+
+def test_static_resolves_hashed_name(collected):
+    url = static('css/bootstrap.min.css')
+    assert url != '/static/css/bootstrap.min.css', (
+        'Убедитесь, что тег static возвращает имя файла с хешем.'
+    )
+    assert (collected / url[len('/static/'):]).exists()
+    assert (collected / (url[len('/static/'):] + '.gz')).exists()
+
+
+def test_static_falls_back_without_manifest(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    assert static('css/bootstrap.min.css') == '/static/css/bootstrap.min.css'
+
+
+def test_hashed_file_served_precompressed(collected):
+    url = static('css/bootstrap.min.css')
+    request = RequestFactory(HTTP_ACCEPT_ENCODING='gzip').get(url)
+    response = _middleware()(request)
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'] == 'text/css'
+    assert 'immutable' in response['Cache-Control']
+    body = gzip.decompress(b''.join(response.streaming_content))
+    assert body == (collected / 'css' / 'bootstrap.min.css').read_bytes()
+
+
+def test_unhashed_file_has_short_cache(collected, settings):
+    request = RequestFactory().get('/static/css/bootstrap.min.css')
+    response = _middleware()(request)
+    assert response['Cache-Control'] == (
+        f'public, max-age={settings.STATIC_CACHE_MAX_AGE}'
+    )
+    assert not response.has_header('Content-Encoding')
+
+
+@pytest.mark.django_db
+def test_pages_render_without_collectstatic(client):
+    assert client.get('/').status_code == 200
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.utils.timezone import now
+
+from blog.models import Comment, Post
+from blog.synthetic import (
+    chunks,
+    generate_chunk,
+    generate_references,
+    make_plan,
+)
+
+POST_FIELDS = (
+    'id', 'title', 'text', 'text_html', 'pub_date', 'author_id',
+    'category_id', 'location_id', 'is_published', 'created_at',
+)
+
+
+def _snapshot():
+    return (
+        list(Post.objects.order_by('pk').values_list(*POST_FIELDS)),
+        list(
+            Comment.objects.order_by('pk').values_list(
+                'id', 'post_id', 'text', 'created_at'
+            )
+        ),
+    )
+
+
+@pytest.mark.django_db
+def test_generated_data_depends_only_on_seed():
+    plan = make_plan(users=5, posts=300, comments_per_post=3, seed=7)
+    generate_references(plan)
+    generate_chunk(plan, 0)
+    first = _snapshot()
+    Post.objects.all().delete()
+    generate_chunk(plan, 0)
+    assert _snapshot() == first
+
+    Post.objects.all().delete()
+    generate_chunk(plan._replace(seed=8), 0)
+    assert _snapshot()[0] != first[0]
+
+
+@pytest.mark.django_db
+def test_generated_posts_are_realistic():
+    plan = make_plan(users=20, posts=2000, comments_per_post=4, seed=1)
+    generate_references(plan)
+    posts, comments = generate_chunk(plan, 0)
+    assert posts == Post.objects.count() == 2000
+    assert comments == Comment.objects.count()
+    assert 2000 < comments < 16000
+    assert Post.objects.filter(is_published=False).exists()
+    assert Post.objects.filter(pub_date__gt=now()).exists()
+    assert Post.objects.filter(location__isnull=True).exists()
+    assert Post.objects.filter(
+        is_published=True, pub_date__lt=now(), category__is_published=True
+    ).count() > 1500
+
+
+@pytest.mark.django_db
+def test_generated_data_does_not_depend_on_workers(monkeypatch):
+    monkeypatch.setattr('blog.synthetic.CHUNK_SIZE', 50)
+    started_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    plan = make_plan(
+        users=5, posts=200, comments_per_post=3, seed=3,
+        started_at=started_at,
+    )
+    generate_references(plan)
+    # Один процесс создаёт порции по порядку
+    for chunk in chunks(plan):
+        generate_chunk(plan, chunk)
+    single = _snapshot()
+    Post.objects.all().delete()
+    # Несколько процессов заканчивают порции в произвольном порядке
+    for chunk in (3, 1, 0, 2):
+        generate_chunk(plan, chunk)
+    assert _snapshot() == single
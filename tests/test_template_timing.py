@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from core import metrics
+
+
+def timings(response):
+    return {
+        name: (int(count), float(duration))
+        for name, count, duration in re.findall(
+            r'([^,; ]+);count=(\d+);dur=([\d.]+)',
+            response['X-Template-Timing'],
+        )
+    }
+
+
+@pytest.fixture
+def template_timing(settings):
+    settings.TEMPLATE_TIMING = True
+    metrics.registry.clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('backend', ['django', 'jinja2'])
+def test_each_template_and_include_is_timed(
+        client, settings, template_timing, backend,
+        many_posts_with_published_locations,
+):
+    if backend == 'jinja2':
+        settings.TEMPLATES = list(reversed(settings.TEMPLATES))
+    response = client.get('/')
+    found = timings(response)
+    assert found['includes/post_card.html'][0] == settings.NUMBER_ELEMENTS
+    assert found['includes/category_link.html'][0] >= 1
+    assert found['blog/index.html'][0] == 1
+    assert found['blog/index.html'][1] >= found['includes/post_card.html'][1]
+    samples = metrics.registry.snapshot()
+    assert samples[
+        ('template_renders_total', ('includes/post_card.html',))
+    ] == settings.NUMBER_ELEMENTS
+
+
+@pytest.mark.django_db
+def test_timing_is_off_by_default(client):
+    response = client.get('/')
+    assert 'X-Template-Timing' not in response
+    assert response.status_code == 200
@@ -0,0 +1,110 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import generate_thumbnails, thumbnail_name
+from blog.models import Post
+
+
+def _image_file(width, height, name='photo.jpg'):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color=(73, 109, 137)).save(
+        buffer, format='JPEG'
+    )
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_thumbnails_created_on_upload(mixer, media_root):
+    post = mixer.blend('blog.Post', image=_image_file(1000, 500))
+    for width in (320, 640, 960):
+        for image_format in ('JPEG', 'WEBP'):
+            name = thumbnail_name(post.image.name, width, image_format)
+            with Image.open(media_root / name) as thumbnail:
+                assert thumbnail.width == width
+                assert thumbnail.format == image_format
+    assert not (
+        media_root / thumbnail_name(post.image.name, 1280, 'JPEG')
+    ).exists(), 'Миниатюры не должны быть больше оригинала.'
+
+
+@pytest.mark.django_db
+def test_post_page_has_srcset(mixer, client, published_category):
+    post = mixer.blend(
+        'blog.Post', image=_image_file(700, 700),
+        category=published_category, is_published=True,
+    )
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    assert 'srcset=' in content
+    assert thumbnail_name(post.image.name, 640, 'WEBP') in content
+    assert content.count('<img') >= 1
+
+
+@pytest.mark.django_db
+def test_generation_is_idempotent(mixer):
+    post = mixer.blend('blog.Post', image=_image_file(400, 300))
+    assert generate_thumbnails(post.image.name) == []
+
+
+@pytest.mark.django_db
+def test_existing_thumbnails_are_not_decoded(mixer, monkeypatch):
+    post = mixer.blend('blog.Post', image=_image_file(400, 300))
+
+    def load(self):
+        raise AssertionError('Оригинал не должен декодироваться')
+
+    monkeypatch.setattr('PIL.ImageFile.ImageFile.load', load)
+    assert generate_thumbnails(post.image.name) == []
+    # Сохранение без замены изображения миниатюры не проверяет
+    calls = []
+    monkeypatch.setattr(
+        'blog.signals.generate_thumbnails',
+        lambda *args: calls.append(args),
+    )
+    post.title = 'Новый заголовок'
+    post.save()
+    assert calls == []
+
+
+@pytest.mark.django_db
+def test_backfill_command(mixer, media_root):
+    post = mixer.blend('blog.Post', image=_image_file(400, 300))
+    thumbnail = media_root / thumbnail_name(post.image.name, 320, 'WEBP')
+    thumbnail.unlink()
+    call_command('generate_thumbnails', workers=1)
+    assert thumbnail.exists()
+
+
+@pytest.mark.django_db
+def test_srcset_lists_only_created_thumbnails(
+        mixer, client, published_category, media_root
+):
+    post = mixer.blend(
+        'blog.Post', image=_image_file(700, 700),
+        category=published_category, is_published=True,
+    )
+    post.refresh_from_db()
+    assert post.thumbnails_ready
+    # Запись из bulk_create или импорта: размеры есть, миниатюр нет
+    for image_format in ('JPEG', 'WEBP'):
+        (media_root / thumbnail_name(post.image.name, 640, image_format)
+         ).unlink()
+    Post.objects.filter(pk=post.pk).update(thumbnails_ready=False)
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    assert thumbnail_name(post.image.name, 320, 'WEBP') in content
+    assert thumbnail_name(post.image.name, 640, 'WEBP') not in content
+
+    call_command('generate_thumbnails', workers=1)
+    post.refresh_from_db()
+    assert post.thumbnails_ready
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    assert thumbnail_name(post.image.name, 640, 'WEBP') in content
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+TRACE_ID = '0af7651916cd43dd8448eb211c80319c'
+
+
+@pytest.fixture
+def traces(settings, tmp_path):
+    settings.TRACING_DIR = tmp_path
+    settings.TRACING_TRUST_INCOMING = True
+    return tmp_path
+
+
+def load_trace(directory):
+    (path,) = directory.glob('*.json')
+    return json.loads(path.read_text())
+
+
+@pytest.mark.django_db
+def test_detail_page_timeline(user_client, traces, post_with_published_location):
+    response = user_client.get(
+        f'/posts/{post_with_published_location.id}/',
+        HTTP_TRACEPARENT=f'00-{TRACE_ID}-b7ad6b7169203331-01',
+    )
+    assert response['X-Trace-Id'] == TRACE_ID
+    assert response['traceparent'].startswith(f'00-{TRACE_ID}-')
+    trace = load_trace(traces)
+    assert trace['otherData']['view'] == 'blog:post_detail'
+    events = {event['name']: event for event in trace['traceEvents']}
+    for name in (
+        'request', 'SessionMiddleware', 'AuthenticationMiddleware',
+        'resolve', 'view blog:post_detail', 'SQL SELECT auth_user',
+        'SQL SELECT blog_post', 'SQL SELECT blog_comment',
+        'blog/detail.html', 'includes/comments.html',
+    ):
+        assert name in events, name
+    request, view = events['request'], events['view blog:post_detail']
+    assert request['ts'] <= view['ts']
+    assert view['ts'] + view['dur'] <= request['ts'] + request['dur']
+    template = events['blog/detail.html']
+    assert view['ts'] <= template['ts'] <= view['ts'] + view['dur']
+
+
+@pytest.mark.django_db
+def test_requests_are_not_traced_by_default(client, traces, settings):
+    response = client.get('/')
+    assert 'X-Trace-Id' not in response
+    settings.TRACING_TRUST_INCOMING = False
+    response = client.get(
+        '/', HTTP_TRACEPARENT=f'00-{TRACE_ID}-b7ad6b7169203331-01'
+    )
+    assert 'X-Trace-Id' not in response
+    assert not list(traces.iterdir())
+
+
+@pytest.mark.django_db
+def test_sampled_request_gets_new_trace_id(client, traces, settings):
+    settings.TRACING_SAMPLE_RATE = 1.0
+    response = client.get('/')
+    assert len(response['X-Trace-Id']) == 32
+    assert load_trace(traces)['traceEvents']
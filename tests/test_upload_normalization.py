@@ -0,0 +1,105 @@
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.forms import PostForm
+from blog.signals import image_normalized
+
+
+def _upload(size, exif_orientation=None, image_format='JPEG'):
+    image = Image.new('RGB', size, color=(200, 10, 10))
+    buffer = BytesIO()
+    params = {}
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        params['exif'] = exif.tobytes()
+    image.save(buffer, format=image_format, quality=100, **params)
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+def _clean_image(upload):
+    form = PostForm()
+    return form.fields['image'].clean(upload)
+
+
+def test_large_image_is_downsized(settings):
+    settings.IMAGE_UPLOAD_MAX_DIMENSION = 500
+    cleaned = _clean_image(_upload((2000, 1000)))
+    with Image.open(cleaned) as image:
+        assert max(image.size) == 500
+
+
+def test_exif_is_applied_and_stripped():
+    cleaned = _clean_image(_upload((300, 100), exif_orientation=6))
+    with Image.open(cleaned) as image:
+        assert image.size == (100, 300), (
+            'Убедитесь, что изображение поворачивается согласно EXIF.'
+        )
+        assert not image.getexif()
+
+
+def test_decompression_bomb_is_rejected(settings):
+    settings.IMAGE_UPLOAD_MAX_PIXELS = 100 * 100
+    form = PostForm(files={'image': _upload((200, 200))}, data={})
+    assert not form.is_valid()
+    assert 'image' in form.errors
+
+
+def test_bytes_saved_are_reported():
+    reports = []
+
+    def receiver(sender, **kwargs):
+        reports.append(kwargs)
+
+    image_normalized.connect(receiver)
+    try:
+        _clean_image(_upload((800, 800), exif_orientation=1))
+    finally:
+        image_normalized.disconnect(receiver)
+    assert len(reports) == 1
+    assert reports[0]['size'] < reports[0]['original_size']
+
+
+@pytest.mark.parametrize('image_format', ['PNG', 'JPEG'])
+def test_small_plain_image_is_accepted(image_format):
+    cleaned = _clean_image(_upload((50, 50), image_format=image_format))
+    with Image.open(cleaned) as image:
+        assert image.size == (50, 50)
+
+
+def test_multi_picture_jpeg_is_normalized(settings):
+    settings.IMAGE_UPLOAD_MAX_DIMENSION = 200
+    buffer = BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new('RGB', (400, 300), color=(200, 10, 10)).save(
+        buffer, format='MPO', save_all=True,
+        append_images=[Image.new('RGB', (400, 300))], exif=exif.tobytes(),
+    )
+    upload = SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+    cleaned = _clean_image(upload)
+    with Image.open(cleaned) as image:
+        assert image.format == 'JPEG'
+        assert image.size == (150, 200)
+        assert not image.getexif()
+
+
+def test_larger_conversion_keeps_original():
+    buffer = BytesIO()
+    # TIFF со сжатием JPEG в PNG вырастет; теги TIFF считаются метаданными
+    Image.frombytes('RGB', (64, 64), os.urandom(64 * 64 * 3)).save(
+        buffer, format='TIFF', compression='jpeg'
+    )
+    upload = SimpleUploadedFile(
+        'noise.tiff', buffer.getvalue(), content_type='image/tiff'
+    )
+    cleaned = _clean_image(upload)
+    assert cleaned is upload
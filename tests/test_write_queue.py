@@ -0,0 +1,210 @@
+import threading
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, OperationalError, connection
+from PIL import Image
+
+from blog.models import Comment
+from core import metrics
+from core.writer import file_lock, submit
+
+
+def counter(name):
+    return metrics.registry.snapshot().get((name, ()), 0)
+
+
+def make_upload():
+    buffer = BytesIO()
+    Image.new('RGB', (400, 300), color=(10, 120, 200)).save(
+        buffer, format='JPEG'
+    )
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def create_comment(post, author, text):
+    return Comment.objects.create(post=post, author=author, text=text)
+
+
+def in_threads(function, count):
+    results = [None] * count
+
+    def target(index):
+        try:
+            results[index] = function(index)
+        except Exception as error:
+            results[index] = error
+
+    threads = [
+        threading.Thread(target=target, args=(index,))
+        for index in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_writes_are_batched(
+        settings, post_with_published_location, user
+):
+    settings.WRITE_QUEUE_BATCH_WAIT = 0.2
+    batches = counter('write_queue_batches_total')
+    comments = in_threads(
+        lambda index: submit(
+            create_comment, post_with_published_location, user, str(index)
+        ),
+        5,
+    )
+    assert sorted(comment.text for comment in comments) == list('01234')
+    assert Comment.objects.count() == 5
+    assert counter('write_queue_batches_total') - batches < 5
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_unit_does_not_cancel_batch(
+        settings, post_with_published_location, user
+):
+    settings.WRITE_QUEUE_BATCH_WAIT = 0.2
+
+    def write(index):
+        if index == 0:
+            return submit(create_comment, post_with_published_location,
+                          None, 'без автора')
+        return submit(create_comment, post_with_published_location, user,
+                      'с автором')
+
+    failed, created = in_threads(write, 2)
+    assert isinstance(failed, IntegrityError)
+    assert created.pk
+    assert list(Comment.objects.values_list('text', flat=True)) == [
+        'с автором'
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_locked_database_is_retried(
+        settings, post_with_published_location, user
+):
+    settings.WRITE_QUEUE_BACKOFF = 0
+    calls = []
+    retries = counter('write_queue_retries_total')
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError('database is locked')
+        return create_comment(post_with_published_location, user, 'ok')
+
+    assert submit(flaky).text == 'ok'
+    assert len(calls) == 3
+    assert counter('write_queue_retries_total') - retries == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_view_writes_through_queue(
+        user_client, post_with_published_location
+):
+    units = counter('write_queue_units_total')
+    response = user_client.post(
+        f'/posts/{post_with_published_location.id}/comment/',
+        {'text': 'Через очередь'},
+    )
+    assert response.status_code == 302
+    assert Comment.objects.get().text == 'Через очередь'
+    assert counter('write_queue_units_total') - units == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_queued_write_is_counted_in_request_metrics(
+        user_client, post_with_published_location
+):
+    key = ('db_queries_per_request', ('blog:add_comment',))
+    before = metrics.registry.snapshot().get(key, [0])[-1]
+    statements = []
+
+    def record(execute, sql, params, many, context):
+        statements.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        user_client.post(
+            f'/posts/{post_with_published_location.id}/comment/',
+            {'text': 'Через очередь'},
+        )
+    assert any('INSERT INTO "blog_comment"' in sql for sql in statements)
+    assert metrics.registry.snapshot()[key][-1] - before == len(statements)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_timed_out_unit_is_not_committed(
+        settings, post_with_published_location, user
+):
+    settings.WRITE_QUEUE_TIMEOUT = 0.05
+    finished = threading.Event()
+
+    def slow():
+        comment = create_comment(post_with_published_location, user, 'поздно')
+        time.sleep(0.2)
+        finished.set()
+        return comment
+
+    with pytest.raises(TimeoutError):
+        submit(slow)
+    assert finished.wait(1)
+    # Следующая единица выполняется после отката отменённой
+    settings.WRITE_QUEUE_TIMEOUT = 30
+    submit(create_comment, post_with_published_location, user, 'вовремя')
+    assert list(Comment.objects.values_list('text', flat=True)) == [
+        'вовремя'
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_image_is_stored_before_queue(
+        user_client, published_category, media_root, monkeypatch
+):
+    seen = []
+
+    def record(function, *args, **kwargs):
+        instance = function.__self__.instance
+        seen.append(instance.image._committed)
+        return submit(function, *args, **kwargs)
+
+    monkeypatch.setattr('blog.mixins.submit', record)
+    response = user_client.post('/posts/create/', {
+        'title': 'С картинкой',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T10:00',
+        'category': published_category.id,
+        'image': make_upload(),
+    })
+    assert response.status_code == 302
+    assert seen == [True]
+
+
+def test_file_lock_is_reentrant_in_thread(tmp_path):
+    path = str(tmp_path / 'db.write-lock')
+
+    def nested():
+        # Так колбэк on_commit берёт блокировку внутри потока-писателя
+        with file_lock(path):
+            with file_lock(path):
+                pass
+
+    thread = threading.Thread(target=nested, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()